@@ -1,3 +1,3 @@
 __version__ = '0.1.0'
 
-__all__ = 'hist', 'profile', 'mpl'
+__all__ = 'hist', 'profile', 'mpl', 'storage', 'accumulator', 'expr', 'fill'
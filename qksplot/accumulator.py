@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+This module defines helpers to fill histograms from several threads:
+    :class:`ConcurrentHist <ConcurrentHist>` - A histogram (or profile) filled concurrently by many threads
+
+"""
+
+import threading
+
+__all__ = 'ConcurrentHist',
+
+# the methods and properties read from the merged view. The others would change a temporary histogram and are not
+# available
+_READ_ONLY = frozenset((
+    'dimension', 'cells', 'entries', 'shape', 'sparse', 'minY', 'maxY',
+    'sum_of_weights', 'sum_of_weights2', 'sum_of_weightsX', 'sum_of_weightsX2',
+    'get_axis', 'get_axes_list', 'get_stats', 'get_cell_content', 'get_cell_content_error', 'get_pos_content',
+    'get_cells_contents', 'get_cells_contents_errors', 'get_cells_volumes', 'get_bins_edges', 'get_bins_centers',
+    'nonzero_cells', 'bins_to_cell', 'bins_to_cells', 'cell_to_bins', 'cells_to_bins', 'pos_to_cell', 'pos_to_cells',
+    'integral', 'integral_over_bins', 'integral_over_pos', 'projection', 'projection_x', 'projection_y',
+    'projection_z', 'projection_xy', 'projection_xz', 'projection_yz', 'rebin', 'save', 'intersect', 'lazy',
+    'to_numpy', 'view'))
+
+
+class ConcurrentHist:
+    """ Wraps a histogram (or a profile) so that it can be filled by many threads at the same time.
+
+    Each thread fills its own accumulator: a private histogram with the same bins as the wrapped one, created the first
+    time the thread fills. So the threads never wait for each other when filling. Every accumulator has its own lock,
+    taken only by its thread when filling and, briefly, by the readers when merging.
+
+    The fill methods (:py:meth:`fill`, :py:meth:`fill_pos`, :py:meth:`fill_bins`, :py:meth:`fill_cell`,
+    :py:meth:`fill_many`, :py:meth:`fill_stream`, :py:meth:`fill_parallel`) and :py:meth:`merge` are the ones of the
+    wrapped histogram. The methods reading the histogram, like ``get_cells_contents()``, ``get_stats()`` or
+    ``integral()``, read the merged view: the wrapped histogram plus the accumulators of all threads (see
+    :py:meth:`merged`). So do ``np.asarray(h)``, ``to_numpy()`` and the views (``h[1:3, :]``): the arrays they give
+    belong to the merged histogram, writing them does not change this one. The other methods changing the histogram
+    (like ``scale()``) are not available: call them on the result of :py:meth:`merged`.
+
+    Args:
+        hist (HistND): the histogram (or profile) to fill. It is not modified, its entries are part of the merged view.
+
+    Note:
+        Each read builds a new merged histogram. When doing many reads, call :py:meth:`merged` once and read from it.
+    """
+    def __init__(self, hist):
+        self._hist = hist
+        self._local = threading.local()  # the accumulator of the current thread
+        self._accumulators = []  # (lock, histogram) of each thread that filled
+        self._accumulatorsLock = threading.Lock()  # guards the list of accumulators, not their contents
+
+    def _get_accumulator(self):
+        """ Returns the (lock, histogram) of the current thread, creating them on its first fill """
+        accumulator = getattr(self._local, "accumulator", None)
+        if accumulator is None:
+            accumulator = threading.Lock(), self._hist._empty_copy()
+            with self._accumulatorsLock:
+                self._accumulators.append(accumulator)
+            self._local.accumulator = accumulator
+        return accumulator
+
+    def _fill(self, method: str, args, kwargs):
+        lock, hist = self._get_accumulator()
+        with lock:
+            return getattr(hist, method)(*args, **kwargs)
+
+    def fill(self, *args, **kwargs):
+        """ Fill the accumulator of the current thread. See :py:meth:`HistND.fill <qksplot.hist.HistND.fill>` """
+        return self._fill("fill", args, kwargs)
+
+    def fill_pos(self, *args, **kwargs):
+        """ Fill the accumulator of the current thread. See :py:meth:`HistND.fill_pos <qksplot.hist.HistND.fill_pos>`
+        """
+        return self._fill("fill_pos", args, kwargs)
+
+    def fill_bins(self, *args, **kwargs):
+        """ Fill the accumulator of the current thread. See :py:meth:`HistND.fill_bins <qksplot.hist.HistND.fill_bins>`
+        """
+        return self._fill("fill_bins", args, kwargs)
+
+    def fill_cell(self, *args, **kwargs):
+        """ Fill the accumulator of the current thread. See :py:meth:`HistND.fill_cell <qksplot.hist.HistND.fill_cell>`
+        """
+        return self._fill("fill_cell", args, kwargs)
+
+    def fill_many(self, *args, **kwargs):
+        """ Fill the accumulator of the current thread. See :py:meth:`HistND.fill_many <qksplot.hist.HistND.fill_many>`
+        """
+        return self._fill("fill_many", args, kwargs)
+
+    def fill_stream(self, *args, **kwargs):
+        """ Fill the accumulator of the current thread.
+        See :py:meth:`HistND.fill_stream <qksplot.hist.HistND.fill_stream>` """
+        return self._fill("fill_stream", args, kwargs)
+
+    def fill_parallel(self, *args, **kwargs):
+        """ Fill the accumulator of the current thread.
+        See :py:meth:`HistND.fill_parallel <qksplot.hist.HistND.fill_parallel>` """
+        return self._fill("fill_parallel", args, kwargs)
+
+    def merge(self, other):
+        """ Adds the entries of 'other', a histogram with the same bins, to the accumulator of the current thread.
+        See :py:meth:`HistND.merge <qksplot.hist.HistND.merge>`
+
+        Returns:
+            ConcurrentHist. This object.
+        """
+        if not self._hist._same_binning(other):
+            raise ValueError("only a histogram with the same bins can be merged into a ConcurrentHist")
+        self._fill("merge", (other,), {})
+        return self
+
+    @property
+    def title(self):
+        """ the title of the wrapped histogram """
+        return self._hist.title
+
+    @title.setter
+    def title(self, t: str):
+        self._hist.title = t
+
+    def merged(self):
+        """ Returns a new histogram holding the entries of the wrapped histogram and of all the accumulators.
+
+        Returns:
+            HistND. A histogram of the same type as the wrapped one.
+        """
+        with self._accumulatorsLock:
+            accumulators = list(self._accumulators)
+
+        result = self._hist._empty_copy()
+        result._add_same_binning(self._hist)
+        for lock, hist in accumulators:
+            with lock:
+                result._add_same_binning(hist)
+        return result
+
+    def __array__(self, dtype=None, copy=None):
+        """ The contents of the merged view, see :py:meth:`HistND.__array__ <qksplot.hist.HistND.__array__>` """
+        return self.merged().__array__(dtype, copy)
+
+    def __getitem__(self, ranges):
+        """ A view of a region of the merged view, see :py:meth:`HistND.view <qksplot.hist.HistND.view>` """
+        return self.merged()[ranges]
+
+    def __getattr__(self, name):
+        # called only for the attributes not defined above: read them from the merged view
+        if name not in _READ_ONLY:
+            raise AttributeError("'" + type(self).__name__ + "' has no attribute '" + name + "': only the methods "
+                                 "reading the histogram are available, call it on merged()")
+        return getattr(self.merged(), name)
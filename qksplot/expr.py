@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+This module defines the lazy evaluation of arithmetic expressions between histograms:
+    :class:`HistExpr <HistExpr>` - An expression tree over histograms, computed in a single pass
+
+"""
+
+import numpy as np
+
+from . import hist as h
+
+__all__ = 'HistExpr',
+
+_OPERATIONS = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": h._divide}
+
+
+class HistExpr:
+    """ An arithmetic expression between histograms (and numbers), evaluated lazily.
+
+    The operators (+, -, *, /) between expressions, histograms and numbers only build the expression tree. The
+    expression is computed by :py:meth:`evaluate`, in a single pass:
+
+        - the bins of the result are found from the bins of all the histograms, like the operators of
+          :py:class:`HistND <qksplot.hist.HistND>` do it, but without creating the intermediate histograms
+        - the contents of each histogram are rebinned once to the bins of the result
+        - the operations are applied on whole arrays of cells. The sub expressions appearing several times in the tree
+          (like the same histogram) are computed only once.
+
+    Any attribute other than the operators and :py:meth:`evaluate`, like ``get_cells_contents()``, is read from the
+    evaluated histogram.
+
+    Args:
+        operand (HistND or float): the histogram (or the number) of this expression
+
+    Note:
+        When the result is sparse (the first histogram is sparse) only the cells filled in one of the histograms are
+        computed: the expression must be zero where all the histograms are empty (like ``h1 * h2 + h3``, not
+        ``h1 + 1``).
+
+        When all the histograms have the same bins, the result is the one of the (not lazy) histogram operators.
+        Otherwise the contents are rebinned only once, directly to the bins of the result, so they can slightly differ.
+        Each read evaluates the expression again, call :py:meth:`evaluate` once when doing many reads.
+
+    See Also:
+        :py:meth:`HistND.lazy <qksplot.hist.HistND.lazy>`
+    """
+    def __init__(self, operand):
+        self._op = None  # the operation of this node, None for the leaves (histograms and numbers)
+        self._operands = operand,
+
+    @classmethod
+    def _node(cls, op: str, left, right):
+        """ Returns the expression 'left op right' """
+        node = cls.__new__(cls)
+        node._op = op
+        node._operands = tuple(x if isinstance(x, HistExpr) else HistExpr(x) for x in (left, right))
+        return node
+
+    def _key(self):
+        """ Returns a key identifying this expression: same sub expressions on same histograms give the same key """
+        if self._op is not None:
+            return (self._op,) + tuple(x._key() for x in self._operands)
+
+        operand = self._operands[0]
+        if isinstance(operand, h.HistND):
+            return "hist", id(operand)
+        return "number", float(operand)
+
+    def _get_axes(self):
+        """ Returns the axes of the result and whether it is sparse, or None for expressions of numbers only """
+        if self._op is None:
+            operand = self._operands[0]
+            if isinstance(operand, h.HistND):
+                return operand.get_axes_list(), operand.sparse
+            return None
+
+        left, right = (x._get_axes() for x in self._operands)
+        if left is None or right is None:
+            return left or right
+        return h._union_axes(left[0], right[0]), left[1]
+
+    def _get_items(self, result, items: dict) -> None:
+        """ Adds to 'items' the non empty cells of each histogram of this expression, rebinned to the cells of the
+        histogram 'result': the key of the histogram -> (sorted cell indexes, contents) """
+        if self._op is not None:
+            for x in self._operands:
+                x._get_items(result, items)
+        elif isinstance(self._operands[0], h.HistND) and self._key() not in items:
+            items[self._key()] = self._operands[0]._get_contents_items_at(result)
+
+    def _compute(self, result, computed: dict, cells: np.ndarray=None, items: dict=None) -> np.ndarray:
+        """ Returns the values of this expression for the cells of the histogram 'result', or only for the cells
+        'cells' (sorted cell indexes) whose contents are in 'items' (see :py:meth:`_get_items`). 'computed' holds the
+        values of the expressions already computed, by key """
+        key = self._key()
+        values = computed.get(key)
+        if values is not None:
+            return values
+
+        if self._op is not None:
+            left, right = (x._compute(result, computed, cells, items) for x in self._operands)
+            values = _OPERATIONS[self._op](left, right)
+        elif isinstance(self._operands[0], h.HistND):
+            if cells is None:
+                values = self._operands[0]._get_contents_at(result)
+            else:
+                values = h._lookup(*items[key], cells)
+        else:
+            values = np.full(result.cells if cells is None else len(cells), float(self._operands[0]))
+
+        computed[key] = values
+        return values
+
+    def evaluate(self):
+        """ Computes the expression.
+
+        Returns:
+            HistND. A new histogram.
+        """
+        axes = self._get_axes()
+        if axes is None:
+            raise ValueError("the expression has no histogram")
+
+        result = h.HistND(len(axes[0]), edges=axes[0], sparse=axes[1])
+        if not result.sparse:
+            result._fill_cells(self._compute(result, {}))
+            return result
+
+        # only the cells filled in one of the histograms are computed, plus the cell -1 standing for all the others
+        items = {}
+        self._get_items(result, items)
+        cells = np.unique(np.concatenate([keys for keys, _ in items.values()] + [[-1]]).astype(np.intp))
+        values = self._compute(result, {}, cells, items)
+        if values[0] != 0.0:
+            raise ValueError("the expression is not zero on the empty cells: its sparse result would fill every cell")
+        result._fill_cells(values[1:], cells[1:])
+        return result
+
+    def __add__(self, other):
+        return HistExpr._node("+", self, other)
+
+    def __radd__(self, other):
+        return HistExpr._node("+", other, self)
+
+    def __sub__(self, other):
+        return HistExpr._node("-", self, other)
+
+    def __rsub__(self, other):
+        return HistExpr._node("-", other, self)
+
+    def __mul__(self, other):
+        return HistExpr._node("*", self, other)
+
+    def __rmul__(self, other):
+        return HistExpr._node("*", other, self)
+
+    def __truediv__(self, other):
+        return HistExpr._node("/", self, other)
+
+    def __rtruediv__(self, other):
+        return HistExpr._node("/", other, self)
+
+    def __getattr__(self, name):
+        # called only for the attributes not defined above: read them from the evaluated histogram
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.evaluate(), name)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+This module fills histograms from files of columns (like dumps of events), chunk by chunk:
+    :func:`iter_columns <iter_columns>` - Reads columns from a .npy, .npz or CSV file, in chunks
+    :func:`fill_from_files <fill_from_files>` - Fills a histogram (or a profile) with the columns of files
+
+It is also a command line tool, writing the filled histogram in the format of :py:meth:`HistND.save
+<qksplot.hist.HistND.save>`::
+
+    python -m qksplot.fill events.npz --columns x y --bins 100 0 10 --bins 50 -1 1 --weight w -o hist.qks
+
+"""
+
+import os
+import sys
+import argparse
+import itertools
+import numpy as np
+from typing import Sequence
+
+from . import hist as h
+from . import profile as prof
+
+__all__ = 'iter_columns', 'fill_from_files', 'main'
+
+
+def _missing_column(name: str, path) -> ValueError:
+    return ValueError("column '" + str(name) + "' not found in " + str(path))
+
+
+def _iter_npy(path, columns: Sequence, chunk_size: int):
+    data = np.load(path, mmap_mode='r')  # only the chunk being read is loaded in memory
+    if data.dtype.names is None:  # the columns of a 2 dimensional array are named by their index
+        data = data.reshape(len(data), -1)
+        for name in columns:
+            if not str(name).isdigit() or int(name) >= data.shape[1]:
+                raise _missing_column(name, path)
+        indexes = [int(name) for name in columns]
+        for start in range(0, len(data), chunk_size):
+            chunk = np.asarray(data[start:start + chunk_size])
+            yield {name: chunk[:, i] for name, i in zip(columns, indexes)}
+        return
+
+    for name in columns:
+        if name not in data.dtype.names:
+            raise _missing_column(name, path)
+    for start in range(0, len(data), chunk_size):
+        chunk = data[start:start + chunk_size]
+        yield {name: np.asarray(chunk[name]) for name in columns}
+
+
+def _iter_npz(path, columns: Sequence, chunk_size: int):
+    with np.load(path) as data:
+        for name in columns:
+            if name not in data.files:
+                raise _missing_column(name, path)
+        arrays = {name: data[name] for name in columns}  # each column is read entirely (it may be compressed)
+
+    n = len(arrays[columns[0]]) if columns else 0
+    for start in range(0, n, chunk_size):
+        yield {name: a[start:start + chunk_size] for name, a in arrays.items()}
+
+
+def _iter_csv(path, columns: Sequence, chunk_size: int, delimiter: str):
+    with open(path) as f:
+        header = [name.strip() for name in f.readline().split(delimiter)]
+        for name in columns:
+            if name not in header:
+                raise _missing_column(name, path)
+        indexes = [header.index(name) for name in columns]
+
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                return
+            chunk = np.loadtxt(lines, delimiter=delimiter, usecols=indexes, ndmin=2)
+            yield {name: chunk[:, k] for k, name in enumerate(columns)}
+
+
+def iter_columns(path, columns: Sequence, chunk_size: int=65536, delimiter: str=","):
+    """ Reads columns from a file, in chunks of at most 'chunk_size' rows.
+
+    The format is given by the extension of the file:
+        - .npy: a structured (record) array, whose fields are the columns, or a 2 dimensional array whose columns are
+          named by their index ("0", "1", ...). The file is memory mapped, only the chunk being read is in memory.
+        - .npz: one array per column. Each column is read entirely when opening the file.
+        - any other extension: a text file of values separated by 'delimiter' (CSV), whose first line has the names
+          of the columns.
+
+    Args:
+        path (str or os.PathLike): the path of the file
+
+        columns (Sequence): the names of the columns to read
+
+        chunk_size (int): the maximum number of rows in each chunk. Defaults to 65536
+
+        delimiter (str): the separator of the values in text files. Defaults to ","
+
+    Yields:
+        dict. The chunk of each column: name -> np.ndarray, all of the same length.
+
+    Raises:
+        ValueError: if a column is not in the file.
+    """
+    columns = list(columns)
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension == ".npy":
+        return _iter_npy(path, columns, chunk_size)
+    if extension == ".npz":
+        return _iter_npz(path, columns, chunk_size)
+    return _iter_csv(path, columns, chunk_size, delimiter)
+
+
+def fill_from_files(hist, paths, columns: Sequence, weight_column: str=None, value_column: str=None,
+                    chunk_size: int=65536, delimiter: str=",") -> int:
+    """ Fills a histogram (or a profile) with the columns read from files.
+
+    The files are read chunk by chunk (see :py:func:`iter_columns`) and each chunk is filled at once, over whole
+    arrays (see :py:meth:`HistND.fill_stream <qksplot.hist.HistND.fill_stream>`).
+
+    Args:
+        hist (HistND): the histogram (or profile) to fill
+
+        paths (str, os.PathLike or Sequence): the path of a file, or the paths of several files
+
+        columns (Sequence): the names of the columns holding the positions, one per dimension of 'hist'
+
+        weight_column (str): optional, the name of the column holding the weights. Defaults to None meaning all
+            weights are 1.0
+
+        value_column (str): for profiles, the name of the column holding the values
+
+        chunk_size (int): the maximum number of rows read and filled at once. Defaults to 65536
+
+        delimiter (str): the separator of the values in text files. Defaults to ","
+
+    Returns:
+        int. The number of entries read.
+    """
+    if len(columns) != hist.dimension:
+        raise BufferError("columns must have the same size as the histogram's dimension. Provided: " +
+                          str(len(columns)))
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+
+    names = list(columns) + [c for c in (value_column, weight_column) if c is not None]
+    kwargs = {"weight_column": weight_column}
+    if value_column is not None:
+        kwargs["value_column"] = value_column
+
+    n = 0
+    for path in paths:
+        n += hist.fill_stream(iter_columns(path, names, chunk_size, delimiter), chunk_size, columns, **kwargs)
+    return n
+
+
+def main(argv: Sequence=None) -> int:
+    """ The command line tool: fills a histogram from files and saves it. Run it with ``--help`` for the arguments.
+
+    Args:
+        argv (Sequence): the arguments. Defaults to the ones of the command line
+
+    Returns:
+        int. The exit status.
+    """
+    parser = argparse.ArgumentParser(prog="python -m qksplot.fill",
+                                     description="Fills a histogram with the columns of .npy, .npz or CSV files and "
+                                                 "saves it (see HistND.save).")
+    parser.add_argument("inputs", nargs="+", help="the files to read")
+    parser.add_argument("-c", "--columns", nargs="+", required=True, help="the columns of the positions, one per axis")
+    parser.add_argument("-b", "--bins", nargs=3, action="append", required=True, metavar=("NBINS", "MIN", "MAX"),
+                        help="the bins of an axis, given once per column")
+    parser.add_argument("-w", "--weight", help="the column of the weights")
+    parser.add_argument("-v", "--value", help="the column of the values, to fill a profile instead of a histogram")
+    parser.add_argument("-o", "--output", required=True, help="the file where the histogram is saved")
+    parser.add_argument("-t", "--title", default=str(), help="the title of the histogram")
+    parser.add_argument("--sparse", action="store_true", help="store only the filled cells")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="the number of rows read at once")
+    parser.add_argument("--delimiter", default=",", help="the separator of the values in text files")
+    args = parser.parse_args(argv)
+
+    if len(args.bins) != len(args.columns):
+        parser.error("--bins must be given once per column")
+    nBins = [int(b[0]) for b in args.bins]
+    minBin = [float(b[1]) for b in args.bins]
+    maxBin = [float(b[2]) for b in args.bins]
+
+    if args.value is None:
+        hist = h.HistND(len(args.columns), minBin, maxBin, nBins, args.title, sparse=args.sparse)
+    else:
+        hist = prof.ProfileND(len(args.columns), minBin, maxBin, nBins, title=args.title, sparse=args.sparse)
+    for axis, name in zip(hist.get_axes_list(), args.columns):
+        axis.title = name
+
+    n = fill_from_files(hist, args.inputs, args.columns, args.weight, args.value, args.chunk_size, args.delimiter)
+    hist.save(args.output)
+    print("filled " + str(n) + " entries, saved to " + args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,25 +16,332 @@ Note:
 
 """
 
+import os
+import copy
+import json
 import math
+import functools
+import itertools
+import struct
 import warnings
 import numpy as np
-from typing import List, Dict, Sequence
-from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Sequence, Tuple
+from bisect import bisect_right
+
+from .storage import SparseCells, CellsView
 
 __all__ = 'HistAxis', 'HistND', 'Hist1D', 'Hist2D', 'Hist3D'
 
 
+def _add_at(cells, idx, values) -> None:
+    """ Adds 'values' to the array of cells at the indexes 'idx'. Repeated indexes are accumulated. """
+    if isinstance(cells, (SparseCells, CellsView)):
+        cells.add_at(idx, values)
+    elif 4 * len(idx) >= len(cells):
+        cells += np.bincount(idx, weights=values, minlength=len(cells))
+    else:
+        np.add.at(cells, idx, values)
+
+
+def _lookup(keys: np.ndarray, values: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """ Returns the values at the indexes 'idx' of the array given by its sorted indexes 'keys' and their 'values',
+    zero for the indexes not in 'keys' """
+    if len(keys) == 0:
+        return np.zeros(len(idx))
+    pos = np.minimum(np.searchsorted(keys, idx), len(keys) - 1)
+    return np.where(keys[pos] == idx, values[pos], 0.0)
+
+
+def _equal_widths(bins: np.ndarray) -> bool:
+    """ Checks if the consecutive values in 'bins' are equally spaced """
+    widths = np.diff(bins)
+    return len(widths) > 0 and bool(np.allclose(widths, widths[0], rtol=1e-9, atol=0.0))
+
+
+def _take(cells, idx: np.ndarray=None) -> np.ndarray:
+    """ Returns the values of the cells at indexes 'idx', or of all cells (as a numpy array) if 'idx' is None """
+    if idx is None:
+        return np.asarray(cells)
+    return cells[idx]
+
+
+def _as_weights(weights, n: int) -> np.ndarray:
+    """ Returns the weights of 'n' entries as an array: all 1.0 if 'weights' is None, or broadcast from 'weights' """
+    if weights is None:
+        return np.ones(n)
+    return np.broadcast_to(np.asarray(weights, dtype=np.float64), (n,))
+
+
+def _iter_chunks(iterable, dim: int, chunk_size: int, columns: Sequence, extra_columns: Sequence):
+    """ Reads the entries yielded by 'iterable' in chunks of at most 'chunk_size' entries.
+
+    See :py:meth:`HistND.fill_stream` for what the iterable may yield. Entries given as tuples hold the positions
+    followed by the 'extra_columns' in the same order (the trailing ones may be missing). For one dimensional
+    histograms, a one dimensional numpy array is a batch of positions.
+
+    Yields:
+        a list with one array of positions per dimension and a list with one array (or None when missing) for each
+        of the 'extra_columns'
+
+    Raises:
+        ValueError: if an entry (or a row) has less than 'dim' or more than 'dim + len(extra_columns)' values
+    """
+    def check_width(n):
+        if not dim <= n <= dim + len(extra_columns):
+            raise ValueError("entries must have between " + str(dim) + " and " + str(dim + len(extra_columns)) +
+                             " values (the positions then " + str(len(extra_columns)) + " optional columns). " +
+                             "Provided: " + str(n))
+
+    def chunks(positions, extras):
+        for start in range(0, len(positions[0]), chunk_size):
+            stop = start + chunk_size
+            yield [x[start:stop] for x in positions], [x if x is None else x[start:stop] for x in extras]
+
+    def position_names(names):
+        # by default, the first columns which are not one of the 'extra_columns'
+        if columns is not None:
+            return columns
+        return [name for name in names if name not in extra_columns][:dim]
+
+    def from_table(get, names):
+        positions = [get(name) for name in position_names(names)]
+        extras = [None if name is None else get(name) for name in extra_columns]
+        return chunks(positions, extras)
+
+    def from_rows(rows):
+        rows = np.asarray(rows, dtype=np.float64).reshape(len(rows), -1)
+        check_width(rows.shape[1])
+        positions = [rows[:, d] for d in range(dim)]
+        extras = [rows[:, k] if k < rows.shape[1] else None for k in range(dim, dim + len(extra_columns))]
+        return chunks(positions, extras)
+
+    records = []
+    for item in iterable:
+        if isinstance(item, dict):
+            yield from from_table(lambda name: np.atleast_1d(np.asarray(item[name], dtype=np.float64)), list(item))
+            continue
+        if isinstance(item, np.ndarray) and item.dtype.names:
+            yield from from_table(lambda name: np.asarray(item[name], dtype=np.float64).ravel(), item.dtype.names)
+            continue
+        if isinstance(item, np.ndarray) and item.ndim == 2:
+            yield from from_rows(item)
+            continue
+        if isinstance(item, np.ndarray) and item.ndim == 1 and dim == 1:  # a column of positions
+            yield from from_rows(item.reshape(-1, 1))
+            continue
+
+        if isinstance(item, np.void) and item.dtype.names:  # one record of a record array
+            item = [item[name] for name in position_names(item.dtype.names)] + [item[name] for name in extra_columns if name is not None]
+        item = tuple(item) if np.ndim(item) else (item,)
+        check_width(len(item))
+        if records and len(item) != len(records[0]):  # the rows of a chunk have the same columns
+            yield from from_rows(records)
+            records = []
+        records.append(item)
+        if len(records) >= chunk_size:
+            yield from from_rows(records)
+            records = []
+
+    if records:
+        yield from from_rows(records)
+
+
+def _union_axes(axes: Sequence, otherAxes: Sequence, densest: bool=False) -> List:
+    """ Returns the axes covering the ranges of both 'axes' and 'otherAxes', one per axis in 'axes'.
+
+    The bins density on each axis is taken from 'axes', or the highest of the two if 'densest' is True. The axes
+    missing in 'otherAxes', or with the same bins in both, are kept as they are.
+    """
+    result = list(axes)
+    for d, (axis, other) in enumerate(zip(axes, otherAxes)):
+        if np.array_equal(axis.get_bins(), other.get_bins()):
+            continue
+        minBin = min(axis.minBin, other.minBin)
+        maxBin = max(axis.maxBin, other.maxBin)
+        density = max(axis.density(), other.density()) if densest else axis.density()
+        nBins = max(1, int(round(density * (maxBin - minBin))))  # the product is not exact: 3 / 0.7 * 0.7 < 3
+        result[d] = HistAxis(np.append(np.linspace(minBin, maxBin, nBins, endpoint=False), maxBin), uniform=True)
+    return result
+
+
+def _fill_shard(hist, columns: List[np.ndarray], arrays: Dict[str, np.ndarray]):
+    """ Fills the histogram 'hist' (a shard of :py:meth:`HistND.fill_parallel`) and returns it. Runs in a worker """
+    hist.fill_many(*columns, **arrays)
+    return hist
+
+
+def _divide(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """ Divides the arrays element by element, giving 0.0 where 'b' is zero """
+    return np.divide(a, b, out=np.zeros(np.shape(a)), where=b != 0)
+
+
+@functools.lru_cache(maxsize=128)
+def _rebin_map(source: bytes, target: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ Computes how the bins with edges 'source' overlap the bins with edges 'target' (both given as the bytes of an
+    array of floats, so they can be cached). See :py:meth:`HistAxis._get_rebin_map` """
+    source = np.frombuffer(source)
+    target = np.frombuffer(target)
+
+    # the segments between the edges of both axes, where they overlap
+    edges = np.union1d(source, target)
+    edges = edges[(edges >= max(source[0], target[0])) & (edges <= min(source[-1], target[-1]))]
+    lower, upper = edges[:-1], edges[1:]
+    middle = 0.5 * (lower + upper)
+
+    sourceBins = np.searchsorted(source, middle, side='right') - 1
+    targetBins = np.searchsorted(target, middle, side='right') - 1
+    fractions = (upper - lower) / (source[sourceBins + 1] - source[sourceBins])
+    for a in (sourceBins, targetBins, fractions):
+        a.setflags(write=False)
+    return sourceBins, targetBins, fractions
+
+
+_FILE_MAGIC = b"\x93QKSHIST"  # the first bytes of the files written by HistND.save
+_FILE_VERSION = 1
+_FILE_ALIGNMENT = 64  # the header and each array start at a multiple of this number of bytes
+
+
+_FILE_SPARE_PER_VALUE = 32  # bytes left free in the header for each statistic, so it can be rewritten in place
+_FILE_CHUNK_CELLS = 1 << 20  # number of cells read at once when summing the cells of a histogram stored in a file
+
+
+def _aligned(n: int) -> int:
+    """ Returns 'n' rounded up to a multiple of _FILE_ALIGNMENT """
+    return -(-n // _FILE_ALIGNMENT) * _FILE_ALIGNMENT
+
+
+def _write_header(f, header: dict, size: int=None) -> int:
+    """ Writes the magic bytes and the 'header' at the beginning of the file 'f'.
+
+    The header is padded with spaces to 'size' bytes, or to a size leaving room for the statistics to grow when 'size'
+    is None, and so that the arrays starting right after it are aligned.
+
+    Returns:
+        int. The position of the first array in the file.
+    """
+    headerBytes = json.dumps(header, default=lambda x: x.item()).encode()  # numpy scalars as python numbers
+    start = len(_FILE_MAGIC) + 8
+    if size is None:
+        values = sum(len(v) if isinstance(v, list) else 1 for v in header["attributes"].values())
+        size = _aligned(start + len(headerBytes) + _FILE_SPARE_PER_VALUE * values) - start
+    elif len(headerBytes) > size:
+        raise BufferError("the header does not fit in the " + str(size) + " bytes reserved in the file")
+
+    f.seek(0)
+    f.write(_FILE_MAGIC)
+    f.write(struct.pack("<Q", size))
+    f.write(headerBytes.ljust(size))
+    return start + size
+
+
+def _read_header(path) -> Tuple[dict, int, int]:
+    """ Reads the header of the histogram file 'path'.
+
+    Returns:
+        tuple. The header, its size in the file and the position of the first array in the file.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(_FILE_MAGIC)) != _FILE_MAGIC:
+            raise ValueError("not a histogram file: " + str(path))
+        size, = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(size).decode())
+    if header["version"] > _FILE_VERSION:
+        raise ValueError("unsupported version of the histogram file: " + str(header["version"]))
+    return header, size, _aligned(len(_FILE_MAGIC) + 8 + size)
+
+
+def _find_hist_class(name: str):
+    """ Returns the class named 'name' among HistND and its subclasses """
+    from . import profile  # noqa: F401 the profiles are subclasses of HistND too
+    classes = [HistND]
+    while classes:
+        cls = classes.pop()
+        if cls.__name__ == name:
+            return cls
+        classes.extend(cls.__subclasses__())
+    raise ValueError("unknown histogram type: " + name)
+
+
 class HistAxis:
     """ An axis for use in constructing histograms
 
     Args:
         bins (Sequence): an ordered (ascending order) array of floats containing the lower edges of the bins
 
+        uniform (bool): whether all bins have the same width. When None (the default) it is detected from 'bins'.
+            On uniform axes the bin containing a value is computed directly, without searching the edges.
+
+        logarithmic (bool): whether all bins have the same width on a logarithmic scale. When None (the default) it
+            is detected from 'bins'. On logarithmic axes the bin containing a value is also computed directly.
+
+    Raises:
+        ValueError: if 'bins' has less than 2 edges, or edges that are not finite or not strictly increasing.
+
+    See Also:
+        :py:meth:`log_spaced`
     """
-    def __init__(self, bins, title=str()):
+    def __init__(self, bins, title=str(), uniform: bool=None, logarithmic: bool=None):
         self._label = title  # the label of the axis
-        self._bins = bins  # an array with the low edges of the bins
+        self._bins = np.array(bins, dtype=np.float64)  # an array with the low edges of the bins
+        if self._bins.ndim != 1 or len(self._bins) < 2:
+            raise ValueError("an axis needs at least 2 edges (one bin). Provided: " + str(bins))
+        if not np.all(np.isfinite(self._bins)) or not np.all(self._bins[1:] > self._bins[:-1]):
+            raise ValueError("the edges of an axis must be finite and strictly increasing. Provided: " + str(bins))
+        self._widths = np.diff(self._bins)  # the width of each bin
+        self._centers = self._bins[:-1] + 0.5 * self._widths  # the center of each bin
+        for a in (self._bins, self._widths, self._centers):  # shared by all the users of the axis
+            a.setflags(write=False)
+
+        # cached as python objects since these are read for every filled value
+        self._edges = self._bins.tolist()
+        self._widthsList = self._widths.tolist()
+        self._centersList = self._centers.tolist()
+        self._min = self._edges[0]
+        self._max = self._edges[-1]
+        self._nbins = len(self._edges) - 1
+
+        if uniform is None:
+            uniform = _equal_widths(self._bins)
+        self._uniform = uniform
+        self._density = self._nbins / (self._max - self._min) if self._max != self._min else 0.0
+
+        if logarithmic is None:
+            logarithmic = not uniform and self._min > 0.0 and _equal_widths(np.log(self._bins))
+        self._logarithmic = logarithmic
+        if logarithmic:
+            self._logMin = math.log(self._min)
+            self._logDensity = self._nbins / (math.log(self._max) - self._logMin)
+
+    def __getstate__(self):
+        # only the edges (one array) are pickled, the rest is computed again from them
+        return {"bins": self._bins, "title": self._label, "uniform": self._uniform, "logarithmic": self._logarithmic}
+
+    def __setstate__(self, state):
+        self.__init__(state["bins"], state["title"], state["uniform"], state["logarithmic"])
+
+    @classmethod
+    def log_spaced(cls, nBins: int, minBin: float, maxBin: float, title=str()):
+        """ Creates an axis whose bins have equal widths on a logarithmic scale
+
+        Args:
+            nBins (int): the number of bins
+
+            minBin (float): the lower edge of the first bin. Must be positive.
+
+            maxBin (float): the upper edge of the last bin.
+
+            title (string): the title of the axis
+
+        Returns:
+            HistAxis.
+        """
+        if minBin <= 0.0:
+            raise ValueError("The minimum of a logarithmic axis must be positive. Provided: " + str(minBin))
+
+        bins = np.geomspace(minBin, maxBin, nBins + 1)
+        bins[0], bins[-1] = minBin, maxBin  # geomspace may round the ends
+        return cls(bins, title, uniform=False, logarithmic=True)
 
     @property
     def minBin(self) -> float:
@@ -51,6 +358,16 @@ class HistAxis:
         """ returns the total number of the bins"""
         return len(self._bins) - 1
 
+    @property
+    def uniform(self) -> bool:
+        """ True if all the bins have the same width """
+        return self._uniform
+
+    @property
+    def logarithmic(self) -> bool:
+        """ True if all the bins have the same width on a logarithmic scale """
+        return self._logarithmic
+
     @property
     def title(self) -> str:
         return self._label
@@ -70,35 +387,49 @@ class HistAxis:
     def get_bin(self, x: float) -> int:
         """ Returns the bin index that contains 'x' value, such that for that bin ``minBin <= x < maxBin``
 
+        The upper edge of the last bin (the axis :py:attr:`maxBin`) belongs to the last bin.
+
         Args:
             x (float): a valid value on the axis
 
         Returns:
             int. Or, -1 is returned if there is no such bin.
         """
-        if x < self.minBin or x > self.maxBin:  # sane check
+        if not self._min <= x <= self._max:  # sane check, also rejects NaN
             return -1
 
-        return bisect_left(self._bins, x) - 1
+        last = self._nbins - 1
+        if self._uniform:
+            i = int((x - self._min) * self._density)
+        elif self._logarithmic:
+            i = int((math.log(x) - self._logMin) * self._logDensity)
+        else:
+            return min(bisect_right(self._edges, x) - 1, last)
+
+        # the computed index may be off by one for values lying on the edges, due to rounding
+        if i > last:
+            i = last
+        if x < self._edges[i]:
+            i -= 1
+        elif x >= self._edges[i+1] and i < last:
+            i += 1
+        return i
 
     def get_bins(self) -> Sequence:
-        """ Returns all bins lower edges of the axis.
+        """ Returns all bins lower edges of the axis, followed by the upper edge of the last bin.
 
         Returns:
-            List[float]. A list with lower edges of each bin
+            np.ndarray. A (read only) array with lower edges of each bin
         """
         return self._bins
 
     def get_bin_center(self, i: int) -> float:
         """ Returns the value of the center in bin 'i' """
-        return self._bins[i] + 0.5*self.get_bin_width(i)
+        return self._centersList[i]
 
-    def get_bins_centers(self):
-        """ Returns the a list containing the centers of all bins."""
-        result = []
-        for i, lowEdge in enumerate(self._bins):
-            result.append(lowEdge+0.5*self.get_bin_width(i))
-        return result
+    def get_bins_centers(self) -> np.ndarray:
+        """ Returns a (read only) array containing the centers of all bins."""
+        return self._centers
 
     def get_bin_lower_edge(self, i: int) -> float:
         return self._bins[i]
@@ -107,13 +438,55 @@ class HistAxis:
         return self._bins[i+1]
 
     def get_bin_width(self, i: int) -> float:
-        if 0 <= i < self.nbins-1:
-            return self._bins[i+1] - self._bins[i]
-        elif i == self.nbins - 1:
-            return self.get_bin_width(i-1)
+        if 0 <= i < self._nbins:
+            return self._widthsList[i]
         else:
             return 0.0
 
+    def get_bins_widths(self) -> np.ndarray:
+        """ Returns a (read only) array containing the widths of all bins."""
+        return self._widths
+
+    def find_bins(self, x) -> np.ndarray:
+        """ Vectorized version of :py:meth:`get_bin`: returns the bin index of each value in 'x'
+
+        Args:
+            x (array like): values on the axis
+
+        Returns:
+            np.ndarray. An array of ints with the same shape as 'x', containing -1 where there is no such bin.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        inside = (x >= self._min) & (x <= self._max)  # NaN is never inside
+        last = self._nbins - 1
+
+        if self._uniform or self._logarithmic:
+            x_in = np.where(inside, x, self._min)
+            if self._uniform:
+                idx = (x_in - self._min) * self._density
+            else:
+                idx = (np.log(x_in) - self._logMin) * self._logDensity
+            idx = np.minimum(idx.astype(np.intp), last)
+            # the computed index may be off by one for values lying on the edges, due to rounding
+            idx -= x_in < self._bins[idx]
+            idx += (x_in >= self._bins[idx + 1]) & (idx < last)
+        else:
+            idx = np.minimum(np.searchsorted(self._bins, x, side='right') - 1, last)
+
+        return np.where(inside, idx, -1)
+
+    def _get_rebin_map(self, target) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Returns how the bins of this axis overlap the bins of the axis 'target'.
+
+        The result is computed once for each pair of axes (having the same edges) and cached.
+
+        Returns:
+            three arrays with one entry per pair of overlapping bins, sorted by position on the axis: the bin of this
+            axis, the bin of 'target' and the fraction of the width of the bin of this axis lying in the bin of
+            'target'.
+        """
+        return _rebin_map(self._bins.tobytes(), target._bins.tobytes())
+
 
 class HistND:
     """ An N-Dimensional Histogram.
@@ -128,10 +501,30 @@ class HistND:
             nBins (Sequence):  an array containing the number of bins for each dimension.
 
             title (string): the title of the histogram.
+
+            edges (Sequence): optional, the bins of each dimension given explicitly, as an array of edges (lower edges
+                of the bins followed by the upper edge of the last bin) or as a :py:class:`HistAxis`. Use None for the
+                dimensions whose bins are given by minBin, maxBin and nBins.
+
+            sparse (bool): if True, only the filled cells are stored (see :py:class:`SparseCells
+                <qksplot.storage.SparseCells>`) instead of allocating all cells. Use it for high dimensional histograms
+                where most of the cells stay empty.
+
+            path (str or os.PathLike): optional, a file to create to store the cells, instead of the memory. The cells
+                are memory mapped from the file, so the histogram can be bigger than the memory: only the parts of
+                the file holding the cells being used are loaded in memory. See :py:meth:`flush` and :py:meth:`close`.
     """
-    def __init__(self, dim: int, minBin: Sequence, maxBin: Sequence, nBins: Sequence, title=str()):
+    # the attributes (besides the axes) and the arrays of cells written by save()
+    _SAVED_ATTRIBUTES = ('_title', '_sparse', '_entries', '_entriesUnderflow', '_entriesOverflow', '_sumWeights',
+                         '_sumWeights2', '_sumWeightsX', '_sumWeightsX2')
+    _SAVED_CELLS = ('_binsEntries', '_binSumWeightsValues2')
+
+    def __init__(self, dim: int, minBin: Sequence=None, maxBin: Sequence=None, nBins: Sequence=None, title=str(),
+                 edges: Sequence=None, sparse: bool=False, path=None):
         self._dim = dim  # number of dimensions
         self._title = title  # the title of the histogram.
+        self._sparse = sparse  # whether the cells are stored in SparseCells
+        self._path = None  # the file storing the cells (memory mapped), None when they are in memory
 
         self._entries = 0  # total number of entries
         self._entriesUnderflow = 0
@@ -146,20 +539,28 @@ class HistND:
         self._sizeOverDims = []  # an array of sizes useful for converting to coordinates of linear array of cells
         n_cells = 1
         for i in range(dim):
-            binsLeftEdges = np.linspace(minBin[i], maxBin[i], nBins[i], endpoint=False)
-            x = np.append(binsLeftEdges, maxBin[i])
-            self._axes.append(HistAxis(x))
+            axis_edges = edges[i] if edges is not None else None
+            if isinstance(axis_edges, HistAxis):
+                axis = HistAxis(axis_edges.get_bins(), axis_edges.title, axis_edges.uniform, axis_edges.logarithmic)
+            elif axis_edges is not None:
+                axis = HistAxis(axis_edges)
+            else:
+                binsLeftEdges = np.linspace(minBin[i], maxBin[i], nBins[i], endpoint=False)
+                axis = HistAxis(np.append(binsLeftEdges, maxBin[i]), uniform=True)
+            self._axes.append(axis)
             self._sumWeightsX.append(.0)
             self._sumWeightsX2.append(.0)
             self._sizeOverDims.append(n_cells)
-            n_cells = n_cells * nBins[i]
+            n_cells = n_cells * axis.nbins
 
         self._nCells = n_cells  # total number of cells (global linear bins)
-        self._binsEntries = []  # contains the number of entries per cell (global linear bins)
-        self._binSumWeightsValues2 = []  # array of sum of squared weights per cell (global linear bins)
-        for i in range(n_cells):
-            self._binsEntries.append(.0)
-            self._binSumWeightsValues2.append(.0)
+        if path is not None:
+            self._create_file(path)
+        self._binsEntries = self._new_cells("_binsEntries")  # the number of entries per cell (global linear bins)
+        self._binSumWeightsValues2 = self._new_cells("_binSumWeightsValues2")  # sum of squared weights per cell
+        self._integralTable = None  # summed-area table used by the integrals, None until needed or after changes
+        self._sharedCells = False  # True once arrays sharing the cells are given out: the table is not cached then
+        self._cellsVolumes = None  # the volume of each cell, computed on first use
 
     @property
     def dimension(self):
@@ -186,6 +587,16 @@ class HistND:
         """total number of cells (global linear bins)"""
         return self._nCells
 
+    @property
+    def sparse(self):
+        """ True if only the filled cells are stored """
+        return self._sparse
+
+    @property
+    def shape(self):
+        """ a tuple with the number of bins on each axis """
+        return tuple(axis.nbins for axis in self._axes)
+
     @property
     def sum_of_weights(self):
         """Total Sum of weights"""
@@ -230,11 +641,33 @@ class HistND:
         """
         idxBins = []
         if 0 <= idx_cell < self.cells:
-            for k in range(self.dimension):
-                idxBins.append(int((idx_cell/self._sizeOverDims[k]) % self.get_axis(k).nbins))
+            idx_cell = int(idx_cell)
+            for axis in self._axes:  # the bins on the first axis vary fastest with the cell index
+                idx_cell, idx_bin = divmod(idx_cell, axis.nbins)
+                idxBins.append(idx_bin)
 
         return idxBins
 
+    def cells_to_bins(self, cells) -> np.ndarray:
+        """ Converts many cell indexes to indexes of bins. The array version of :py:meth:`cell_to_bins`.
+
+        Args:
+            cells (array like): the cell indexes.
+
+        Returns:
+            np.ndarray. An array of ints of shape (N, dimension), with the bin indexes on each axis of each cell. The
+            rows of the cells out of range are filled with -1.
+
+        See Also:
+            :py:meth:`bins_to_cells`, :py:meth:`pos_to_cells`
+        """
+        cells = np.asarray(cells, dtype=np.intp).ravel()
+        valid = (cells >= 0) & (cells < self.cells)
+
+        result = np.full((len(cells), self.dimension), -1, dtype=np.intp)
+        result[valid] = np.column_stack(np.unravel_index(cells[valid], self.shape, order='F'))
+        return result
+
     def bins_to_cell(self, *args) -> int:
         """ Converts bin indexes to global linear bin (cell) index.
 
@@ -245,17 +678,41 @@ class HistND:
                 the number of dimensions. Or pass one argument as a sequence (same size as number of dimensions).
 
         Returns:
-            int. The cell index (global linear bin index)
+            int. The cell index (global linear bin index), or -1 if a bin index is out of range.
 
         See Also:
             :py:meth:`cell_to_bins`, :py:meth:`pos_to_cell`
         """
+        if len(args) == 1 and np.ndim(args[0]) == 1:  # user provided an array/sequence
+            args = args[0]
+        if len(args) != self.dimension:
+            raise BufferError("args must have the same size as the histogram's dimension. Provided: " + str(len(args)))
+
         idx_cell = 0
-        for i in range(self.dimension):
-            idx_cell += self._sizeOverDims[i] * args[i]
+        for size, axis, idx_bin in zip(self._sizeOverDims, self._axes, args):
+            if not 0 <= idx_bin < axis.nbins:
+                return -1
+            idx_cell += size * int(idx_bin)
 
         return idx_cell
 
+    def bins_to_cells(self, bins) -> np.ndarray:
+        """ Converts many bin indexes to cell indexes. The array version of :py:meth:`bins_to_cell`.
+
+        Args:
+            bins (array like): the bin indexes, of shape (N, dimension)
+
+        Returns:
+            np.ndarray. The N cell indexes, or -1 for the rows having a bin index out of range.
+
+        See Also:
+            :py:meth:`cells_to_bins`, :py:meth:`pos_to_cells`
+        """
+        bins = np.asarray(bins, dtype=np.intp).reshape(-1, self.dimension)
+        valid = np.all((bins >= 0) & (bins < np.asarray(self.shape, dtype=np.intp)), axis=1)
+        cells = bins @ np.asarray(self._sizeOverDims, dtype=np.intp)
+        return np.where(valid, cells, -1)
+
     def pos_to_cell(self, *args) -> int:
         """ Converts coordinate positions to global linear bin (cell) index.
 
@@ -286,36 +743,53 @@ class HistND:
 
         return self.bins_to_cell(*bin_coords)
 
-    def get_bins_edges(self, includeEmptyBins: bool=False) -> List[List[float]]:
+    def pos_to_cells(self, *args) -> np.ndarray:
+        """ Converts many positions to cell indexes. The array version of :py:meth:`pos_to_cell`.
+
+        Args:
+            args (a list of parameters): one array of positions for each dimension. The number of arguments must be
+                the same as the number of dimensions. Or pass one argument as an array of shape (N, dimension).
+
+        Returns:
+            np.ndarray. The N cell indexes, or -1 for the positions outside of the histogram.
+
+        See Also:
+            :py:meth:`cells_to_bins`, :py:meth:`bins_to_cells`
+        """
+        return self._find_cells(self._get_positions_columns(args))
+
+    def _find_cells(self, columns: List[np.ndarray]) -> np.ndarray:
+        """ Returns the cell index (or -1) of each position, given one array of positions per dimension """
+        cells = np.zeros(len(columns[0]), dtype=np.intp)
+        inside = np.ones(len(columns[0]), dtype=bool)
+        for d, x in enumerate(columns):
+            bins = self.get_axis(d).find_bins(x)
+            inside &= bins >= 0
+            cells += self._sizeOverDims[d] * bins
+        cells[~inside] = -1
+        return cells
+
+    def get_bins_edges(self, includeEmptyBins: bool=False) -> List[np.ndarray]:
         """ Returns all bins per each dimension (axis).  By default it **does not** include empty cells.
 
-        The list contains for each dimension the list of minimum edges for each cell (global linear bin)
+        The list contains for each dimension the array of minimum edges for each cell (global linear bin)
 
         Args:
             includeEmptyBins (bool): if empty bins are included in the list. If True then empty bins are included,
                 otherwise they are NOT included
 
         Returns:
-            list of list.
+            list of np.ndarray.
+
+        See Also:
+            :py:meth:`nonzero_cells`
         """
-        result = []
         if includeEmptyBins:  # include all bins (including the empty ones)
-            for d in range(self.dimension):
-                result.append(self.get_axis(d).get_bins())
-        else:
-            for d in range(self.dimension):
-                result.append([])
+            return [axis.get_bins() for axis in self._axes]
 
-            for icell in range(self.cells):
-                cell_value = self.get_cell_content(icell)
-                if cell_value != 0.0:
-                    idxBins = self.cell_to_bins(icell)
-                    for d, ibin in enumerate(idxBins):
-                        result[d].append(self.get_axis(d).get_bin_lower_edge(ibin))
-
-        return result
+        return self.nonzero_cells()[1]
 
-    def get_bins_centers(self, includeEmptyBins: bool=False) -> List[List[float]]:
+    def get_bins_centers(self, includeEmptyBins: bool=False) -> List[np.ndarray]:
         """ Returns the positions of the centers of all bins per each dimension (axis).
         By default it **does not** include empty cells.
 
@@ -324,25 +798,151 @@ class HistND:
                 otherwise they are NOT included
 
         Returns:
-            list of list.
+            list of np.ndarray.
+
+        See Also:
+            :py:meth:`nonzero_cells`
         """
-        result = []
         if includeEmptyBins:  # include all bins (including the empty ones)
-            for d in range(self.dimension):
-                result.append(self.get_axis(d).get_bins_centers())
-        else:
-            for d in range(self.dimension):
-                result.append([])
+            return [axis.get_bins_centers() for axis in self._axes]
+
+        return self.nonzero_cells()[2]
+
+    def nonzero_cells(self) -> Tuple[np.ndarray, List[np.ndarray], List[np.ndarray], np.ndarray, np.ndarray]:
+        """ Returns the cells having entries, with their bins, contents and errors.
+
+        Everything is computed over whole arrays from a single search of the cells having entries, so it is the
+        fastest way to get several of them (for plotting for example). The arrays are aligned: their i-th elements
+        describe the same cell.
+
+        Returns:
+            tuple. (cells, edges, centers, contents, errors) where:
+                - cells (np.ndarray): the indexes of the cells having entries, sorted
+                - edges (list of np.ndarray): for each axis, the minimum edges of the bins of the cells
+                - centers (list of np.ndarray): for each axis, the centers of the bins of the cells
+                - contents (np.ndarray): the contents of the cells (see :py:meth:`get_cells_contents`)
+                - errors (np.ndarray): the errors of the cells (see :py:meth:`get_cells_contents_errors`)
+        """
+        cells = self._get_nonempty_cells()
+        bins = np.unravel_index(cells, self.shape, order='F')
+        edges = [axis.get_bins()[b] for axis, b in zip(self._axes, bins)]
+        centers = [axis.get_bins_centers()[b] for axis, b in zip(self._axes, bins)]
+        return cells, edges, centers, self._get_contents_of(cells), self._get_errors_of(cells)
+
+    def to_numpy(self) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """ Returns the contents of the cells as an array with the shape of the histogram, and the edges of the bins.
+
+        The result is like the one of ``np.histogramdd``. For histograms, the array of contents is a view of the cells:
+        nothing is copied and the changes of the histogram are seen in the array (and the reverse). For profiles (whose
+        contents are computed) and sparse histograms it is a new array. Once its cells are shared this way, the
+        integrals over bins are computed from the cells at each call (the summed-area table is not cached).
+
+        Returns:
+            tuple. (contents, edges) where contents (np.ndarray) has the shape of the histogram (see :py:attr:`shape`)
+            and edges (list of np.ndarray) has the edges of the bins (see :py:meth:`get_bins_edges`) of each axis.
+
+        See Also:
+            :py:meth:`from_numpy`
+        """
+        return self._get_contents_grid()[0], self.get_bins_edges(True)
+
+    def __array__(self, dtype=None, copy=None):
+        """ The contents of the cells as an array with the shape of the histogram, a view of the cells when possible
+        (see :py:meth:`to_numpy`). So ``np.asarray(h)`` gives the contents without copying them.
+
+        Like for numpy arrays, 'copy' True always gives a new array, and 'copy' False raises ValueError when the
+        contents can not be given without a copy (profiles, sparse histograms or another 'dtype').
+        """
+        contents, shared = self._get_contents_grid(share=not copy)
+        converted = dtype is not None and np.dtype(dtype) != contents.dtype
+        if copy is False and (converted or not shared):
+            raise ValueError("the contents of this histogram can not be given without a copy")
+        if converted:
+            return contents.astype(dtype)
+        return contents.copy() if copy and shared else contents
+
+    def _get_contents_grid(self, share: bool=True) -> Tuple[np.ndarray, bool]:
+        """ Returns the contents of the cells as an array with the shape of the histogram, and whether it is a view of
+        the cells (when they are a numpy array or a view, see :py:meth:`to_numpy`). Unless 'share' is False (the
+        caller copies it), a view of the cells is recorded as shared (see :py:meth:`_share_cells`) """
+        if isinstance(self._binsEntries, CellsView):
+            return self._binsEntries.grid, True
+        grid = self._get_contents_of().reshape(self.shape, order='F')
+        shared = np.may_share_memory(grid, self._binsEntries)
+        if shared and share:
+            self._share_cells()  # it can be written outside of the histogram
+        return grid, shared
+
+    def _share_cells(self) -> None:
+        """ Records that the cells are shared with arrays outside of this histogram, which can change them without
+        notice: the summed-area table of the integrals is no longer cached (see :py:meth:`_get_integral_table`) """
+        self._sharedCells = True
+        self._integralTable = None
+
+    @classmethod
+    def from_numpy(cls, counts, edges: Sequence, sumWeights2=None, title: str=str()):
+        """ Creates a histogram holding the array 'counts' as its cells, like the result of ``np.histogramdd``.
+
+        The array is not copied when it is an array of floats (float64): it becomes the storage of the cells. Filling
+        the histogram changes it, and its changes are seen in the histogram. The statistics are computed from the
+        contents, as if each cell was filled once with its content.
+
+        Args:
+            counts (np.ndarray): the contents of the cells, with one dimension per axis of the histogram
 
-            for icell in range(self.cells):
-                cell_value = self.get_cell_content(icell)
-                if cell_value != 0.0:
-                    idxBins = self.cell_to_bins(icell)
-                    for d, ibin in enumerate(idxBins):
-                        result[d].append(self.get_axis(d).get_bin_center(ibin))
+            edges (Sequence): the edges of the bins of each axis, as arrays (of length the number of bins plus one) or
+                as :py:class:`HistAxis`. A single array of edges is accepted for one dimensional histograms.
 
+            sumWeights2 (np.ndarray): optional, the sums of squared weights of the cells, with the shape of 'counts'.
+                Defaults to a copy of 'counts': the entries had no weights.
+
+            title (str): the title of the histogram.
+
+        Returns:
+            HistND. A histogram of this class.
+
+        See Also:
+            :py:meth:`to_numpy`
+        """
+        adopted = counts if isinstance(counts, np.ndarray) else None
+        counts = np.asarray(counts, dtype=np.float64)
+        if isinstance(edges, HistAxis) or (np.ndim(edges[0]) == 0 and not isinstance(edges[0], HistAxis)):
+            edges = [edges]
+        if len(edges) != counts.ndim:
+            raise BufferError("edges must have one array per dimension of counts. Provided: " + str(len(edges)))
+
+        axes = [HistAxis(e.get_bins(), e.title, e.uniform, e.logarithmic) if isinstance(e, HistAxis) else HistAxis(e)
+                for e in edges]
+        if tuple(axis.nbins for axis in axes) != counts.shape:
+            raise BufferError("the shape of counts " + str(counts.shape) + " does not match the number of bins " +
+                              str(tuple(axis.nbins for axis in axes)))
+        sumWeights2 = counts.copy(order='K') if sumWeights2 is None else np.asarray(sumWeights2, dtype=np.float64)
+        if sumWeights2.shape != counts.shape:
+            raise BufferError("sumWeights2 must have the shape of counts. Provided: " + str(sumWeights2.shape))
+
+        def as_cells(grid):
+            if grid.ndim <= 1 or grid.flags.f_contiguous:  # the layout of the cells: the first axis varies fastest
+                return grid.reshape(-1, order='F')
+            return CellsView(grid)
+
+        result = cls._new_without_cells(axes, title)
+        result._binsEntries = as_cells(counts)
+        result._binSumWeightsValues2 = as_cells(sumWeights2)
+        if adopted is not None and np.may_share_memory(adopted, result._binsEntries):
+            result._share_cells()  # the caller still holds the array
+        result._set_statistics_from_cells()
         return result
 
+    def get_cells_volumes(self) -> np.ndarray:
+        """ Returns the volume of each cell: the product of the widths of its bins.
+
+        The volumes are computed on first use and cached.
+
+        Returns:
+            np.ndarray. A (read only) array with the shape of the histogram (see :py:attr:`shape`)
+        """
+        return self._get_cells_volumes().reshape(self.shape, order='F')
+
     def get_cell_content(self, i: int) -> float:
         """ Returns the content of the cell 'i' or the value of Underflow (if i<0) or Overflow (if i>= # of cells)
 
@@ -360,7 +960,7 @@ class HistND:
 
         return self._binsEntries[i]
 
-    def get_cells_contents(self, includeEmptyBins=False) -> List[float]:
+    def get_cells_contents(self, includeEmptyBins=False) -> np.ndarray:
         """ Returns the contents of all bins (cells) per each dimension.  By default it **does not** include empty cells.
 
        Args:
@@ -368,18 +968,12 @@ class HistND:
                 otherwise they are NOT included
 
        Returns:
-           list of list.
+           np.ndarray.
        """
-        result = []
         if includeEmptyBins:
-            return self._binsEntries
-        else:
-            for icell in range(self.cells):
-                cell_value = self.get_cell_content(icell)
-                if cell_value != 0.0:
-                    result.append(cell_value)
+            return self._get_contents_of()
 
-        return result
+        return self.nonzero_cells()[3]
 
     def get_pos_content(self, *args) -> float:
         """Returns the content of the cell located at position x
@@ -413,8 +1007,8 @@ class HistND:
             result = self._binsEntries[i]
         return math.sqrt(result)
 
-    def get_cells_contents_errors(self, includeEmptyBins=False) -> List[float]:
-        """ Returns a list containing the errors associated to each cell.
+    def get_cells_contents_errors(self, includeEmptyBins=False) -> np.ndarray:
+        """ Returns an array containing the errors associated to each cell.
         By default it **does not** include empty cells.
 
         Args:
@@ -422,20 +1016,12 @@ class HistND:
                 otherwise they are NOT included
 
         Returns:
-            list.
+            np.ndarray.
         """
-        result = []
         if includeEmptyBins:
-            for i_cell in range(self.cells):
-                bin_err = self.get_cell_content_error(i_cell)
-                result.append(bin_err)
-        else:
-            for i_cell in range(self.cells):
-                cell_value = self.get_cell_content(i_cell)
-                if cell_value != 0.0:
-                    bin_err = self.get_cell_content_error(i_cell)
-                    result.append(bin_err)
-        return result
+            return self._get_errors_of()
+
+        return self.nonzero_cells()[4]
 
     def get_stats(self) -> Dict[str, float]:
         """ Returns general statistics about the histogram.
@@ -457,6 +1043,10 @@ class HistND:
     def projection(self, *keepDims):
         """ Project this Histogram to another Histogram keeping the axis defined in `keepDims`
 
+        The cells of the projected histogram hold the sums of the cells of this histogram over the dimensions not
+        kept, so the errors are projected the same way. The statistics are carried over. Projecting a profile gives a
+        profile, where the mean of each cell is the (weighted) mean of the values of the cells projected on it.
+
         Args:
             keepDims (variadic argument list): a variadic arguments list of the id's of the dimensions to keep when
                 projecting. The number of dimensions of the projected histogram is the length of `keepDims`
@@ -464,27 +1054,360 @@ class HistND:
         Returns:
             HistND. The projected histogram.
         """
-        # keep_dims = sorted(keepDims)
-        minBins = []
-        maxBins = []
-        nBins = []
-        for kdim in keepDims:
-            minBins.append(self.get_axis(kdim).minBin)
-            maxBins.append(self.get_axis(kdim).maxBin)
-            nBins.append(self.get_axis(kdim).nbins)
-
-        result = HistND(len(keepDims), minBins, maxBins, nBins, title="Projection of " + self.title)
-
-        for i_cell in range(self.cells):
-            value = self.get_cell_content(i_cell)
-            idx_bins = self.cell_to_bins(i_cell)  # has length 'self.dimension'
-            bins = []
-            for kdim in keepDims:
-                    bins.append(idx_bins[kdim])
-            result.fill_bins(*bins, weight=value)
+        if len(set(keepDims)) != len(keepDims):
+            raise ValueError("the dimensions to keep must be distinct. Provided: " + str(keepDims))
+
+        result = self._new_like([self.get_axis(kdim) for kdim in keepDims], "Projection of " + self.title)
+        self._transform_into(result, lambda cells: self._project(cells, keepDims), keepDims)
+        return result
+
+    def rebin(self, factors):
+        """ Returns a coarser histogram, made by merging groups of consecutive bins on each axis.
+
+        The cells of the new histogram hold the sums of the cells of this histogram they contain, so the errors are
+        merged the same way. The statistics are carried over. When the number of bins of an axis is not a multiple of
+        its factor, the last bin of the new axis merges the remaining bins. Rebinning a profile gives a profile, where
+        the mean of each cell is the (weighted) mean of the values of the merged cells.
+
+        Args:
+            factors (int or Sequence): the number of bins merged together on each axis, or one number for all axes.
+
+        Returns:
+            HistND. The rebinned histogram.
+        """
+        factors = [factors] * self.dimension if np.ndim(factors) == 0 else list(factors)
+        if len(factors) != self.dimension:
+            raise BufferError("factors must have the same size as the histogram's dimension. Provided: " +
+                              str(len(factors)))
+        if any(int(k) != k or k < 1 for k in factors):
+            raise ValueError("the factors must be positive integers. Provided: " + str(factors))
+        factors = [int(k) for k in factors]
+
+        axes = []
+        for axis, k in zip(self._axes, factors):
+            edges = axis.get_bins()[::k]
+            if axis.nbins % k:
+                edges = np.append(edges, axis.maxBin)
+            axes.append(HistAxis(edges, axis.title))
+
+        result = self._new_like(axes, self.title)
+        self._transform_into(result, lambda cells: self._merge_bins(cells, factors), range(self.dimension))
+        return result
+
+    def view(self, ranges: Sequence):
+        """ Returns a view of a region of this histogram: a histogram sharing the cells of this one.
+
+        The view has the bins of the region. Its cells are not copied, they are the cells of this histogram (see
+        :py:class:`CellsView <qksplot.storage.CellsView>`): filling or changing the view changes this histogram and
+        the changes of this histogram are seen in the view. The statistics of the view (entries, sums of weights, ...)
+        are computed from its cells when it is created. Filling the view does not change the statistics of this
+        histogram.
+
+        ``h.view(ranges)`` is also written ``h[ranges]``, for example ``h[20:40, :]`` for the bins 20 to 39 on the
+        first axis and all the bins on the second axis.
+
+        Args:
+            ranges (Sequence): the bins of the region on each axis, as a slice (without step), a pair (first bin, bin
+                after the last one), a bin index for a single bin (the axis is kept, with one bin) or None for all the
+                bins. The missing axes at the end keep all their bins.
+
+        Returns:
+            HistND. A histogram of the same type as this one.
+
+        Raises:
+            TypeError: if a range is not one of the above, or if this histogram is sparse.
 
+            IndexError: if a bin index is out of range.
+
+        Note:
+            Only histograms whose cells are all allocated (not sparse) can be viewed. An operation changing the bins of
+            the view (like adding a histogram with other bins) makes it a new histogram, not a view anymore.
+        """
+        if self._sparse:
+            raise TypeError("the cells of sparse histograms can not be viewed")
+        ranges = list(ranges)
+        if len(ranges) > self.dimension:
+            raise BufferError("too many ranges for the histogram's dimension. Provided: " + str(len(ranges)))
+
+        slices = []
+        for axis, r in itertools.zip_longest(self._axes, ranges):
+            if isinstance(r, (int, np.integer)) and not isinstance(r, bool):  # a single bin, the axis is kept
+                if not -axis.nbins <= r < axis.nbins:
+                    raise IndexError("bin " + str(r) + " is out of range for an axis of " + str(axis.nbins) + " bins")
+                r = slice(r % axis.nbins, r % axis.nbins + 1)
+            elif r is None:
+                r = slice(None)
+            elif not isinstance(r, slice):
+                if np.ndim(r) != 1 or len(r) != 2:
+                    raise TypeError("the range of bins of an axis must be a slice, a bin index, a pair (first bin, bin "
+                                    "after the last one) or None. Provided: " + repr(r))
+                r = slice(*r)
+            start, stop, step = r.indices(axis.nbins)
+            if step != 1 or start >= stop:
+                raise ValueError("the bins of a view must be a non empty range without step. Provided: " + str(r))
+            slices.append(slice(start, stop))
+        slices = tuple(slices)
+
+        self._share_cells()  # the grid of the view can be written through its to_numpy()
+        result = copy.copy(self)
+        result._path = None  # its cells are the ones of this histogram
+        result._set_axes([HistAxis(axis.get_bins()[r.start:r.stop + 1], axis.title)
+                          for axis, r in zip(self._axes, slices)])
+
+        def on_write():
+            self._integralTable = None
+            if isinstance(self._binsEntries, CellsView):
+                self._binsEntries._written()  # the parent of a view of a view
+
+        def region(cells):
+            grid = cells.grid if isinstance(cells, CellsView) else cells.reshape(self.shape, order='F')
+            return CellsView(grid[slices], on_write)
+
+        self._transform_into(result, region, range(self.dimension))
+        result._set_statistics_from_cells()
         return result
 
+    def __getitem__(self, ranges):
+        """ Returns a view of a region of this histogram, see :py:meth:`view` """
+        return self.view(ranges if isinstance(ranges, tuple) else (ranges,))
+
+    def _set_statistics_from_cells(self) -> None:
+        """ Sets the statistics to the ones of a histogram filled once per cell with its content. The number of entries
+        is the effective number of entries (sum of weights)^2 / (sum of squared weights) """
+        self._reset_statistics()
+        contents = _take(self._binsEntries)
+        self._sumWeights = float(contents.sum())
+        self._sumWeights2 = float(self._binSumWeightsValues2.sum())
+        if self._sumWeights2 > 0.0:
+            self._entries = int(round(self._sumWeights * self._sumWeights / self._sumWeights2))
+        self._add_weights_at_centers(contents)
+
+    def _set_axes(self, axes: Sequence) -> None:
+        """ Sets the axes of this histogram and the sizes computed from them. The cells are not changed """
+        self._dim = len(axes)
+        self._axes = list(axes)
+        self._sizeOverDims = [int(size) for size in np.cumprod([1] + list(self.shape[:-1]))]
+        self._nCells = int(np.prod(self.shape))
+        self._cellsVolumes = None
+
+    def _get_header(self, arrays: Sequence) -> dict:
+        """ Returns the header of the files of this histogram, where the arrays are described by the tuples 'arrays'
+        (name, dtype, length) and written in this order """
+        header = {"version": _FILE_VERSION,
+                  "type": type(self).__name__,
+                  "axes": [{"edges": axis.get_bins().tolist(), "title": axis.title, "uniform": axis.uniform,
+                            "logarithmic": axis.logarithmic} for axis in self._axes],
+                  "attributes": {name[1:]: getattr(self, name) for name in self._SAVED_ATTRIBUTES},
+                  "arrays": []}
+
+        offset = 0
+        for name, dtype, length in arrays:
+            header["arrays"].append({"name": name, "dtype": np.dtype(dtype).str, "offset": offset, "length": length})
+            offset += _aligned(np.dtype(dtype).itemsize * length)
+        return header
+
+    def save(self, path) -> None:
+        """ Writes the histogram to the file 'path', in a compact binary format.
+
+        The file starts with a small header holding the type of the histogram, its axes (edges and titles) and its
+        statistics. The arrays of cells follow, as raw little endian numbers: all the cells, or the indexes and the
+        values of the stored cells for sparse histograms. Read it back with :py:meth:`load`.
+
+        Args:
+            path (str or os.PathLike): the path of the file, overwritten if it exists.
+        """
+        arrays = []
+        for name in self._SAVED_CELLS:
+            cells = getattr(self, name)
+            if isinstance(cells, SparseCells):
+                keys, values = cells.items()
+                arrays += [(name[1:] + ".keys", keys.astype('<i8')), (name[1:] + ".values", values.astype('<f8'))]
+            else:
+                arrays.append((name[1:], np.asarray(cells).astype('<f8', copy=False)))
+
+        with open(path, "wb") as f:
+            _write_header(f, self._get_header([(key, array.dtype, len(array)) for key, array in arrays]))
+            for key, array in arrays:
+                f.write(array.tobytes())
+                f.write(bytes(_aligned(array.nbytes) - array.nbytes))
+
+    @staticmethod
+    def load(path, mmap_mode: str=None):
+        """ Reads a histogram written by :py:meth:`save`.
+
+        With 'mmap_mode' the cells are not read: they are memory mapped from the file, so even a histogram of several
+        GB opens instantly and only the parts of the file holding the cells being read are loaded in memory.
+
+        Args:
+            path (str or os.PathLike): the path of the file.
+
+            mmap_mode (str): optional, how to memory map the cells, like for ``np.memmap``. 'r': read only, 'r+':
+                the changes of the cells are written to the file (and the statistics by :py:meth:`flush`), 'c': the
+                changes stay in memory (copy on write). When None (the default) the cells are read in memory.
+
+        Returns:
+            HistND. A histogram of the type that was saved (like Hist2D or Profile1D).
+        """
+        header, _, start = _read_header(path)
+        arrays = {}
+        for entry in header["arrays"]:
+            dtype, offset, length = np.dtype(entry["dtype"]), start + entry["offset"], entry["length"]
+            if length == 0:
+                arrays[entry["name"]] = np.zeros(0, dtype=dtype)
+            elif mmap_mode is None:
+                arrays[entry["name"]] = np.fromfile(path, dtype=dtype, count=length, offset=offset)
+            else:
+                arrays[entry["name"]] = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=(length,))
+
+        cls = _find_hist_class(header["type"])
+        axes = [HistAxis(a["edges"], a["title"], a["uniform"], a["logarithmic"]) for a in header["axes"]]
+        result = cls._new_without_cells(axes)
+        for name, value in header["attributes"].items():
+            setattr(result, "_" + name, value)
+        result._path = path if mmap_mode == "r+" and not result._sparse else None
+        for name in cls._SAVED_CELLS:
+            if result._sparse:
+                cells = SparseCells.from_items(result.cells, arrays[name[1:] + ".keys"], arrays[name[1:] + ".values"])
+            else:
+                cells = arrays[name[1:]]
+            setattr(result, name, cells)
+        return result
+
+    @classmethod
+    def _new_without_cells(cls, axes: Sequence, title: str=str()):
+        """ Returns a histogram of this class with the axes 'axes' and no entries, without calling __init__: the
+        attributes holding the cells (_SAVED_CELLS) are not set, so nothing is allocated """
+        result = cls.__new__(cls)
+        result._title = title
+        result._sparse = False
+        result._path = None
+        result._integralTable = None
+        result._sharedCells = False
+        result._set_axes(axes)
+        result._reset_statistics()
+        return result
+
+    @property
+    def path(self):
+        """ the path of the file storing the cells (memory mapped), or None if they are in memory """
+        return self._path
+
+    def _create_file(self, path) -> None:
+        """ Creates the file 'path' to store the cells of this histogram, in the format of :py:meth:`save`, with all
+        the cells zero. The cells are then mapped from it by :py:meth:`_new_cells` """
+        if self._sparse:
+            raise ValueError("the cells of sparse histograms can not be stored in a file")
+
+        header = self._get_header([(name[1:], '<f8', self._nCells) for name in self._SAVED_CELLS])
+        last = header["arrays"][-1]
+        with open(path, "wb") as f:
+            start = _write_header(f, header)
+            f.truncate(start + last["offset"] + _aligned(8 * last["length"]))  # the new bytes read as zero
+        self._path = path
+
+    def flush(self) -> None:
+        """ Writes to the file storing the cells the changes not written yet: the cells still in memory and the
+        statistics. The file can then be opened with :py:meth:`load`.
+
+        Raises:
+            ValueError: if the cells are not stored in a file (see the 'path' argument of the constructor).
+        """
+        if self._path is None:
+            raise ValueError("the cells of this histogram are not stored in a file")
+
+        for name in self._SAVED_CELLS:
+            getattr(self, name).flush()
+        header, size, _ = _read_header(self._path)
+        header["attributes"] = {name[1:]: getattr(self, name) for name in self._SAVED_ATTRIBUTES}
+        with open(self._path, "r+b") as f:
+            _write_header(f, header, size)
+
+    def close(self) -> None:
+        """ Flushes (see :py:meth:`flush`) and closes the file storing the cells. The histogram can not be used after.
+
+        A histogram whose cells are stored in a file can also be used in a ``with`` statement, closing it at the end.
+        """
+        self.flush()
+        for name in self._SAVED_CELLS:
+            delattr(self, name)  # releases the memory maps
+        self._path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._path is not None:
+            self.close()
+
+    def __getstate__(self):
+        """ The state pickled: the attributes, without the caches, where each array of cells is a contiguous numpy
+        array. So the cells are pickled as raw bytes, and with the pickle protocol 5 they can be transferred out of
+        band (see ``pickle.PickleBuffer``), without copy. A histogram stored in a file, or viewing another one, is
+        unpickled as a histogram holding its cells in memory """
+        state = self.__dict__.copy()
+        state["_integralTable"] = None
+        state["_sharedCells"] = False
+        state["_cellsVolumes"] = None
+        state["_path"] = None
+        for name in self._SAVED_CELLS:
+            cells = state[name]
+            if not isinstance(cells, SparseCells):
+                state[name] = np.ascontiguousarray(np.asarray(cells))  # memory maps and views as plain arrays
+        return state
+
+    def _new_like(self, axes: Sequence, title: str):
+        """ Creates an empty histogram of the same kind as this one (same storage, ...) with the axes 'axes' """
+        return HistND(len(axes), title=title, edges=axes, sparse=self._sparse)
+
+    def _transform_into(self, result, transform, dims: Sequence) -> None:
+        """ Sets the cells of 'result' to 'transform(cells)' for each array of cells of this histogram, and the
+        statistics of 'result' to the ones of this histogram. 'dims' are the dimensions of this histogram giving the
+        axes of 'result' """
+        result._binsEntries = transform(self._binsEntries)
+        result._binSumWeightsValues2 = transform(self._binSumWeightsValues2)
+
+        result._entries = self._entries
+        result._entriesUnderflow = self._entriesUnderflow
+        result._entriesOverflow = self._entriesOverflow
+        result._sumWeights = self._sumWeights
+        result._sumWeights2 = self._sumWeights2
+        result._sumWeightsX = [self._sumWeightsX[d] for d in dims]
+        result._sumWeightsX2 = [self._sumWeightsX2[d] for d in dims]
+
+    def _merge_bins(self, cells, factors: Sequence):
+        """ Returns the array 'cells', one value per cell of this histogram, summed over groups of 'factors[d]'
+        consecutive bins on each axis d (see :py:meth:`rebin`) """
+        shape = [-(-n // k) for n, k in zip(self.shape, factors)]  # rounded up
+        if isinstance(cells, SparseCells):
+            keys, values = cells.items()
+            bins = np.unravel_index(keys, self.shape, order='F')
+            sizes = np.cumprod([1] + shape)
+            result = SparseCells(int(sizes[-1]))
+            result.add_at(sum(int(size) * (b // k) for size, b, k in zip(sizes, bins, factors)), values)
+            return result
+
+        grid = np.asarray(cells).reshape(self.shape, order='F')
+        for d, k in enumerate(factors):
+            if k > 1:
+                grid = np.add.reduceat(grid, np.arange(0, self.shape[d], k), axis=d)
+        return grid.flatten(order='F')
+
+    def _project(self, cells, keepDims: Sequence):
+        """ Returns the array 'cells', one value per cell of this histogram, summed over the dimensions not in
+        'keepDims'. The result has one value per cell of the histogram with the axes 'keepDims' (in this order) """
+        if isinstance(cells, SparseCells):
+            keys, values = cells.items()
+            bins = np.unravel_index(keys, self.shape, order='F')
+            sizes = np.cumprod([1] + [self.get_axis(kdim).nbins for kdim in keepDims])
+            result = SparseCells(int(sizes[-1]))
+            result.add_at(sum(int(size) * bins[kdim] for size, kdim in zip(sizes, keepDims)), values)
+            return result
+
+        grid = np.asarray(cells).reshape(self.shape, order='F')
+        grid = grid.sum(axis=tuple(d for d in range(self.dimension) if d not in keepDims))
+        kept = sorted(keepDims)  # the order of the remaining axes of 'grid'
+        return np.transpose(grid, [kept.index(kdim) for kdim in keepDims]).ravel(order='F')
+
     def fill_cell(self, i_cell: int, **kwargs) -> int:
         """ Fill the histogram using global cell index.
 
@@ -520,6 +1443,7 @@ class HistND:
         error_per_bin = kwargs.get("error_per_bin", True)
 
         # we got a valid bin
+        self._integralTable = None
         self._binSumWeightsValues2[i_cell] += weight * weight
         self._binsEntries[i_cell] += weight
 
@@ -537,7 +1461,7 @@ class HistND:
         if error_per_bin:  # expensive operations. use other fill_* methods
             idx_bins = self.cell_to_bins(i_cell)
             for d, id_bin in enumerate(idx_bins):
-                x = self.get_axis(d).get_bin_center(id_bin)
+                x = self._axes[d]._centersList[id_bin]
                 self._sumWeightsX[d] += weight * x
                 self._sumWeightsX2[d] += weight * x * x
         return i_cell
@@ -570,6 +1494,9 @@ class HistND:
         else:
             raise BufferError("args must have the same size as the histogram's dimension. Provided: " + str(len(args)))
 
+        if i_cell < 0:  # a bin index out of range: nothing is filled
+            return -1
+
         # we must call using error_per_bin=False, because we are doing it here below.see also big comment in fill_cell()
         kwargs["error_per_bin"] = False
         if self.fill_cell(i_cell, **kwargs) != i_cell:  # underflow or overflow
@@ -578,7 +1505,7 @@ class HistND:
         weight = kwargs.get("weight", 1.0)
 
         for d, id_bin in enumerate(args):
-            x = self.get_axis(d).get_bin_center(id_bin)
+            x = self._axes[d]._centersList[id_bin]
             self._sumWeightsX[d] += weight * x
             self._sumWeightsX2[d] += weight * x * x
 
@@ -614,7 +1541,7 @@ class HistND:
 
         # we must call using error_per_bin=False, otherwise see big comment in fill_cell()
         kwargs["error_per_bin"] = False
-        if self.fill_cell(i_cell, **kwargs) != i_cell:  # underflow or overflow
+        if self.fill_cell(i_cell, **kwargs) != i_cell or i_cell < 0:  # underflow or overflow
             return -1
 
         weight = kwargs.get("weight", 1.0)
@@ -645,242 +1572,629 @@ class HistND:
 
         return self.fill_pos(*args, **kwargs)
 
-    def intersect(self, other):
-        """ intersection of 2 histograms
+    def fill_many(self, *args, weights=None) -> np.ndarray:
+        """ Fill the histogram with many entries at once.
+
+        This gives the same result as calling :py:meth:`fill` for each entry, but the bins are searched and the cells
+        are filled using whole arrays.
 
         Args:
-            other: another histogram
+            args (a list of parameters): one array of positions for each dimension. The number of arguments must be
+                the same as the number of dimensions. Or pass one argument as an array of shape (N, dimension).
+
+            weights (array like): the weight of each entry, or one weight for all of them. Defaults to 1.0
 
         Returns:
-            another histogram that represent the reunion of these 2 histograms
+            np.ndarray. The **index of the affected cell (global linear bin) or -1** for each entry.
+
+        See Also:
+            :py:meth:`fill`, :py:meth:`fill_pos`
         """
-        n_dims = min(self.dimension, other.dimension)
+        columns = self._get_positions_columns(args)
+        return self._fill_columns(columns, _as_weights(weights, len(columns[0])))
 
-        n_minBins = []
-        n_maxBins = []
-        n_nBins = []
-        for d in range(n_dims):
-            n_minBins.append(min(self.get_axis(d).minBin, other.get_axis(d).minBin))
-            n_maxBins.append(max(self.get_axis(d).maxBin, other.get_axis(d).maxBin))
-            n_density = max(self.get_axis(d).density(), other.get_axis(d).density())
-            n_nBins.append(int(n_density * (n_maxBins[d] - n_minBins[d])))
+    def _fill_columns(self, columns: List[np.ndarray], weights: np.ndarray) -> np.ndarray:
+        """ Does the work of :py:meth:`fill_many` given one array of positions per dimension and the weights """
+        n = len(weights)
+        cells = self._find_cells(columns)
+        inside = cells >= 0
 
-        for d in range(n_dims, self.dimension):
-            n_minBins.append(self.get_axis(d).minBin)
-            n_maxBins.append(self.get_axis(d).maxBin)
-            n_nBins.append(self.get_axis(d).nbins)
+        self._entriesUnderflow += n - int(np.count_nonzero(inside))
+        self._integralTable = None
 
-        result = HistND(self.dimension, n_minBins, n_maxBins, n_nBins)
+        w = weights[inside]
+        w2 = w * w
+        _add_at(self._binsEntries, cells[inside], w)
+        _add_at(self._binSumWeightsValues2, cells[inside], w2)
 
-        for i_cell in range(result.cells):
-            idx_bins = result.cell_to_bins(i_cell)
+        self._entries += len(w)
+        self._sumWeights += float(w.sum())
+        self._sumWeights2 += float(w2.sum())
+        for d, x in enumerate(columns):
+            x = x[inside]
+            self._sumWeightsX[d] += float(np.dot(w, x))
+            self._sumWeightsX2[d] += float(np.dot(w, x * x))
 
-            pos = []
-            for d, id_bin in enumerate(idx_bins):
-                pos.append(result.get_axis(d).get_bin_center(id_bin))
+        return cells
 
-            val1 = self.get_pos_content(*pos)
-            val2 = other.get_pos_content(*pos)
+    def fill_stream(self, iterable, chunk_size: int=65536, columns: Sequence=None, weight_column=None) -> int:
+        """ Fill the histogram with the entries read from an iterable (a generator for example), chunk by chunk.
 
-            result.fill_cell(i_cell, weight=val1 + val2)
+        The entries are gathered in chunks of at most 'chunk_size' entries and each chunk is filled like
+        :py:meth:`fill_many` does. So only one chunk is kept in memory at a time.
 
-        return result
+        The iterable can yield:
+            - single entries: a tuple (or list) with the positions on each dimension, optionally followed by the weight
+            - batches of entries as a dict of columns (name -> array), or as a numpy structured (record) array
+            - batches of entries as a 2 dimensional numpy array, one entry per row (laid out like the tuples)
+            - for one dimensional histograms, batches of positions as a 1 dimensional numpy array
 
-    def scale(self, factor: float, scale_errors: bool=False):
-        """ Scales the histograms.
+        Args:
+            iterable (Iterable): the entries to fill
 
-        The values of all cells are multiplied by 'factor'
+            chunk_size (int): the maximum number of entries filled at once. Defaults to 65536
 
-        Args:
-            factor (float): the value to scale the histogram
+            columns (Sequence): for dicts and record arrays, the names of the columns holding the positions, one per
+                dimension. Defaults to the first columns, other than the weight column.
 
-            scale_errors (bool): if true then it also scales the errors per dimension
+            weight_column (str): for dicts and record arrays, the name of the column holding the weights.
+                Defaults to None meaning all weights are 1.0
 
         Returns:
-            none.
+            int. The number of entries read.
+
+        See Also:
+            :py:meth:`fill_many`
         """
-        scaledHist = self
+        n = 0
+        for positions, (weights,) in _iter_chunks(iterable, self.dimension, chunk_size, columns, [weight_column]):
+            self._fill_columns(positions, _as_weights(weights, len(positions[0])))
+            n += len(positions[0])
+        return n
 
-        for i_cell in range(scaledHist.cells):
-            scaledHist._binSumWeightsValues2[i_cell] = factor * scaledHist._binSumWeightsValues2[i_cell]
-            scaledHist._binsEntries[i_cell] = factor * scaledHist._binsEntries[i_cell]
+    def fill_parallel(self, *args, weights=None, processes: int=None, executor=None) -> int:
+        """ Fill the histogram with many entries at once, using several processes.
 
-            scaledHist._sumWeights = factor * scaledHist._sumWeights
-            scaledHist._sumWeights2 = factor * factor * scaledHist._sumWeights2
+        The entries are split in contiguous shards, one per process. Each process fills, like :py:meth:`fill_many`
+        does, a private histogram with the same bins as this one. The shards are then merged into this histogram, in
+        order, by summing their cells and their statistics. So the result is the same as the one of
+        :py:meth:`fill_many`, up to the rounding of the sums.
 
-        if scale_errors:
-            for d in range(scaledHist.dimension):
-                scaledHist._sumWeightsX[d]  = factor * scaledHist._sumWeightsX[d]
-                scaledHist._sumWeightsX2[d] = factor * scaledHist._sumWeightsX2[d]
-        
-        return self
+        Args:
+            args (a list of parameters): one array of positions for each dimension. The number of arguments must be
+                the same as the number of dimensions. Or pass one argument as an array of shape (N, dimension).
 
-    def __add__(self, other):
-        """Adds 2 histograms
+            weights (array like): the weight of each entry, or one weight for all of them. Defaults to 1.0
 
-        Args:
-            other (HistND): another histogram, not necessary of the same dimension.
+            processes (int): the number of shards (and of processes). Defaults to the number of CPUs.
+
+            executor (concurrent.futures.Executor): optional, an executor (a process pool) to reuse between calls.
+                By default a new process pool is started and stopped for each call.
 
         Returns:
-            HistND. The sum of the 2 histograms
+            int. The number of entries read.
 
+        See Also:
+            :py:meth:`fill_many`
         """
-        n_dims = min(self.dimension, other.dimension)
+        columns = self._get_positions_columns(args)
+        return self._fill_parallel(columns, {"weights": _as_weights(weights, len(columns[0]))}, processes, executor)
+
+    def _fill_parallel(self, columns: List[np.ndarray], arrays: Dict[str, np.ndarray], processes: int,
+                       executor) -> int:
+        """ Does the work of :py:meth:`fill_parallel`. 'arrays' are the keyword arguments of :py:meth:`fill_many`
+        holding one value per entry, they are split in shards like the positions. """
+        n = len(columns[0])
+        n_shards = max(1, min(processes or os.cpu_count() or 1, n))
+        if n_shards == 1:
+            _fill_shard(self, columns, arrays)
+            return n
+
+        bounds = np.linspace(0, n, n_shards + 1).astype(int)
+        shards = [self._empty_copy() for _ in range(n_shards)]
+        shards_columns = [[x[a:b] for x in columns] for a, b in zip(bounds[:-1], bounds[1:])]
+        shards_arrays = [{k: v[a:b] for k, v in arrays.items()} for a, b in zip(bounds[:-1], bounds[1:])]
+
+        if executor is None:
+            with ProcessPoolExecutor(n_shards) as pool:
+                filled = list(pool.map(_fill_shard, shards, shards_columns, shards_arrays))
+        else:
+            filled = list(executor.map(_fill_shard, shards, shards_columns, shards_arrays))
+
+        for shard in filled:
+            self._add_same_binning(shard)
+        return n
+
+    def _get_positions_columns(self, args) -> List[np.ndarray]:
+        """ Returns one array of positions per dimension from the arguments of :py:meth:`fill_many` """
+        if len(args) == 1:
+            positions = np.asarray(args[0], dtype=np.float64).reshape(-1, self.dimension)
+            columns = [positions[:, d] for d in range(self.dimension)]
+        elif len(args) == self.dimension:
+            columns = [np.asarray(x, dtype=np.float64).ravel() for x in args]
+        else:
+            raise BufferError("args must have the same size as the histogram's dimension. Provided: " + str(len(args)))
 
-        n_minBins = []
-        n_maxBins = []
-        n_nBins = []
-        for d in range(n_dims):
-            n_minBins.append(min(self.get_axis(d).minBin, other.get_axis(d).minBin))
-            n_maxBins.append(max(self.get_axis(d).maxBin, other.get_axis(d).maxBin))
-            n_density = self.get_axis(d).density()
-            n_nBins.append(int(n_density * (n_maxBins[d] - n_minBins[d])))
+        if any(len(x) != len(columns[0]) for x in columns):
+            raise BufferError("the arrays of positions must have the same length on each dimension")
 
-        for d in range(n_dims, self.dimension):
-            n_minBins.append(self.get_axis(d).minBin)
-            n_maxBins.append(self.get_axis(d).maxBin)
-            n_nBins.append(self.get_axis(d).nbins)
+        return columns
 
-        result = HistND(self.dimension, n_minBins, n_maxBins, n_nBins)
+    def _reset(self) -> None:
+        """ Removes all the entries: the cells and the statistics are set to zero """
+        self._reset_statistics()
+        self._binsEntries = self._new_cells()
+        self._binSumWeightsValues2 = self._new_cells()
+        self._sharedCells = False
 
-        for i_cell in range(result.cells):
-            idx_bins = result.cell_to_bins(i_cell)
+    def _reset_statistics(self) -> None:
+        """ Sets the statistics (entries, sums of weights, ...) to zero, but not the cells """
+        self._integralTable = None
+        self._entries = 0
+        self._entriesUnderflow = 0
+        self._entriesOverflow = 0
+        self._sumWeights = 0
+        self._sumWeights2 = 0
+        self._sumWeightsX = [.0] * self.dimension
+        self._sumWeightsX2 = [.0] * self.dimension
+
+    def _empty_copy(self):
+        """ Returns a histogram of the same type, with the same bins as this one, but without entries """
+        result = copy.copy(self)
+        result._path = None  # its cells are in memory
+        result._reset()
+        return result
 
-            pos = []
-            for d, id_bin in enumerate(idx_bins):
-                pos.append(result.get_axis(d).get_bin_center(id_bin))
+    def _add_same_binning(self, other) -> None:
+        """ Adds the cells and the statistics of 'other', which must have the same bins, to this histogram """
+        self._integralTable = None
+        self._binsEntries += other._binsEntries
+        self._binSumWeightsValues2 += other._binSumWeightsValues2
+
+        self._entries += other._entries
+        self._entriesUnderflow += other._entriesUnderflow
+        self._entriesOverflow += other._entriesOverflow
+        self._sumWeights += other._sumWeights
+        self._sumWeights2 += other._sumWeights2
+        for d in range(self.dimension):
+            self._sumWeightsX[d] += other._sumWeightsX[d]
+            self._sumWeightsX2[d] += other._sumWeightsX2[d]
+
+    def _new_cells(self, name: str=None):
+        """ Returns a new array for the cells, all zero. For histograms stored in a file, 'name' is the attribute
+        holding the cells (one of _SAVED_CELLS): the array is mapped from its part of the file """
+        if self._sparse:
+            return SparseCells(self._nCells)
+        if self._path is not None and name is not None:
+            header, _, start = _read_header(self._path)
+            entry = next(e for e in header["arrays"] if e["name"] == name[1:])
+            return np.memmap(self._path, dtype=entry["dtype"], mode="r+", offset=start + entry["offset"],
+                             shape=(entry["length"],))
+        return np.zeros(self._nCells)
+
+    def _get_nonempty_cells(self) -> np.ndarray:
+        """ Returns the sorted indexes of the cells that have entries """
+        return self._binsEntries.nonzero()[0]
+
+    def _get_contents_of(self, cells: np.ndarray=None) -> np.ndarray:
+        """ Returns the contents of the cells 'cells' (an array of cell indexes), or of all cells if None """
+        return _take(self._binsEntries, cells)
+
+    def _get_errors_of(self, cells: np.ndarray=None) -> np.ndarray:
+        """ Returns the errors of the cells 'cells' (an array of cell indexes), or of all cells if None """
+        if self._sumWeights2 >= 0.0:
+            return np.sqrt(_take(self._binSumWeightsValues2, cells))
+        return np.sqrt(_take(self._binsEntries, cells))
+
+    def _get_cells_volumes(self, cells: np.ndarray=None) -> np.ndarray:
+        """ Returns the volume of the cells 'cells' (the product of their bins widths), or of all cells if None """
+        if cells is not None:
+            volumes = np.ones(len(cells))
+            for axis, bins in zip(self._axes, np.unravel_index(cells, self.shape, order='F')):
+                volumes *= axis.get_bins_widths()[bins]
+            return volumes
+
+        if self._cellsVolumes is None:
+            volumes = np.ones(1)
+            for axis in self._axes:  # the bins on the first axis vary fastest with the cell index
+                volumes = np.outer(axis.get_bins_widths(), volumes).ravel()
+            volumes.setflags(write=False)
+            self._cellsVolumes = volumes
+        return self._cellsVolumes
+
+    def _same_binning(self, other) -> bool:
+        """ True if 'other' has exactly the same bins as this histogram, on all axes """
+        return self.dimension == other.dimension and all(
+            np.array_equal(a.get_bins(), b.get_bins()) for a, b in zip(self._axes, other.get_axes_list()))
+
+    def _union(self, other, densest: bool=False):
+        """ Creates an empty histogram whose axes cover the ranges of both this histogram and 'other'.
+
+        The bins density on each axis is taken from this histogram, or the highest of the two if 'densest' is True.
+        """
+        axes = _union_axes(self._axes, other.get_axes_list(), densest)
+        return HistND(self.dimension, edges=axes, sparse=self._sparse)
+
+    def _get_contents_at(self, hist) -> np.ndarray:
+        """ Returns the contents of this histogram rebinned to the cells of 'hist' (see :py:meth:`_rebin`) """
+        return self._rebin(self._binsEntries, hist)
+
+    def _rebin(self, cells, hist) -> np.ndarray:
+        """ Spreads the values of the array 'cells', one per cell of this histogram, over the cells of 'hist'.
+
+        The value of each cell is shared between the cells of 'hist' it overlaps, in proportion to the overlap, so the
+        sum is kept over the range common to both histograms. The dimensions of this histogram missing in 'hist' are
+        summed over, and the values are repeated along the dimensions of 'hist' missing in this histogram.
+
+        Returns:
+            np.ndarray. An array with one value per cell of 'hist'
+        """
+        if isinstance(cells, SparseCells):  # spread the filled cells only
+            keys, values = self._rebin_items(cells, hist)
+            return np.bincount(keys, weights=values, minlength=hist.cells)
+
+        n_dims = min(self.dimension, hist.dimension)
+        maps = [self.get_axis(d)._get_rebin_map(hist.get_axis(d)) for d in range(n_dims)]
+        n_cells = int(np.prod(hist.shape[:n_dims]))
+
+        grid = np.asarray(cells).reshape(self.shape, order='F')
+        grid = grid.sum(axis=tuple(range(n_dims, self.dimension)))
+        for d, (sourceBins, targetBins, fractions) in enumerate(maps):
+            shape = [1] * n_dims
+            shape[d] = len(fractions)
+            spread = np.take(grid, sourceBins, axis=d) * fractions.reshape(shape)
+
+            shape = list(grid.shape)
+            shape[d] = hist.get_axis(d).nbins
+            grid = np.zeros(shape)
+            if len(targetBins):  # sum the overlaps falling in the same bin of 'hist', they are consecutive
+                starts = np.flatnonzero(np.r_[True, targetBins[1:] != targetBins[:-1]])
+                idx = [slice(None)] * n_dims
+                idx[d] = targetBins[starts]
+                grid[tuple(idx)] = np.add.reduceat(spread, starts, axis=d)
+
+        return np.tile(grid.ravel(order='F'), hist.cells // n_cells)
+
+    def _rebin_items(self, cells, hist) -> Tuple[np.ndarray, np.ndarray]:
+        """ Like :py:meth:`_rebin`, but spreads only the non zero cells of 'cells' and returns the result as the sorted
+        indexes of the cells of 'hist' getting a value, and their values. So nothing is allocated for the empty cells,
+        when 'cells' are sparse """
+        if isinstance(cells, SparseCells):
+            keys, values = cells.items()
+        else:
+            values = np.asarray(cells)
+            keys = np.flatnonzero(values)
+            values = values[keys]
+
+        n_dims = min(self.dimension, hist.dimension)
+        bins = np.unravel_index(keys, self.shape, order='F')
+        targetCells = np.zeros(len(keys), dtype=np.intp)
+        for d in range(n_dims):  # each cell gives one value per overlapped cell of 'hist'
+            sourceBins, targetBins, fractions = self.get_axis(d)._get_rebin_map(hist.get_axis(d))
+            count = np.bincount(sourceBins, minlength=self.get_axis(d).nbins)  # overlapped bins per bin
+            first = np.cumsum(count) - count  # the overlaps of a bin are consecutive in the map
+            n = count[bins[d]]
+            rows = np.repeat(np.arange(len(values)), n)
+            overlaps = np.repeat(first[bins[d]] - (np.cumsum(n) - n), n) + np.arange(int(n.sum()))
+            values = values[rows] * fractions[overlaps]
+            targetCells = targetCells[rows] + hist._sizeOverDims[d] * targetBins[overlaps]
+            bins = [b[rows] for b in bins]
+
+        n_cells = int(np.prod(hist.shape[:n_dims]))
+        if hist.cells > n_cells:  # repeated along the dimensions of 'hist' missing in this histogram
+            targetCells = np.add.outer(n_cells * np.arange(hist.cells // n_cells), targetCells).ravel()
+            values = np.tile(values, hist.cells // n_cells)
+
+        keys, inverse = np.unique(targetCells, return_inverse=True)
+        return keys, np.bincount(inverse.ravel(), weights=values, minlength=len(keys))
+
+    def _get_contents_items_at(self, hist) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the contents of this histogram rebinned to the cells of 'hist', as the sorted indexes of the cells
+        getting a value and their values (see :py:meth:`_rebin_items`) """
+        return self._rebin_items(self._binsEntries, hist)
+
+    def _fill_cells(self, weights: np.ndarray, cells: np.ndarray=None) -> None:
+        """ Fills every cell once, with the weight given for it in 'weights'.
+
+        This is the equivalent of calling :py:meth:`fill_cell` for each cell, but done over whole arrays. The weights
+        are given for all cells, or only for the cells 'cells' (an array of cell indexes), the others getting zero.
+        """
+        self._integralTable = None
+        weights2 = weights * weights
+        if cells is None:
+            self._binsEntries += weights
+            self._binSumWeightsValues2 += weights2
+        else:
+            _add_at(self._binsEntries, cells, weights)
+            _add_at(self._binSumWeightsValues2, cells, weights2)
+
+        self._entries += self.cells
+        self._sumWeights += float(weights.sum())
+        self._sumWeights2 += float(weights2.sum())
+        self._add_weights_at_centers(weights, cells)
+
+    def _add_weights_at_centers(self, weights: np.ndarray, cells: np.ndarray=None) -> None:
+        """ Adds to the sums of weight*X and weight*X*X the 'weights' taken at the centers of the cells. The weights
+        are given for all cells, or only for the cells 'cells' (an array of cell indexes) """
+        if cells is None:
+            grid = weights.reshape(self.shape, order='F')
+        else:
+            cells_bins = np.unravel_index(cells, self.shape, order='F')
+        for d, axis in enumerate(self._axes):
+            if cells is None:
+                weightsOnAxis = grid.sum(axis=tuple(k for k in range(self.dimension) if k != d))
+            else:
+                weightsOnAxis = np.bincount(cells_bins[d], weights=weights, minlength=axis.nbins)
+            centers = axis.get_bins_centers()
+            self._sumWeightsX[d] += float(np.dot(weightsOnAxis, centers))
+            self._sumWeightsX2[d] += float(np.dot(weightsOnAxis, centers * centers))
 
-            val1 = self.get_pos_content(*pos)
-            val2 = other.get_pos_content(*pos)
+    def _combine(self, other, op, densest: bool=False):
+        """ Returns a new histogram with the contents 'op(self, other)', cell by cell.
 
-            result.fill_cell(i_cell, weight=val1 + val2)
+        The contents of both histograms are rebinned to the cells of the new histogram (see :py:meth:`_rebin`). For
+        sparse histograms, only the cells getting entries from one of them are computed (and stored), so 'op(0, 0)'
+        must give 0.
+        """
+        if self._sparse and self._same_binning(other):
+            result = HistND(self.dimension, edges=self._axes, sparse=True)
+            cells = np.union1d(self._get_nonempty_cells(), other._get_nonempty_cells())
+            result._fill_cells(op(self._get_contents_of(cells), other._get_contents_of(cells)), cells)
+            return result
+
+        result = self._union(other, densest)
+        if self._sparse:  # only the cells getting a value from one of the histograms are computed
+            keys, values = self._get_contents_items_at(result)
+            otherKeys, otherValues = other._get_contents_items_at(result)
+            cells = np.union1d(keys, otherKeys)
+            result._fill_cells(op(_lookup(keys, values, cells), _lookup(otherKeys, otherValues, cells)), cells)
+            return result
+
+        result._fill_cells(op(self._get_contents_at(result), other._get_contents_at(result)))
 
         return result
 
-    def __sub__(self, other):
-        """Substract 2 histograms
+    def intersect(self, other):
+        """ intersection of 2 histograms
 
         Args:
-            other (HistND): another histogram, not necessary of the same dimension.
+            other: another histogram
 
         Returns:
-            HistND. The difference of the 2 histograms
+            another histogram that represent the reunion of these 2 histograms
         """
-        n_dims = min(self.dimension, other.dimension)
+        return self._combine(other, np.add, densest=True)
 
-        n_minBins = []
-        n_maxBins = []
-        n_nBins = []
-        for d in range(n_dims):
-            n_minBins.append(min(self.get_axis(d).minBin, other.get_axis(d).minBin))
-            n_maxBins.append(max(self.get_axis(d).maxBin, other.get_axis(d).maxBin))
-            n_density = self.get_axis(d).density()
-            n_nBins.append(int(n_density * (n_maxBins[d] - n_minBins[d])))
+    def scale(self, factor: float, scale_errors: bool=False):
+        """ Scales the histograms.
 
-        for d in range(n_dims, self.dimension):
-            n_minBins.append(self.get_axis(d).minBin)
-            n_maxBins.append(self.get_axis(d).maxBin)
-            n_nBins.append(self.get_axis(d).nbins)
+        The values of all cells are multiplied by 'factor'
 
-        result = HistND(self.dimension, n_minBins, n_maxBins, n_nBins)
+        Args:
+            factor (float): the value to scale the histogram
 
-        for i_cell in range(result.cells):
-            idx_bins = result.cell_to_bins(i_cell)
+            scale_errors (bool): if true then it also scales the errors per dimension
 
-            pos = []
-            for d, id_bin in enumerate(idx_bins):
-                pos.append(result.get_axis(d).get_bin_center(id_bin))
+        Returns:
+            none.
+        """
+        self._integralTable = None
+        self._binSumWeightsValues2 *= factor * factor
+        self._binsEntries *= factor
 
-            val1 = self.get_pos_content(*pos)
-            val2 = other.get_pos_content(*pos)
+        self._sumWeights = factor * self._sumWeights
+        self._sumWeights2 = factor * factor * self._sumWeights2
 
-            result.fill_cell(i_cell, weight=val1 - val2)
+        if scale_errors:
+            for d in range(self.dimension):
+                self._sumWeightsX[d] = factor * self._sumWeightsX[d]
+                self._sumWeightsX2[d] = factor * self._sumWeightsX2[d]
 
-        return result
+        return self
 
-    def __mul__(self, other):
-        """Multiply 2 histograms
+    def lazy(self):
+        """ Returns this histogram as the operand of a lazy expression.
+
+        The operators (+, -, *, /) applied to the returned expression build an expression tree instead of computing
+        intermediate histograms. The whole expression is computed in a single pass, when calling its ``evaluate()``
+        method or when reading it. See :py:class:`HistExpr <qksplot.expr.HistExpr>`.
+
+        Returns:
+            HistExpr.
+        """
+        from .expr import HistExpr  # the expressions are built on top of this module
+        return HistExpr(self)
+
+    def merge(self, other):
+        """ Adds the entries of another histogram to this histogram, in place.
+
+        When both histograms have the same bins (the usual case when summing histograms filled from different data
+        sets) the cells and all the statistics (entries, sums of weights, ...) are added element by element, without
+        creating a new histogram. Otherwise this histogram is replaced by the sum ``self + other`` (see
+        :py:meth:`__add__`), covering the ranges of both histograms.
 
         Args:
-            other (HistND): a histogram of the same dimension.
+            other (HistND): another histogram.
 
         Returns:
-            HistND. The multiplication of the 2 histograms
+            HistND. This histogram.
+
+        Raises:
+            ValueError: if the bins differ and the cells of this histogram are stored in a file (see :py:attr:`path`)
         """
-        n_dims = min(self.dimension, other.dimension)
+        if self._same_binning(other):
+            self._add_same_binning(other)
+        else:
+            self._assign(self._combine(other, np.add))
+        return self
 
-        n_minBins = []
-        n_maxBins = []
-        n_nBins = []
-        for d in range(n_dims):
-            n_minBins.append(min(self.get_axis(d).minBin, other.get_axis(d).minBin))
-            n_maxBins.append(max(self.get_axis(d).maxBin, other.get_axis(d).maxBin))
-            n_density = self.get_axis(d).density()
-            n_nBins.append(int(n_density * (n_maxBins[d] - n_minBins[d])))
+    def __iadd__(self, other):
+        """ Adds to this histogram, in place, another histogram (see :py:meth:`merge`), a number or an array.
 
-        for d in range(n_dims, self.dimension):
-            n_minBins.append(self.get_axis(d).minBin)
-            n_maxBins.append(self.get_axis(d).maxBin)
-            n_nBins.append(self.get_axis(d).nbins)
+        A number is added to the content of every cell. An array gives the value to add to each cell: it has the shape
+        of the histogram (see :py:attr:`shape`) or one value per cell (indexed by cell). The errors are not changed.
 
-        result = HistND(self.dimension, n_minBins, n_maxBins, n_nBins)
+        Returns:
+            HistND. This histogram.
+        """
+        if isinstance(other, HistND):
+            return self.merge(other)
+        return self._operate(other, np.add)
 
-        for i_cell in range(result.cells):
-            idx_bins = result.cell_to_bins(i_cell)
+    def __isub__(self, other):
+        """ Substracts from this histogram, in place, another histogram, a number or an array.
 
-            pos = []
-            for d, id_bin in enumerate(idx_bins):
-                pos.append(result.get_axis(d).get_bin_center(id_bin))
+        With a histogram, this histogram becomes ``self - other`` (see :py:meth:`__sub__`), but reusing its cells when
+        both have the same bins. For numbers and arrays see :py:meth:`__iadd__`.
+
+        Returns:
+            HistND. This histogram.
+        """
+        return self._operate(other, np.subtract)
 
-            val1 = self.get_pos_content(*pos)
-            val2 = other.get_pos_content(*pos)
+    def __imul__(self, other):
+        """ Multiplies this histogram, in place, by another histogram, a number or an array.
 
-            result.fill_cell(i_cell, weight=val1 * val2)
+        With a histogram, this histogram becomes ``self * other`` (see :py:meth:`__mul__`), but reusing its cells when
+        both have the same bins. A number multiplies the contents of all cells, an array multiplies each cell by its
+        value (see :py:meth:`__iadd__`). The errors are multiplied as well.
 
-        return result
+        Returns:
+            HistND. This histogram.
+        """
+        return self._operate(other, np.multiply)
 
-    def __truediv__(self, other):
-        """Divide 2 histograms
+    def __itruediv__(self, other):
+        """ Divides this histogram, in place, by another histogram, a number or an array. See :py:meth:`__imul__`.
+
+        Dividing by zero gives zero.
+
+        Returns:
+            HistND. This histogram.
+        """
+        return self._operate(other, _divide)
+
+    def _as_cells_operand(self, other) -> np.ndarray:
+        """ Returns 'other', a number or an array of values for the cells, as a 0-d array or as an array of cells """
+        other = np.asarray(other, dtype=np.float64)
+        if other.ndim == 0:
+            return other
+        if other.shape == self.shape:
+            return other.ravel(order='F')
+        if other.shape == (self.cells,):
+            return other
+
+        raise BufferError("the array must have the shape of the histogram " + str(self.shape) +
+                          " or one value per cell. Provided: " + str(other.shape))
+
+    def _operate(self, other, op):
+        """ Does the in place operation 'self = op(self, other)', where 'op' is one of: np.add, np.subtract,
+        np.multiply or _divide. 'other' is a histogram, a number or an array of values for the cells """
+        if isinstance(other, HistND):
+            if self._sparse or not self._same_binning(other):
+                self._assign(self._combine(other, op))
+                return self
+
+            values = op(self._get_contents_of(), other._get_contents_of())
+            self._reset_statistics()
+            self._binsEntries.fill(0.0)
+            self._binSumWeightsValues2.fill(0.0)
+            self._fill_cells(values)
+            return self
+
+        other = self._as_cells_operand(other)
+        if self._sparse and other.ndim == 0 and (op is np.add or op is np.subtract) and other != 0.0:
+            raise ValueError("a number can not be added to (or subtracted from) a sparse histogram: it would fill "
+                             "every cell")
+        self._integralTable = None
+        if op is np.add or op is np.subtract:
+            delta = np.broadcast_to(op(0.0, other), (self.cells,))
+            self._binsEntries += delta
+            self._sumWeights += float(delta.sum())
+            self._add_weights_at_centers(delta)
+            return self
+
+        factor = other if op is np.multiply else _divide(np.ones(other.shape), other)
+        if factor.ndim == 0:
+            return self.scale(float(factor), scale_errors=True)
+
+        # only the filled cells are changed
+        cells = self._get_nonempty_cells()
+        factor = factor[cells]
+        values = self._binsEntries[cells]
+        self._binsEntries[cells] = values * factor
+        self._binSumWeightsValues2[cells] = self._binSumWeightsValues2[cells] * factor * factor
+
+        self._sumWeights = float(self._binsEntries.sum())
+        self._sumWeights2 = float(self._binSumWeightsValues2.sum())
+        self._add_weights_at_centers(values * factor - values, cells)
+        return self
+
+    def _assign(self, other) -> None:
+        """ Makes this histogram hold the bins, the cells and the statistics of 'other'. The title is kept.
+
+        Raises:
+            ValueError: if the cells of this histogram are stored in a file, whose size is fixed by the bins.
+        """
+        if self._path is not None:
+            raise ValueError("the bins of a histogram stored in a file (" + str(self._path) + ") can not change: "
+                             "the operands must have the same bins")
+        title = self._title
+        self.__dict__.update(other.__dict__)
+        self._title = title
+
+    def __add__(self, other):
+        """Adds 2 histograms
 
         Args:
-            other (HistND): a histogram of the same dimension.
+            other (HistND): another histogram, not necessary of the same dimension.
 
         Returns:
             HistND. The sum of the 2 histograms
+
         """
-        n_dims = min(self.dimension, other.dimension)
+        if not isinstance(other, HistND):
+            return NotImplemented
+        return self._combine(other, np.add)
+
+    def __sub__(self, other):
+        """Substract 2 histograms
 
-        n_minBins = []
-        n_maxBins = []
-        n_nBins = []
-        for d in range(n_dims):
-            n_minBins.append(min(self.get_axis(d).minBin, other.get_axis(d).minBin))
-            n_maxBins.append(max(self.get_axis(d).maxBin, other.get_axis(d).maxBin))
-            n_density = self.get_axis(d).density()
-            n_nBins.append(int(n_density * (n_maxBins[d] - n_minBins[d])))
+        Args:
+            other (HistND): another histogram, not necessary of the same dimension.
 
-        for d in range(n_dims, self.dimension):
-            n_minBins.append(self.get_axis(d).minBin)
-            n_maxBins.append(self.get_axis(d).maxBin)
-            n_nBins.append(self.get_axis(d).nbins)
+        Returns:
+            HistND. The difference of the 2 histograms
+        """
+        if not isinstance(other, HistND):
+            return NotImplemented
+        return self._combine(other, np.subtract)
 
-        result = HistND(self.dimension, n_minBins, n_maxBins, n_nBins)
+    def __mul__(self, other):
+        """Multiply 2 histograms
 
-        for i_cell in range(result.cells):
-            idx_bins = result.cell_to_bins(i_cell)
+        Args:
+            other (HistND): a histogram of the same dimension.
 
-            pos = []
-            for d, id_bin in enumerate(idx_bins):
-                pos.append(result.get_axis(d).get_bin_center(id_bin))
+        Returns:
+            HistND. The multiplication of the 2 histograms
+        """
+        if not isinstance(other, HistND):
+            return NotImplemented
+        return self._combine(other, np.multiply)
 
-            val1 = self.get_pos_content(*pos)
-            val2 = other.get_pos_content(*pos)
-            if val2 == 0:
-                result.fill_cell(i_cell, weight=0)
-            else:
-                result.fill_cell(i_cell, weight=val1 / val2)
+    def __truediv__(self, other):
+        """Divide 2 histograms
 
-        return result
+        Args:
+            other (HistND): a histogram of the same dimension.
+
+        Returns:
+            HistND. The sum of the 2 histograms
+        """
+        if not isinstance(other, HistND):
+            return NotImplemented
+        return self._combine(other, _divide)
 
     def integral(self, minCellId: int=0, maxCellId: int=None) -> float:
         """ Computes integral over cells range '[minCellId, maxCellId]'
@@ -917,23 +2231,29 @@ class HistND:
             warnings.warn("minCellId is bigger or equal to the maxCellId. Returning zero..")
             return 0.0
 
-        result = 0.0
-        for i_cell in range(a, b):
-            value = self.get_cell_content(i_cell)
-            cellBins = self.cell_to_bins(i_cell)
-            volume = 1.0
-            for d, b in enumerate(cellBins):
-                volume = volume * self.get_axis(d).get_bin_width(b)
-            result += value * volume
-        return result
+        if self._sparse:
+            cells = self._get_nonempty_cells()
+            cells = cells[(cells >= a) & (cells < b)]
+            return float(np.dot(self._get_contents_of(cells), self._get_cells_volumes(cells)))
+
+        if self._path is not None:  # stored in a file: read the cells by chunks
+            return sum(self._integrate_cells(np.arange(c, min(c + _FILE_CHUNK_CELLS, b)))
+                       for c in range(a, b, _FILE_CHUNK_CELLS))
+
+        values = self._get_contents_of()[a:b]
+        return float(np.dot(values, self._get_cells_volumes()[a:b]))
 
     def integral_over_bins(self, minBinsIds: Sequence, maxBinsIds: Sequence) -> float:
-        """ Computes integral over bins range
+        """ Computes integral over the box of bins '[minBinsIds, maxBinsIds)'
+
+        The box holds the cells whose bin on each dimension d is such that: minBinsIds[d] <= bin < maxBinsIds[d].
+        For dense histograms it is computed in constant time from a summed-area table of the cells (see
+        :py:meth:`_get_integral_table`).
 
         Args:
             minBinsIds (Sequence): an array of ints containing the minimum bins over each dimension
 
-            maxBinsIds (Sequence): an array of ints containing the maximum bins over each dimension
+            maxBinsIds (Sequence): an array of ints containing the maximum bins over each dimension (excluded)
 
         Returns:
             float.
@@ -941,14 +2261,47 @@ class HistND:
         See Also:
             :py:meth:`integral`, :py:meth:`integral_over_pos`
         """
-        min_cell_id = self.bins_to_cell(*minBinsIds)
-        max_cell_id = self.bins_to_cell(*maxBinsIds)
+        if len(minBinsIds) != self.dimension or len(maxBinsIds) != self.dimension:
+            raise BufferError("the bins must have the same size as the histogram's dimension")
 
-        return self.integral(min_cell_id, max_cell_id)
+        lower = np.clip(np.asarray(minBinsIds, dtype=np.intp), 0, self.shape)
+        upper = np.clip(np.asarray(maxBinsIds, dtype=np.intp), 0, self.shape)
+        if np.any(lower >= upper):
+            return 0.0
+
+        if self._sparse:
+            cells = self._get_nonempty_cells()
+            bins = np.unravel_index(cells, self.shape, order='F')
+            inside = np.ones(len(cells), dtype=bool)
+            for d in range(self.dimension):
+                inside &= (bins[d] >= lower[d]) & (bins[d] < upper[d])
+            cells = cells[inside]
+            return float(np.dot(self._get_contents_of(cells), self._get_cells_volumes(cells)))
+
+        if self._path is not None:  # stored in a file: read the box by chunks instead of building the table in memory
+            step = max(1, _FILE_CHUNK_CELLS // int(np.prod(upper[:-1] - lower[:-1])))
+            result = 0.0
+            for k in range(lower[-1], upper[-1], step):
+                chunkLower, chunkUpper = lower.copy(), upper.copy()
+                chunkLower[-1], chunkUpper[-1] = k, min(k + step, upper[-1])
+                result += self._integrate_cells(self._get_box_cells(chunkLower, chunkUpper))
+            return result
+
+        # inclusion-exclusion over the corners of the box
+        table = self._get_integral_table()
+        result = 0.0
+        for corner in itertools.product((False, True), repeat=self.dimension):
+            idx = tuple(np.where(corner, upper, lower))
+            result += table[idx] if (self.dimension - sum(corner)) % 2 == 0 else -table[idx]
+        return float(result)
 
     def integral_over_pos(self, minPos: Sequence, maxPos: Sequence) -> float:
         """ Computes integral between 2 positions.
 
+        The integral is done over the box of bins from the bins containing 'minPos' up to the bins containing
+        'maxPos' (excluded), see :py:meth:`integral_over_bins`. Positions beyond the upper edge of an axis include
+        its last bin.
+
         Args:
             minPos (Sequence): an array of floats containing the minimum position on each dimension
 
@@ -958,12 +2311,48 @@ class HistND:
             float.
 
         See Also:
-            :py:meth:`integral`, :py:meth:`integral_over_pos`
+            :py:meth:`integral`, :py:meth:`integral_over_bins`
         """
-        min_cell_id = self.pos_to_cell(*minPos)
-        max_cell_id = self.pos_to_cell(*maxPos)
+        if len(minPos) != self.dimension or len(maxPos) != self.dimension:
+            raise BufferError("the positions must have the same size as the histogram's dimension")
+
+        def bound(axis, x):
+            if x < axis.minBin:
+                return 0
+            if x >= axis.maxBin:
+                return axis.nbins
+            return axis.get_bin(x)
+
+        return self.integral_over_bins([bound(axis, x) for axis, x in zip(self._axes, minPos)],
+                                       [bound(axis, x) for axis, x in zip(self._axes, maxPos)])
+
+    def _integrate_cells(self, cells: np.ndarray) -> float:
+        """ Returns the integral over the cells 'cells' (an array of cell indexes) """
+        return float(np.dot(self._get_contents_of(cells), self._get_cells_volumes(cells)))
+
+    def _get_box_cells(self, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        """ Returns the indexes of the cells whose bins are in '[lower, upper)' on each axis """
+        cells = np.zeros(1, dtype=np.intp)
+        for d in range(self.dimension):
+            cells = np.add.outer(self._sizeOverDims[d] * np.arange(lower[d], upper[d]), cells).ravel()
+        return cells
+
+    def _get_integral_table(self) -> np.ndarray:
+        """ Returns the summed-area table of the histogram, built on first use and dropped when the cells change.
 
-        return self.integral(min_cell_id, max_cell_id)
+        It is an array with one more bin than the histogram on each axis. Its element [i0, i1, ...] is the integral
+        over the cells whose bins are lower than i0 on the first axis, lower than i1 on the second axis, etc.
+        """
+        table = self._integralTable
+        if table is None:
+            grid = (self._get_contents_of() * self._get_cells_volumes()).reshape(self.shape, order='F')
+            for d in range(self.dimension):
+                grid = np.cumsum(grid, axis=d)
+            table = np.zeros([n + 1 for n in self.shape])
+            table[(slice(1, None),) * self.dimension] = grid
+            if not (self._sharedCells or isinstance(self._binsEntries, CellsView)):  # else changed without notice
+                self._integralTable = table
+        return table
 
 
 class Hist1D(HistND):
@@ -977,9 +2366,11 @@ class Hist1D(HistND):
         nBins (integer): the number of bins
 
         title (string): the title of the histogram
+
+        edges (Sequence): optional, the edges of the bins (or a :py:class:`HistAxis`), replacing nBins, minBin, maxBin
     """
-    def __init__(self, nBins: int, minBin: float, maxBin: float, title=str()):
-        HistND.__init__(self, 1, [minBin], [maxBin], [nBins], title)
+    def __init__(self, nBins: int=None, minBin: float=None, maxBin: float=None, title=str(), edges=None):
+        HistND.__init__(self, 1, [minBin], [maxBin], [nBins], title, edges=[edges])
 
 
 class Hist2D(HistND):
@@ -999,9 +2390,17 @@ class Hist2D(HistND):
         maxBinY (float): the maximum value of upper edge of bins on the Y-axis
 
         title (string): the title of the histogram
+
+        edgesX (Sequence): optional, the edges of the bins (or a :py:class:`HistAxis`) on the X-axis, replacing
+            nBinsX, minBinX, maxBinX
+
+        edgesY (Sequence): optional, the edges of the bins (or a :py:class:`HistAxis`) on the Y-axis, replacing
+            nBinsY, minBinY, maxBinY
     """
-    def __init__(self, nBinsX, minBinX, maxBinX, nBinsY, minBinY, maxBinY, title=str()):
-        HistND.__init__(self, 2, [minBinX, minBinY], [maxBinX, maxBinY], [nBinsX, nBinsY], title)
+    def __init__(self, nBinsX=None, minBinX=None, maxBinX=None, nBinsY=None, minBinY=None, maxBinY=None, title=str(),
+                 edgesX=None, edgesY=None):
+        HistND.__init__(self, 2, [minBinX, minBinY], [maxBinX, maxBinY], [nBinsX, nBinsY], title,
+                        edges=[edgesX, edgesY])
 
     def projection_x(self):
         """ Project this histogram on the X-axis
@@ -1043,10 +2442,20 @@ class Hist3D(HistND):
         maxBinZ (float): the maximum value of upper edge of bins on the Z-axis
 
         title (string): the title of the histogram
+
+        edgesX (Sequence): optional, the edges of the bins (or a :py:class:`HistAxis`) on the X-axis, replacing
+            nBinsX, minBinX, maxBinX
+
+        edgesY (Sequence): optional, the edges of the bins (or a :py:class:`HistAxis`) on the Y-axis, replacing
+            nBinsY, minBinY, maxBinY
+
+        edgesZ (Sequence): optional, the edges of the bins (or a :py:class:`HistAxis`) on the Z-axis, replacing
+            nBinsZ, minBinZ, maxBinZ
     """
-    def __init__(self, nBinsX, minBinX, maxBinX, nBinsY, minBinY, maxBinY, nBinsZ, minBinZ, maxBinZ, title=str()):
+    def __init__(self, nBinsX=None, minBinX=None, maxBinX=None, nBinsY=None, minBinY=None, maxBinY=None, nBinsZ=None,
+                 minBinZ=None, maxBinZ=None, title=str(), edgesX=None, edgesY=None, edgesZ=None):
         HistND.__init__(self, 3, [minBinX, minBinY, minBinZ], [maxBinX, maxBinY, maxBinZ], [nBinsX, nBinsY, nBinsZ],
-                        title)
+                        title, edges=[edgesX, edgesY, edgesZ])
 
     def projection_x(self):
         """ Project this histogram on the X-axis
@@ -1070,7 +2479,7 @@ class Hist3D(HistND):
          Returns:
             HistND. The projected histogram has dimension 1.
         """
-        return self.projection(1)
+        return self.projection(2)
 
     def projection_xy(self):
         """ Project this histogram on the X-axis and Y-axis
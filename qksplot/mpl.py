@@ -19,8 +19,7 @@ def plot_h1(h: hist.HistND):
     if h.dimension != 1:
         return
     xbins = h.get_bins_edges(True)
-    x = h.get_bins_centers()
-    w = h.get_cells_contents()
+    _, _, x, w, _ = h.nonzero_cells()
 
     plt.xlabel(h.get_axis(0).title)
     plt.title(h.title)
@@ -31,8 +30,7 @@ def plot_h2(h: hist.HistND):
     if h.dimension != 2:
         return
     axis_bins = h.get_bins_edges(True)
-    centers = h.get_bins_centers()
-    w = h.get_cells_contents()
+    _, _, centers, w, _ = h.nonzero_cells()
 
     plt.xlabel(h.get_axis(0).title)
     plt.ylabel(h.get_axis(1).title)
@@ -56,10 +54,8 @@ def plot_prof1(p: hist.HistND):
     if p.dimension != 1:
         return
 
-    x = p.get_bins_centers()
-    y = p.get_cells_contents()
+    _, _, x, y, err_y = p.nonzero_cells()
     err_x = p.get_axis(0).get_bin_width(0)
-    err_y = p.get_cells_contents_errors()
 
     plt.figure()
     plt.xlabel(p.get_axis(0).title)
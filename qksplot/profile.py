@@ -9,7 +9,8 @@ Note:
 
 import math
 import warnings
-from typing import List, Sequence, Optional
+import numpy as np
+from typing import Sequence, Optional, Tuple
 
 from . import hist as h
 
@@ -44,15 +45,28 @@ class ProfileND(h.HistND):
             the highest value accepted on Y (vertical axis).
             This filter is not used when maxValue is None
 
+        edges (Sequence): optional, the bins of each dimension given explicitly, as an array of edges or as a
+            :py:class:`HistAxis <qksplot.hist.HistAxis>`. Use None for the dimensions whose bins are given by minBin,
+            maxBin and nBins.
+
+        sparse (bool): if True, only the filled cells are stored instead of allocating all cells.
+
+        path (str or os.PathLike): optional, a file to create to store the cells (memory mapped) instead of the memory.
+            See :py:class:`HistND <qksplot.hist.HistND>`.
+
     """
     _sumWeightedValues: int
     _sumWeightedValues2: int
-    _binSumWeightsValues2: List[float]
+    _binsValues: np.ndarray
+    _binSumWeightedValues2: np.ndarray
 
-    def __init__(self, dim: int, minBin: Sequence, maxBin: Sequence, nBins: Sequence, minValue: float=None,
-                 maxValue: float=None, title=str()):
-        h.HistND.__init__(self, dim, minBin, maxBin, nBins, title)
+    _SAVED_ATTRIBUTES = h.HistND._SAVED_ATTRIBUTES + ('_minValue', '_maxValue', '_sumWeightedValues',
+                                                      '_sumWeightedValues2')
+    _SAVED_CELLS = h.HistND._SAVED_CELLS + ('_binsValues', '_binSumWeightedValues2')
 
+    def __init__(self, dim: int, minBin: Sequence=None, maxBin: Sequence=None, nBins: Sequence=None,
+                 minValue: float=None, maxValue: float=None, title=str(), edges: Sequence=None, sparse: bool=False,
+                 path=None):
         self._minValue = minValue
         self._maxValue = maxValue
 
@@ -63,12 +77,11 @@ class ProfileND(h.HistND):
         self._sumWeightedValues = 0  # Total Sum of weight*Y
         self._sumWeightedValues2 = 0  # Total Sum of weight*Y*Y
 
-        self._binsValues = []  # contains the values per cell (global linear bin)
-        self._binSumWeightsValues2 = []  # array of sum of weighted squared values per cell
+        # set before creating the histogram: they are written in the file storing the cells (if any)
+        h.HistND.__init__(self, dim, minBin, maxBin, nBins, title, edges=edges, sparse=sparse, path=path)
 
-        for v in range(self.cells):
-            self._binsValues.append(0)
-            self._binSumWeightsValues2.append(0)
+        self._binsValues = self._new_cells("_binsValues")  # contains the values per cell (global linear bin)
+        self._binSumWeightedValues2 = self._new_cells("_binSumWeightedValues2")  # sum of weighted squared values
 
     @property
     def minY(self):
@@ -81,12 +94,37 @@ class ProfileND(h.HistND):
     def _get_std_deviation(self, j: int):
         H = self._binsValues[j]
         L = self._binsEntries[j]
-        E = self._binSumWeightsValues2[j]
+        E = self._binSumWeightedValues2[j]
         q = E*L - H*H
         if L == 0:
             return 0
         else:
-            return math.sqrt(E * L - H * H)/L  # std deviation = sqrt(rms**2 - mean**2)
+            return math.sqrt(max(q, 0.0))/L  # std deviation = sqrt(rms**2 - mean**2)
+
+    def _get_contents_of(self, cells: np.ndarray=None) -> np.ndarray:
+        """ Returns the means of the cells 'cells' (an array of cell indexes), or of all cells if None """
+        L = h._take(self._binsEntries, cells)
+        return np.divide(h._take(self._binsValues, cells), L, out=np.zeros(len(L)), where=L != 0)
+
+    def _get_errors_of(self, cells: np.ndarray=None) -> np.ndarray:
+        """ Returns the errors of the cells 'cells' (an array of cell indexes), or of all cells if None """
+        H = h._take(self._binsValues, cells)
+        L = h._take(self._binsEntries, cells)
+        E = h._take(self._binSumWeightedValues2, cells)
+        q = np.maximum(E*L - H*H, 0.0)
+        return np.divide(np.sqrt(q), L * np.sqrt(np.abs(L)), out=np.zeros(len(L)), where=L != 0)
+
+    def _get_contents_at(self, hist) -> np.ndarray:
+        """ Returns the means of this profile rebinned to the cells of 'hist': the weighted means of the overlapped
+        cells """
+        L = self._rebin(self._binsEntries, hist)
+        return np.divide(self._rebin(self._binsValues, hist), L, out=np.zeros(len(L)), where=L != 0)
+
+    def _get_contents_items_at(self, hist):
+        keys, L = self._rebin_items(self._binsEntries, hist)
+        valuesKeys, H = self._rebin_items(self._binsValues, hist)
+        H = h._lookup(valuesKeys, H, keys)
+        return keys, np.divide(H, L, out=np.zeros(len(L)), where=L != 0)
 
     def get_cell_content(self, i: int) -> float:
         """ Returns the content of the cell 'i'
@@ -103,29 +141,6 @@ class ProfileND(h.HistND):
         else:
             return self._binsValues[i] / n
 
-    def get_cells_contents(self, includeEmptyBins=False) -> List[float]:
-        """ Returns the contents of all bins (cells) per each dimension.
-        By default it **does not** include empty cells.
-
-       Args:
-           includeEmptyBins (bool): if empty bins are included in the list.
-               If True then empty bins are included, otherwise they are NOT included
-
-       Returns:
-           list of list.
-       """
-        result = []
-        for i_cell in range(self.cells):
-            L = self._binsEntries[i_cell]
-            if L == 0:
-                if includeEmptyBins:
-                    result.append(0)
-                else:
-                    continue
-            else:
-                result.append(self._binsValues[i_cell] / L)
-        return result
-
     def get_cell_content_error(self, i: int) -> float:
         """Returns the error value associated with cell 'i'
 
@@ -143,7 +158,7 @@ class ProfileND(h.HistND):
         else:
             return self._get_std_deviation(i) / math.sqrt(self._binsEntries[i])
 
-    def get_cells_contents_errors(self, includeEmptyBins=False) -> List[float]:
+    def get_cells_contents_errors(self, includeEmptyBins=False) -> np.ndarray:
         """ Returns a list containing the errors on the Y axis associated to each bin.
         By default it **does not** include empty bins.
 
@@ -154,19 +169,9 @@ class ProfileND(h.HistND):
                 If True then empty bins are included, otherwise they are NOT included
 
         Returns:
-            list.
+            np.ndarray.
         """
-        result = []
-        for iBin in range(self.cells):
-            L = self._binsEntries[iBin]
-            if L == 0:
-                if includeEmptyBins:
-                    result.append(0)
-                else:
-                    continue
-            else:
-                result.append(self._get_std_deviation(iBin) / math.sqrt(self._binsEntries[iBin]))
-        return result
+        return super(ProfileND, self).get_cells_contents_errors(includeEmptyBins)
 
     def fill_cell(self, i_cell: int, **kwargs) -> int:
         """ Fill the profile using global cell index.
@@ -213,7 +218,7 @@ class ProfileND(h.HistND):
         # NB: otherwise the fill() will contain illegal data and fail when computing standard_deviation()
         if i_cell >= 0 and error_per_bin:
             self._binsValues[i_cell] += weight * value
-            self._binSumWeightsValues2[i_cell] += weight * value * value
+            self._binSumWeightedValues2[i_cell] += weight * value * value
             self._sumWeightedValues += weight * value
             self._sumWeightedValues2 += weight * value * value
         return i_cell
@@ -251,7 +256,7 @@ class ProfileND(h.HistND):
         weight = kwargs.get("weight", 1.0)
         if i_cell >= 0:
             self._binsValues[i_cell] += weight * value
-            self._binSumWeightsValues2[i_cell] += weight * value * value
+            self._binSumWeightedValues2[i_cell] += weight * value * value
             self._sumWeightedValues += weight * value
             self._sumWeightedValues2 += weight * value * value
         return i_cell
@@ -289,11 +294,225 @@ class ProfileND(h.HistND):
         weight = kwargs.get("weight", 1.0)
         if i_cell >= 0:
             self._binsValues[i_cell] += weight * value
-            self._binSumWeightsValues2[i_cell] += weight * value * value
+            self._binSumWeightedValues2[i_cell] += weight * value * value
             self._sumWeightedValues += weight * value
             self._sumWeightedValues2 += weight * value * value
         return i_cell
 
+    def fill_many(self, *args, values=None, weights=None) -> np.ndarray:
+        """ Fill the profile with many entries at once.
+
+        This gives the same result as calling :py:meth:`fill` for each entry, but the bins are searched and the cells
+        are filled using whole arrays.
+
+        Args:
+            args (a list of parameters): one array of positions for each dimension. The number of arguments must be
+                the same as the number of dimensions. Or pass one argument as an array of shape (N, dimension).
+
+            values (array like): the value of each entry. (**Mandatory**)
+
+            weights (array like): the weight of each entry, or one weight for all of them. Defaults to 1.0
+
+        Returns:
+            np.ndarray. The **index of the affected cell (global linear bin) or -1** for each entry.
+
+        See Also:
+            :py:meth:`fill`, :py:meth:`fill_pos`
+        """
+        if values is None:
+            raise ValueError("Argument 'values' can not be None")
+
+        columns = self._get_positions_columns(args)
+        n = len(columns[0])
+        values = np.broadcast_to(np.asarray(values, dtype=np.float64), (n,))
+        weights = h._as_weights(weights, n)
+
+        accepted = np.ones(n, dtype=bool)
+        if self._minValue is not None:  # ignore filtered data
+            accepted &= ~(values < self._minValue)
+        if self._maxValue is not None:  # ignore filtered data
+            accepted &= ~(values > self._maxValue)
+
+        cells = np.full(n, -1, dtype=np.intp)
+        cells[accepted] = self._fill_columns([x[accepted] for x in columns], weights[accepted])
+
+        filled = cells >= 0
+        wv = weights[filled] * values[filled]
+        wv2 = wv * values[filled]
+        h._add_at(self._binsValues, cells[filled], wv)
+        h._add_at(self._binSumWeightedValues2, cells[filled], wv2)
+        self._sumWeightedValues += float(wv.sum())
+        self._sumWeightedValues2 += float(wv2.sum())
+
+        return cells
+
+    def fill_stream(self, iterable, chunk_size: int=65536, columns: Sequence=None, value_column=None,
+                    weight_column=None) -> int:
+        """ Fill the profile with the entries read from an iterable (a generator for example), chunk by chunk.
+
+        The entries are gathered in chunks of at most 'chunk_size' entries and each chunk is filled like
+        :py:meth:`fill_many` does. So only one chunk is kept in memory at a time.
+
+        The iterable can yield:
+            - single entries: a tuple (or list) with the positions on each dimension followed by the value, and
+              optionally by the weight
+            - batches of entries as a dict of columns (name -> array), or as a numpy structured (record) array
+            - batches of entries as a 2 dimensional numpy array, one entry per row (laid out like the tuples)
+
+        Args:
+            iterable (Iterable): the entries to fill
+
+            chunk_size (int): the maximum number of entries filled at once. Defaults to 65536
+
+            columns (Sequence): for dicts and record arrays, the names of the columns holding the positions, one per
+                dimension. Defaults to the first columns, other than the value and weight columns.
+
+            value_column (str): for dicts and record arrays, the name of the column holding the values.
+                (**Mandatory** for dicts and record arrays)
+
+            weight_column (str): for dicts and record arrays, the name of the column holding the weights.
+                Defaults to None meaning all weights are 1.0
+
+        Returns:
+            int. The number of entries read.
+
+        See Also:
+            :py:meth:`fill_many`
+        """
+        n = 0
+        chunks = h._iter_chunks(iterable, self.dimension, chunk_size, columns, [value_column, weight_column])
+        for positions, (values, weights) in chunks:
+            if values is None:
+                raise ValueError("The entries have no values. Provided: value_column=" + str(value_column))
+            self.fill_many(*positions, values=values, weights=weights)
+            n += len(positions[0])
+        return n
+
+    def fill_parallel(self, *args, values=None, weights=None, processes: int=None, executor=None) -> int:
+        """ Fill the profile with many entries at once, using several processes.
+
+        The entries are split in contiguous shards, one per process. Each process fills, like :py:meth:`fill_many`
+        does, a private profile with the same bins as this one. The shards are then merged into this profile, in
+        order, by summing their cells and their statistics.
+
+        Args:
+            args (a list of parameters): one array of positions for each dimension. The number of arguments must be
+                the same as the number of dimensions. Or pass one argument as an array of shape (N, dimension).
+
+            values (array like): the value of each entry. (**Mandatory**)
+
+            weights (array like): the weight of each entry, or one weight for all of them. Defaults to 1.0
+
+            processes (int): the number of shards (and of processes). Defaults to the number of CPUs.
+
+            executor (concurrent.futures.Executor): optional, an executor (a process pool) to reuse between calls.
+
+        Returns:
+            int. The number of entries read.
+
+        See Also:
+            :py:meth:`fill_many`
+        """
+        if values is None:
+            raise ValueError("Argument 'values' can not be None")
+
+        columns = self._get_positions_columns(args)
+        n = len(columns[0])
+        arrays = {"values": np.broadcast_to(np.asarray(values, dtype=np.float64), (n,)),
+                  "weights": h._as_weights(weights, n)}
+        return self._fill_parallel(columns, arrays, processes, executor)
+
+    def merge(self, other):
+        """ Adds the entries of another profile to this profile, in place.
+
+        The cells, the values and all the statistics are added element by element. Unlike histograms, the profiles
+        can only be merged when they have the same bins.
+
+        Args:
+            other (ProfileND): another profile with the same bins.
+
+        Returns:
+            ProfileND. This profile.
+        """
+        if not isinstance(other, ProfileND):
+            raise TypeError("a profile can only be merged with another profile. Provided: " + type(other).__name__)
+        if not self._same_binning(other):
+            raise ValueError("the profiles can only be merged when they have the same bins")
+
+        self._add_same_binning(other)
+        return self
+
+    def _new_like(self, axes: Sequence, title: str):
+        return ProfileND(len(axes), minValue=self._minValue, maxValue=self._maxValue, title=title, edges=axes,
+                         sparse=self._sparse)
+
+    @classmethod
+    def from_numpy(cls, counts, edges: Sequence, sumWeights2=None, title: str=str()):
+        """ Not supported: an array of counts does not hold the values of a profile """
+        raise TypeError("a profile can not be created from an array of counts")
+
+    def _get_contents_grid(self, share: bool=True) -> Tuple[np.ndarray, bool]:
+        # the means are computed: a new array, never a view of the cells
+        return self._get_contents_of().reshape(self.shape, order='F'), False
+
+    def _set_statistics_from_cells(self) -> None:
+        super(ProfileND, self)._set_statistics_from_cells()
+        self._sumWeightedValues = float(self._binsValues.sum())
+        self._sumWeightedValues2 = float(self._binSumWeightedValues2.sum())
+
+    def _transform_into(self, result, transform, dims: Sequence) -> None:
+        super(ProfileND, self)._transform_into(result, transform, dims)
+        result._binsValues = transform(self._binsValues)
+        result._binSumWeightedValues2 = transform(self._binSumWeightedValues2)
+        result._sumWeightedValues = self._sumWeightedValues
+        result._sumWeightedValues2 = self._sumWeightedValues2
+
+    def _operate(self, other, op):
+        """ Does the in place operation 'self = op(self, other)' on the means of the cells, where 'op' is one of:
+        np.add, np.subtract, np.multiply or _divide. 'other' is a number or an array of values for the cells """
+        if isinstance(other, h.HistND):
+            raise TypeError("a profile can only be added (+=) in place to another profile. Provided: " +
+                            type(other).__name__)
+
+        other = self._as_cells_operand(other)
+        self._integralTable = None
+        # only the cells having entries have a mean
+        cells = self._get_nonempty_cells()
+        c = other if other.ndim == 0 else other[cells]
+        H = h._take(self._binsValues, cells)
+        L = h._take(self._binsEntries, cells)
+        E = h._take(self._binSumWeightedValues2, cells)
+
+        if op is np.add or op is np.subtract:  # every value v becomes v + c
+            c = op(0.0, c)
+            E = E + 2.0 * c * H + c * c * L
+            H = H + c * L
+        else:  # every value v becomes v * c
+            if op is not np.multiply:
+                c = h._divide(np.ones(np.shape(c)), c)
+            E = E * c * c
+            H = H * c
+
+        self._binsValues[cells] = H
+        self._binSumWeightedValues2[cells] = E
+        self._sumWeightedValues = float(H.sum())
+        self._sumWeightedValues2 = float(E.sum())
+        return self
+
+    def _reset(self) -> None:
+        super(ProfileND, self)._reset()
+        self._sumWeightedValues = 0
+        self._sumWeightedValues2 = 0
+        self._binsValues = self._new_cells()
+        self._binSumWeightedValues2 = self._new_cells()
+
+    def _add_same_binning(self, other) -> None:
+        super(ProfileND, self)._add_same_binning(other)
+        self._binsValues += other._binsValues
+        self._binSumWeightedValues2 += other._binSumWeightedValues2
+        self._sumWeightedValues += other._sumWeightedValues
+        self._sumWeightedValues2 += other._sumWeightedValues2
+
     def fill(self, *args, **kwargs) -> int:
         """ Fill the profile (using coordinate positions).
 
@@ -323,9 +542,12 @@ class Profile1D(ProfileND):
         nBins (integer): the number of bins
 
         title (string): the title of the histogram
+
+        edges (Sequence): optional, the edges of the bins (or a HistAxis), replacing nBins, minBin, maxBin
     """
-    def __init__(self, nBins: int, minBin: float, maxBin: float, minValue=None, maxValue=None, title=str()):
-        ProfileND.__init__(self, 1, [minBin], [maxBin], [nBins], minValue, maxValue, title)
+    def __init__(self, nBins: int=None, minBin: float=None, maxBin: float=None, minValue=None, maxValue=None,
+                 title=str(), edges=None):
+        ProfileND.__init__(self, 1, [minBin], [maxBin], [nBins], minValue, maxValue, title, edges=[edges])
 
 
 class Profile2D(ProfileND):
@@ -345,10 +567,18 @@ class Profile2D(ProfileND):
         maxBinY (float): the maximum value of upper edge of bins on the Y-axis
 
         title (string): the title of the histogram
+
+        edgesX (Sequence): optional, the edges of the bins (or a HistAxis) on the X-axis, replacing nBinsX, minBinX,
+            maxBinX
+
+        edgesY (Sequence): optional, the edges of the bins (or a HistAxis) on the Y-axis, replacing nBinsY, minBinY,
+            maxBinY
     """
-    def __init__(self, nBinsX: int, minBinX: float, maxBinX: float, nBinsY: int, minBinY: float, maxBinY: float,
-                 minValue=None, maxValue=None, title=str()):
-        ProfileND.__init__(self, 2, [minBinX, minBinY], [maxBinX, maxBinY], [nBinsX, nBinsY], minValue, maxValue, title)
+    def __init__(self, nBinsX: int=None, minBinX: float=None, maxBinX: float=None, nBinsY: int=None,
+                 minBinY: float=None, maxBinY: float=None, minValue=None, maxValue=None, title=str(), edgesX=None,
+                 edgesY=None):
+        ProfileND.__init__(self, 2, [minBinX, minBinY], [maxBinX, maxBinY], [nBinsX, nBinsY], minValue, maxValue, title,
+                           edges=[edgesX, edgesY])
 
 
 class Profile3D(ProfileND):
@@ -374,8 +604,18 @@ class Profile3D(ProfileND):
         maxBinZ (float): the maximum value of upper edge of bins on the Z-axis
 
         title (string): the title of the histogram
+
+        edgesX (Sequence): optional, the edges of the bins (or a HistAxis) on the X-axis, replacing nBinsX, minBinX,
+            maxBinX
+
+        edgesY (Sequence): optional, the edges of the bins (or a HistAxis) on the Y-axis, replacing nBinsY, minBinY,
+            maxBinY
+
+        edgesZ (Sequence): optional, the edges of the bins (or a HistAxis) on the Z-axis, replacing nBinsZ, minBinZ,
+            maxBinZ
     """
-    def __init__(self, nBinsX: int, minBinX: float, maxBinX: float, nBinsY: int, minBinY: float, maxBinY: float,
-                 nBinsZ: int, minBinZ: float, maxBinZ: float, minValue=None, maxValue=None, title=str()):
+    def __init__(self, nBinsX: int=None, minBinX: float=None, maxBinX: float=None, nBinsY: int=None,
+                 minBinY: float=None, maxBinY: float=None, nBinsZ: int=None, minBinZ: float=None, maxBinZ: float=None,
+                 minValue=None, maxValue=None, title=str(), edgesX=None, edgesY=None, edgesZ=None):
         ProfileND.__init__(self, 3, [minBinX, minBinY, minBinZ], [maxBinX, maxBinY, maxBinZ], [nBinsX, nBinsY, nBinsZ],
-                           minValue, maxValue, title)
+                           minValue, maxValue, title, edges=[edgesX, edgesY, edgesZ])
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+This module defines the storage used for the cells of histograms, besides plain numpy arrays:
+    :class:`SparseCells <SparseCells>` - An array of cells storing only the cells that were filled
+    :class:`CellsView <CellsView>` - An array of cells over a region of the cells of another histogram, without copy
+
+"""
+
+import numpy as np
+
+__all__ = 'SparseCells', 'CellsView'
+
+
+class SparseCells:
+    """ A one dimensional array of floats, initially all zero, that stores only the cells that were set.
+
+    The cells are kept in two arrays sorted by cell index: the indexes (keys) and their values. Cells set one at a time
+    are first kept in a buffer (a dict) and merged into the arrays when the buffer gets big or when the arrays are read.
+    So the memory used grows with the number of filled cells and not with the length of the array.
+
+    It supports the subset of the numpy array interface used by the histograms: indexing with an int or an array of
+    ints, assigning, in place addition and multiplication. Use :py:meth:`add_at` to add many values at once.
+
+    Args:
+        size (int): the length of the array (the number of cells)
+    """
+    _BUFFER_SIZE = 1 << 16  # number of cells buffered before merging them into the sorted arrays
+
+    def __init__(self, size: int):
+        self._size = size
+        self._keys = np.empty(0, dtype=np.int64)  # sorted indexes of the stored cells
+        self._values = np.empty(0)  # values of the stored cells
+        self._buffer = {}  # cells set one at a time, not yet merged: {index: value}
+
+    @classmethod
+    def from_items(cls, size: int, keys: np.ndarray, values: np.ndarray):
+        """ Returns the cells whose stored indexes and values are 'keys' and 'values' (see :py:meth:`items`). The
+        arrays are used as they are, not copied: 'keys' must be sorted and unique
+
+        Args:
+            size (int): the length of the array (the number of cells)
+
+            keys (np.ndarray): the sorted indexes of the stored cells
+
+            values (np.ndarray): the values of the stored cells
+        """
+        result = cls(size)
+        result._keys = keys
+        result._values = values
+        return result
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def shape(self):
+        return self._size,
+
+    @property
+    def dtype(self):
+        return self._values.dtype
+
+    @property
+    def nnz(self) -> int:
+        """ the number of stored cells """
+        self._flush()
+        return len(self._keys)
+
+    def _flush(self) -> None:
+        """ merges the buffered cells into the sorted arrays """
+        if not self._buffer:
+            return
+
+        keys = np.fromiter(self._buffer.keys(), dtype=np.int64, count=len(self._buffer))
+        values = np.fromiter(self._buffer.values(), dtype=np.float64, count=len(self._buffer))
+        self._buffer = {}
+        self._merge(keys, values, add=False)
+
+    def _merge(self, keys: np.ndarray, values: np.ndarray, add: bool) -> None:
+        """ sets (or adds to) the cells 'keys' the 'values'. The keys must be unique """
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        values = values[order]
+
+        pos = np.searchsorted(self._keys, keys)
+        found = pos < len(self._keys)
+        found[found] = self._keys[pos[found]] == keys[found]
+
+        if add:
+            self._values[pos[found]] += values[found]
+        else:
+            self._values[pos[found]] = values[found]
+
+        new = ~found
+        if new.any():
+            self._keys = np.insert(self._keys, pos[new], keys[new])
+            self._values = np.insert(self._values, pos[new], values[new])
+
+    def _check_index(self, i: int) -> int:
+        if not 0 <= i < self._size:
+            raise IndexError("index " + str(i) + " is out of bounds for SparseCells of size " + str(self._size))
+        return i
+
+    def __getitem__(self, idx):
+        if np.ndim(idx) == 0:
+            i = self._check_index(int(idx))
+            value = self._buffer.get(i)
+            if value is not None:
+                return value
+
+            p = int(np.searchsorted(self._keys, i))
+            if p < len(self._keys) and self._keys[p] == i:
+                return float(self._values[p])
+            return 0.0
+
+        self._flush()
+        idx = np.asarray(idx, dtype=np.int64)
+        if len(self._keys) == 0:
+            return np.zeros(idx.shape)
+
+        pos = np.minimum(np.searchsorted(self._keys, idx), len(self._keys) - 1)
+        return np.where(self._keys[pos] == idx, self._values[pos], 0.0)
+
+    def __setitem__(self, idx, value) -> None:
+        if np.ndim(idx) == 0:
+            self._buffer[self._check_index(int(idx))] = float(value)
+            if len(self._buffer) >= self._BUFFER_SIZE:
+                self._flush()
+            return
+
+        self._flush()
+        idx = np.asarray(idx, dtype=np.int64)
+        values = np.broadcast_to(np.asarray(value, dtype=np.float64), idx.shape)
+        keys, first = np.unique(idx[::-1], return_index=True)  # the last assignment wins, as for numpy arrays
+        self._merge(keys, values[::-1][first], add=False)
+
+    def add_at(self, idx, values) -> None:
+        """ Adds 'values' to the cells 'idx', repeated indexes are accumulated (like ``np.add.at``)
+
+        Args:
+            idx (array like): the indexes of the cells
+
+            values (array like): the values to add, one per index or a single value for all of them
+        """
+        self._flush()
+        idx = np.asarray(idx, dtype=np.int64)
+        values = np.broadcast_to(np.asarray(values, dtype=np.float64), idx.shape)
+        keys, inverse = np.unique(idx, return_inverse=True)
+        self._merge(keys, np.bincount(inverse.ravel(), weights=values.ravel(), minlength=len(keys)), add=True)
+
+    def items(self):
+        """ Returns the indexes of the stored cells (sorted) and their values, as two arrays """
+        self._flush()
+        return self._keys, self._values
+
+    def nonzero(self):
+        """ Returns a tuple with the (sorted) array of indexes of non zero cells, like ``np.nonzero`` """
+        self._flush()
+        return self._keys[self._values != 0.0],
+
+    def sum(self) -> float:
+        self._flush()
+        return float(self._values.sum())
+
+    def __getstate__(self):
+        self._flush()  # pickle the two arrays, not the buffered cells one by one
+        return self.__dict__.copy()
+
+    def copy(self):
+        self._flush()
+        result = SparseCells(self._size)
+        result._keys = self._keys.copy()
+        result._values = self._values.copy()
+        return result
+
+    def toarray(self) -> np.ndarray:
+        """ Returns all the cells as a (dense) numpy array """
+        self._flush()
+        result = np.zeros(self._size)
+        result[self._keys] = self._values
+        return result
+
+    def __array__(self, dtype=None, copy=None):
+        result = self.toarray()
+        return result if dtype is None else result.astype(dtype)
+
+    def __imul__(self, factor):
+        self._flush()
+        self._values *= factor
+        return self
+
+    def __iadd__(self, other):
+        if isinstance(other, SparseCells):
+            self.add_at(*other.items())
+        else:
+            other = np.broadcast_to(np.asarray(other, dtype=np.float64), self.shape)
+            idx = np.flatnonzero(other)
+            self.add_at(idx, other[idx])
+        return self
+
+
+class CellsView:
+    """ A one dimensional array of cells reading and writing a region of the cells of another histogram.
+
+    The cells of a histogram are laid out as an N dimensional grid where the bins of the first axis vary fastest. A
+    region of this grid (a range of bins on each axis) is a strided numpy view of the cells, not a one dimensional
+    array. This class gives it the one dimensional interface of the cells: the cell index 'i' is the index of the
+    element of the region in the same layout (first axis fastest). Nothing is copied: reading gives the values of the
+    other histogram and writing changes them.
+
+    It supports the same subset of the numpy array interface as :py:class:`SparseCells`.
+
+    Args:
+        grid (np.ndarray): the region of the cells, a view with one dimension per axis of the histogram
+
+        on_write (callable): optional, called without arguments each time cells are written
+    """
+    def __init__(self, grid: np.ndarray, on_write=None):
+        self._grid = grid
+        self._onWrite = on_write
+
+    def __len__(self) -> int:
+        return self._grid.size
+
+    @property
+    def shape(self):
+        return self._grid.size,
+
+    @property
+    def dtype(self):
+        return self._grid.dtype
+
+    @property
+    def grid(self) -> np.ndarray:
+        """ the region of the cells, as an N dimensional view """
+        return self._grid
+
+    def _unravel(self, idx):
+        return np.unravel_index(idx, self._grid.shape, order='F')
+
+    def _as_grid(self, values) -> np.ndarray:
+        """ Returns 'values', a number or one value per cell, shaped like the region """
+        values = np.asarray(values, dtype=np.float64)
+        return values if values.ndim == 0 else values.reshape(self._grid.shape, order='F')
+
+    def _written(self) -> None:
+        if self._onWrite is not None:
+            self._onWrite()
+
+    def __getitem__(self, idx):
+        if np.ndim(idx) == 0:
+            return float(self._grid[self._unravel(int(idx))])
+        return self._grid[self._unravel(np.asarray(idx, dtype=np.int64))]
+
+    def __setitem__(self, idx, value) -> None:
+        if np.ndim(idx) == 0:
+            self._grid[self._unravel(int(idx))] = value
+        else:
+            self._grid[self._unravel(np.asarray(idx, dtype=np.int64))] = value
+        self._written()
+
+    def add_at(self, idx, values) -> None:
+        """ Adds 'values' to the cells 'idx', repeated indexes are accumulated (like ``np.add.at``)
+
+        Args:
+            idx (array like): the indexes of the cells
+
+            values (array like): the values to add, one per index or a single value for all of them
+        """
+        np.add.at(self._grid, self._unravel(np.asarray(idx, dtype=np.int64)), values)
+        self._written()
+
+    def nonzero(self):
+        """ Returns a tuple with the (sorted) array of indexes of non zero cells, like ``np.nonzero`` """
+        return np.flatnonzero(self.toarray()),
+
+    def sum(self) -> float:
+        return float(self._grid.sum())
+
+    def fill(self, value) -> None:
+        self._grid.fill(value)
+        self._written()
+
+    def copy(self) -> np.ndarray:
+        """ Returns the cells as a new (dense) numpy array, not sharing the memory """
+        return self.toarray()
+
+    def toarray(self) -> np.ndarray:
+        """ Returns all the cells as a (dense) numpy array """
+        return self._grid.flatten(order='F')
+
+    def __array__(self, dtype=None, copy=None):
+        result = self.toarray()
+        return result if dtype is None else result.astype(dtype)
+
+    def __imul__(self, factor):
+        self._grid *= self._as_grid(factor)
+        self._written()
+        return self
+
+    def __iadd__(self, other):
+        self._grid += self._as_grid(other)
+        self._written()
+        return self
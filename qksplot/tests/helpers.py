@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+""" Helpers shared by the tests """
+
+import numpy as np
+
+
+def filled(h, seed: int, n: int=500):
+    """ Fills the histogram 'h' with 'n' entries at random positions (normal on each axis) with random weights """
+    rng = np.random.default_rng(seed)
+    h.fill_many(rng.normal(0, 1, size=(n, h.dimension)), weights=rng.uniform(0.5, 1.5, n))
+    return h
+
+
+def assert_same(h1, h2, exact: bool=False):
+    """ Asserts that two histograms (or profiles) have the same bins, contents, errors and statistics.
+
+    The values are compared with ``np.allclose``, or must be equal when 'exact' is True: the types, the titles and
+    the axes titles are then compared too (for histograms saved and loaded again).
+    """
+    equal = np.array_equal if exact else np.allclose
+    assert h1.shape == h2.shape
+    for a1, a2 in zip(h1.get_axes_list(), h2.get_axes_list()):
+        assert equal(a1.get_bins(), a2.get_bins())
+    assert equal(h1.get_cells_contents(True), h2.get_cells_contents(True))
+    assert equal(h1.get_cells_contents(), h2.get_cells_contents())
+    assert equal(h1.get_cells_contents_errors(True), h2.get_cells_contents_errors(True))
+    s1, s2 = h1.get_stats(), h2.get_stats()
+    assert s1.keys() == s2.keys()
+    for key in s1:
+        assert equal(s1[key], s2[key]), key
+    if hasattr(h1, "_sumWeightedValues"):  # the statistics of the values of profiles
+        assert equal(h1._sumWeightedValues, h2._sumWeightedValues)
+        assert equal(h1._sumWeightedValues2, h2._sumWeightedValues2)
+
+    if exact:
+        assert type(h1) is type(h2) and h1.title == h2.title
+        assert [a.title for a in h1.get_axes_list()] == [a.title for a in h2.get_axes_list()]
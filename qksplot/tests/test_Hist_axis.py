@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from qksplot.hist import HistAxis, HistND, Hist1D, Hist2D
+from qksplot.profile import Profile1D
+
+
+def _reference_bins(edges, x):
+    idx = np.minimum(np.searchsorted(edges, x, side='right') - 1, len(edges) - 2)
+    return np.where((x >= edges[0]) & (x <= edges[-1]), idx, -1)
+
+
+def test_uniform_detection():
+    assert HistAxis(np.linspace(-1, 1, 11)).uniform
+    assert not HistAxis([0.0, 0.1, 0.5, 2.0]).uniform
+    assert not HistAxis(np.linspace(-1, 1, 11), uniform=False).uniform
+
+
+@pytest.mark.parametrize("edges", [[0, 2, 1], [0, 0, 1], [1], [], [0, np.inf], [np.nan, 1], [[0, 1], [2, 3]]])
+def test_invalid_edges(edges):
+    with pytest.raises(ValueError):
+        HistAxis(edges)
+    with pytest.raises(ValueError):
+        Hist1D(edges=edges)
+
+
+def test_get_bin_on_edges():
+    edges = np.append(np.linspace(-3, 3, 30, endpoint=False), 3.0)
+    for axis in (HistAxis(edges), HistAxis(edges, uniform=False)):
+        assert axis.get_bin(-3.0) == 0
+        assert axis.get_bin(3.0) == 29
+        assert axis.get_bin(-3.1) == -1
+        assert axis.get_bin(float("nan")) == -1
+        for i, edge in enumerate(edges[:-1]):
+            assert axis.get_bin(edge) == i
+
+
+def test_find_bins_same_as_get_bin():
+    rng = np.random.default_rng(3)
+    for edges in (np.append(np.linspace(0.1, 0.7, 3, endpoint=False), 0.7),
+                  np.append(np.linspace(-3, 3, 37, endpoint=False), 3.0),
+                  np.array([0.0, 0.1, 0.5, 2.0, 2.2, 10.0])):
+        axis = HistAxis(edges)
+        x = np.concatenate([rng.uniform(edges[0] - 1, edges[-1] + 1, 2000), edges, [np.nan, np.inf]])
+
+        bins = axis.find_bins(x)
+        assert np.array_equal(bins, _reference_bins(edges, x))
+        assert np.array_equal(bins, [axis.get_bin(v) for v in x])
+
+
+def test_log_spaced_axis():
+    axis = HistAxis.log_spaced(50, 1e-3, 1e2)
+    assert axis.logarithmic and not axis.uniform
+    assert axis.nbins == 50 and axis.minBin == 1e-3 and axis.maxBin == 1e2
+    assert HistAxis(np.geomspace(1.0, 1000.0, 4)).logarithmic
+
+    rng = np.random.default_rng(4)
+    edges = axis.get_bins()
+    x = np.concatenate([10 ** rng.uniform(-4, 3, 5000), edges])
+
+    bins = axis.find_bins(x)
+    assert np.array_equal(bins, _reference_bins(edges, x))
+    assert np.array_equal(bins, [axis.get_bin(v) for v in x])
+
+
+def test_hist_with_edges():
+    edges = [0.0, 1.0, 10.0, 100.0]
+    h = Hist1D(edges=edges)
+    h.fill_many([0.5, 5.0, 50.0, 60.0, 500.0])
+    assert list(h.get_cells_contents(True)) == [1.0, 1.0, 2.0]
+    assert np.isclose(h.integral(), 1.0 * 1.0 + 1.0 * 9.0 + 2.0 * 90.0)
+
+    h2 = Hist2D(10, 0, 1, title="H2", edgesY=HistAxis.log_spaced(5, 1.0, 1e5, title="y"))
+    assert h2.shape == (10, 5)
+    assert h2.get_axis(1).title == "y" and h2.get_axis(1).logarithmic
+    assert h2.fill(0.5, 150.0) == 5 + 2 * 10
+
+    hN = HistND(2, [0, None], [1, None], [4, None], edges=[None, edges])
+    assert hN.shape == (4, 3)
+
+    p = Profile1D(edges=edges)
+    p.fill(5.0, value=3.0)
+    assert list(p.get_cells_contents()) == [3.0]
+
+
+def test_axis_geometry_arrays():
+    axis = HistAxis([0.0, 1.0, 3.0, 7.0])
+    assert list(axis.get_bins_widths()) == [1.0, 2.0, 4.0]
+    assert list(axis.get_bins_centers()) == [0.5, 2.0, 5.0]
+    assert axis.get_bin_center(2) == 5.0 and axis.get_bin_width(1) == 2.0 and axis.get_bin_width(3) == 0.0
+    assert not axis.get_bins_centers().flags.writeable
+
+
+def test_cells_volumes():
+    h = Hist2D(2, 0, 1, 3, 0, 3, edgesY=[0.0, 1.0, 3.0, 7.0])
+    volumes = h.get_cells_volumes()
+    assert volumes.shape == (2, 3)
+    assert np.allclose(volumes, [[0.5, 1.0, 2.0], [0.5, 1.0, 2.0]])
+    assert h._get_cells_volumes() is h._get_cells_volumes()  # cached
+    assert h.get_bins_centers(True)[1].tolist() == [0.5, 2.0, 5.0]
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from qksplot.hist import Hist2D, HistND
+from qksplot.profile import Profile1D, Profile2D
+
+
+def _hist():
+    return HistND(3, [-1, 0, 0], [1, 1, 3], [4, 3, 5], edges=[None, None, [0.0, 0.1, 0.5, 1.0, 2.0, 3.0]])
+
+
+def test_cells_to_bins_same_as_scalar():
+    h = _hist()
+    cells = np.arange(-2, h.cells + 2)
+    bins = h.cells_to_bins(cells)
+
+    assert bins.shape == (len(cells), 3)
+    for i_cell, row in zip(cells, bins):
+        expected = h.cell_to_bins(int(i_cell))
+        assert list(row) == (expected if expected else [-1, -1, -1])
+    assert list(h.cell_to_bins(59)) == [3, 2, 4]
+
+
+def test_bins_to_cells_round_trip():
+    h = _hist()
+    cells = np.arange(h.cells)
+    assert np.array_equal(h.bins_to_cells(h.cells_to_bins(cells)), cells)
+
+    bins = np.array([[0, 0, 0], [3, 2, 4], [4, 0, 0], [0, -1, 0], [1, 2, 3]])
+    assert list(h.bins_to_cells(bins)) == [0, 59, -1, -1, 1 + 2 * 4 + 3 * 12]
+    assert [h.bins_to_cell(*b) for b in bins] == list(h.bins_to_cells(bins))
+    assert h.bins_to_cell([1, 2, 3]) == 45
+
+
+def test_pos_to_cells_same_as_scalar():
+    h = _hist()
+    rng = np.random.default_rng(71)
+    positions = rng.uniform(-1.5, 3.5, size=(500, 3))
+
+    cells = h.pos_to_cells(positions)
+    assert list(cells) == [h.pos_to_cell(*p) for p in positions.tolist()]
+    assert np.array_equal(h.pos_to_cells(*positions.T), cells)
+
+
+def test_nonzero_cells_same_as_loop():
+    h = _hist()
+    rng = np.random.default_rng(81)
+    h.fill_many(rng.uniform(-1, 3, size=(40, 3)), weights=rng.uniform(0.5, 2.0, 40))
+
+    cells, edges, centers, contents, errors = h.nonzero_cells()
+    expected = [i for i in range(h.cells) if h.get_cell_content(i) != 0.0]
+    assert list(cells) == expected
+    for d in range(h.dimension):
+        axis = h.get_axis(d)
+        assert list(edges[d]) == [axis.get_bins()[h.cell_to_bins(i)[d]] for i in expected]
+        assert np.allclose(centers[d], [axis.get_bin_center(h.cell_to_bins(i)[d]) for i in expected])
+    assert np.allclose(contents, [h.get_cell_content(i) for i in expected])
+    assert np.allclose(errors, [h.get_cell_content_error(i) for i in expected])
+
+    assert all(np.array_equal(a, b) for a, b in zip(h.get_bins_edges(), edges))
+    assert all(np.array_equal(a, b) for a, b in zip(h.get_bins_centers(), centers))
+    assert np.array_equal(h.get_cells_contents(), contents)
+    assert np.array_equal(h.get_cells_contents_errors(), errors)
+
+
+def test_nonzero_cells_profile_aligned():
+    p = Profile1D(4, 0, 4)
+    p.fill_many([0.5, 0.5, 2.5], values=[1.0, -1.0, 3.0])  # the first cell has entries but a zero mean
+
+    cells, edges, centers, contents, errors = p.nonzero_cells()
+    assert list(cells) == [0, 2]
+    assert list(centers[0]) == [0.5, 2.5]
+    assert list(contents) == [0.0, 3.0]
+    assert len(p.get_bins_centers()[0]) == len(p.get_cells_contents())
+
+
+@pytest.mark.parametrize("bins", [(-1, 0), (4, 0), (0, -1), (0, 4)])
+def test_fill_bins_out_of_range(bins):
+    for h in (Hist2D(4, 0, 1, 4, 0, 1), Profile2D(4, 0, 1, 4, 0, 1)):
+        stats = h.get_stats()
+        kwargs = {"value": 1.0} if isinstance(h, Profile2D) else {}
+        assert h.fill_bins(*bins, **kwargs) == -1
+        assert h.get_stats() == stats
+        assert h.get_cells_contents(True).sum() == 0.0
+        assert h.fill_bins(1, 2, **kwargs) == 9 and h.entries == 1
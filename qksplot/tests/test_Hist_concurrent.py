@@ -0,0 +1,91 @@
+import threading
+import numpy as np
+import pytest
+
+from qksplot.accumulator import ConcurrentHist
+from qksplot.hist import Hist1D, Hist2D
+from qksplot.profile import Profile1D
+
+
+def _run_threads(target, n_threads):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_threads_fill_same_as_serial():
+    rng = np.random.default_rng(21)
+    positions = rng.uniform(0, 1, size=(8, 500, 2))
+
+    expected = Hist2D(10, 0, 1, 10, 0, 1)
+    for chunk in positions:
+        for x, y in chunk.tolist():
+            expected.fill(x, y)
+
+    h = ConcurrentHist(Hist2D(10, 0, 1, 10, 0, 1))
+
+    def work(i):
+        for x, y in positions[i].tolist():
+            h.fill(x, y)
+
+    _run_threads(work, 8)
+
+    assert np.allclose(h.get_cells_contents(True), expected.get_cells_contents(True))
+    assert h.get_stats()["Entries"] == expected.entries == 4000
+    assert np.isclose(h.integral(), expected.integral())
+    assert len(h._accumulators) == 8
+
+
+def test_merged_includes_wrapped_entries():
+    base = Hist1D(4, 0, 4)
+    base.fill(0.5)
+    h = ConcurrentHist(base)
+    h.fill_many([1.5, 2.5])
+
+    assert list(h.merged().get_cells_contents(True)) == [1.0, 1.0, 1.0, 0.0]
+    assert base.entries == 1
+
+
+def test_profile():
+    p = ConcurrentHist(Profile1D(2, 0, 2))
+    _run_threads(lambda i: p.fill(0.5, value=float(i)), 3)
+    assert np.allclose(p.get_cells_contents(), [1.0])
+
+
+def test_mutators():
+    h = ConcurrentHist(Hist1D(4, 0, 4))
+    other = Hist1D(4, 0, 4)
+    other.fill_many([0.5, 3.5])
+
+    h.merge(other)
+    assert h.fill_parallel([1.5, 1.5, 2.5], processes=2) == 3
+    merged = h.merged()
+    assert list(merged.get_cells_contents(True)) == [1.0, 2.0, 1.0, 1.0]
+    assert merged.entries == 5
+
+    h.title = "concurrent"
+    assert h.merged().title == "concurrent" and h.title == "concurrent"
+
+    with pytest.raises(ValueError):
+        h.merge(Hist1D(2, 0, 4))
+    with pytest.raises(AttributeError):
+        h.scale(3)
+    with pytest.raises(AttributeError):
+        h.close()
+    assert list(h.merged().get_cells_contents(True)) == [1.0, 2.0, 1.0, 1.0]
+
+
+def test_numpy_and_views_read_the_merged_view():
+    h = ConcurrentHist(Hist2D(4, 0, 4, 2, 0, 2))
+    _run_threads(lambda i: h.fill(i + 0.5, 0.5), 3)
+    expected = [[1.0, 0.0], [1.0, 0.0], [1.0, 0.0], [0.0, 0.0]]
+
+    assert np.array_equal(np.asarray(h), expected)
+    assert np.asarray(h, dtype=np.float32).dtype == np.float32
+    contents, edges = h.to_numpy()
+    assert np.array_equal(contents, expected) and np.array_equal(edges[0], [0, 1, 2, 3, 4])
+    assert np.array_equal(np.asarray(h[1:3, :]), expected[1:3])
+    assert np.array_equal(np.asarray(h.view([(0, 2)])), expected[0:2])
+    assert np.array_equal(np.asarray(h.lazy().evaluate()), expected)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from qksplot.expr import HistExpr
+from qksplot.hist import Hist1D, Hist2D, HistND
+from qksplot.tests.helpers import assert_same, filled
+
+
+def _filled(seed):
+    return filled(Hist2D(10, -1, 1, 5, -1, 1), seed, 200)
+
+
+def test_lazy_same_as_eager():
+    h1, h2, h3 = _filled(1), _filled(2), _filled(3)
+
+    expr = h1.lazy() + h2 + (h3 - h2) * h2
+    assert isinstance(expr, HistExpr)
+    assert_same(h1 + h2 + (h3 - h2) * h2, expr.evaluate())
+    assert_same(h1 / h2 - h3, (h1.lazy() / h2 - h3).evaluate())
+    assert np.allclose((2.0 * h1.lazy() - 1).get_cells_contents(True), 2.0 * h1.get_cells_contents(True) - 1)
+    assert np.allclose(expr.get_cells_contents(True), expr.evaluate().get_cells_contents(True))
+
+
+def test_common_subexpressions_computed_once():
+    h1, h2 = _filled(4), _filled(5)
+    calls = []
+    get_contents_at = Hist2D._get_contents_at
+
+    def counting(self, hist):
+        calls.append(self)
+        return get_contents_at(self, hist)
+
+    Hist2D._get_contents_at = counting
+    try:
+        d = h1.lazy() - h2
+        (d * d + h1.lazy() * h2).evaluate()
+    finally:
+        Hist2D._get_contents_at = get_contents_at
+    assert len(calls) == 2
+
+
+def test_different_binning():
+    h1 = Hist1D(4, 0, 4)
+    h2 = Hist1D(4, 2, 6)
+    h1.fill_many([0.5, 1.5])
+    h2.fill_many([5.5])
+
+    result = (h1.lazy() + h2).evaluate()
+    assert result.get_axis(0).minBin == 0 and result.get_axis(0).maxBin == 6
+    assert list(result.get_cells_contents(True)) == [1.0, 1.0, 0.0, 0.0, 0.0, 1.0]
+
+    with pytest.raises(ValueError):
+        (HistExpr(1.0) + 2.0).evaluate()
+
+
+def test_sparse_operands():
+    d1, d2, d3 = (filled(HistND(3, [-2] * 3, [2] * 3, [8, 6, 4]), seed) for seed in (6, 7, 8))
+    s1, s2, s3 = (filled(HistND(3, [-2] * 3, [2] * 3, [8, 6, 4], sparse=True), seed) for seed in (6, 7, 8))
+    o2 = filled(HistND(3, [-3] * 3, [1] * 3, [4, 4, 4], sparse=True), 7)
+
+    result = (s1.lazy() * s2 + s3.lazy() / 2).evaluate()
+    assert result.sparse
+    assert_same((d1.lazy() * d2 + d3.lazy() / 2).evaluate(), result)
+    assert_same(d1 * d2 - d3, (s1.lazy() * s2 - s3).evaluate())
+    assert_same(s1 - o2, (s1.lazy() - o2).evaluate())
+    with pytest.raises(ValueError):
+        (s1.lazy() + 1).evaluate()
+
+    rng = np.random.default_rng(9)
+    big = [HistND(6, [0] * 6, [1] * 6, [50] * 6, sparse=True) for _ in range(2)]
+    for b in big:
+        b.fill_many(rng.uniform(0, 1, size=(100, 6)))
+    result = (big[0].lazy() + big[1]).evaluate()  # 50**6 cells, only the filled ones are computed
+    assert result.sparse and result._binsEntries.nnz <= 200
+    assert np.isclose(result.get_cells_contents().sum(), 200)
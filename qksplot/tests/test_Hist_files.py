@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from qksplot.fill import fill_from_files, iter_columns, main
+from qksplot.hist import HistND
+from qksplot.profile import ProfileND
+
+
+def _events(n=1000):
+    rng = np.random.default_rng(111)
+    events = np.zeros(n, dtype=[("x", "f8"), ("y", "f8"), ("w", "f8")])
+    events["x"], events["y"], events["w"] = rng.normal(0, 1, n), rng.uniform(0, 5, n), rng.uniform(0.5, 2.0, n)
+    return events
+
+
+def _expected(events):
+    h = HistND(2, [-3, 0], [3, 5], [12, 10])
+    h.fill_many(events["x"], events["y"], weights=events["w"])
+    return h
+
+
+def _write(events, path):
+    if path.suffix == ".npy":
+        np.save(path, events)
+    elif path.suffix == ".npz":
+        np.savez(path, **{name: events[name] for name in events.dtype.names})
+    else:
+        np.savetxt(path, np.column_stack([events[name] for name in events.dtype.names]), delimiter=",",
+                   header=",".join(events.dtype.names), comments="")
+
+
+@pytest.mark.parametrize("name", ["events.npy", "events.npz", "events.csv"])
+def test_fill_from_files(tmp_path, name):
+    events = _events()
+    _write(events, tmp_path / name)
+
+    chunks = list(iter_columns(tmp_path / name, ["y", "x"], chunk_size=300))
+    assert [len(c["x"]) for c in chunks] == [300, 300, 300, 100]
+    assert np.allclose(np.concatenate([c["y"] for c in chunks]), events["y"])
+
+    h = HistND(2, [-3, 0], [3, 5], [12, 10])
+    assert fill_from_files(h, [tmp_path / name, tmp_path / name], ["x", "y"], weight_column="w", chunk_size=256) == 2000
+    expected = _expected(np.concatenate([events, events]))
+    assert np.allclose(h.get_cells_contents(True), expected.get_cells_contents(True))
+    assert np.allclose(h.get_cells_contents_errors(True), expected.get_cells_contents_errors(True))
+
+    with pytest.raises(ValueError):
+        next(iter_columns(tmp_path / name, ["z"]))
+
+
+def test_fill_from_2d_npy(tmp_path):
+    events = _events()
+    np.save(tmp_path / "events.npy", np.column_stack([events["x"], events["y"], events["w"]]))
+
+    h = HistND(2, [-3, 0], [3, 5], [12, 10])
+    fill_from_files(h, tmp_path / "events.npy", ["0", "1"], weight_column="2")
+    assert np.allclose(h.get_cells_contents(True), _expected(events).get_cells_contents(True))
+
+
+def test_command_line(tmp_path, capsys):
+    events = _events()
+    _write(events, tmp_path / "events.npz")
+
+    assert main([str(tmp_path / "events.npz"), "--columns", "x", "y", "--bins", "12", "-3", "3", "--bins", "10", "0",
+                 "5", "--weight", "w", "-o", str(tmp_path / "h.qks"), "--chunk-size", "100"]) == 0
+    assert "1000" in capsys.readouterr().out
+    h = HistND.load(tmp_path / "h.qks")
+    assert np.allclose(h.get_cells_contents(True), _expected(events).get_cells_contents(True))
+    assert h.get_axis(1).title == "y"
+
+    main([str(tmp_path / "events.npz"), "-c", "x", "-b", "6", "-3", "3", "-v", "y", "-o", str(tmp_path / "p.qks")])
+    assert isinstance(HistND.load(tmp_path / "p.qks"), ProfileND)
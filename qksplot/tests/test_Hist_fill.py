@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from qksplot.hist import Hist1D, HistND
+from qksplot.tests.helpers import assert_same
+
+
+def _fill_one_by_one(h, positions, weights):
+    for pos, w in zip(positions.tolist(), weights.tolist()):
+        h.fill(*pos, weight=w)
+    return h
+
+
+def test_fill_many_same_as_fill():
+    rng = np.random.default_rng(1)
+    positions = rng.normal(0, 1.5, size=(5000, 3))
+    weights = rng.uniform(0.5, 2.0, 5000)
+
+    h1 = _fill_one_by_one(HistND(3, [-3, -2, -1], [3, 2, 1], [12, 8, 4]), positions, weights)
+    h2 = HistND(3, [-3, -2, -1], [3, 2, 1], [12, 8, 4])
+    cells = h2.fill_many(positions, weights=weights)
+
+    assert_same(h1, h2)
+    assert h2.entries + h2.get_stats()["Underflow"] == 5000
+    assert (cells == -1).sum() == h2.get_stats()["Underflow"]
+
+
+def test_fill_many_one_array_per_axis():
+    rng = np.random.default_rng(2)
+    x, y = rng.uniform(-1, 1, 100), rng.uniform(-1, 1, 100)
+
+    h1 = HistND(2, [-1, -1], [1, 1], [5, 5])
+    h1.fill_many(np.column_stack([x, y]))
+    h2 = HistND(2, [-1, -1], [1, 1], [5, 5])
+    h2.fill_many(x, y)
+
+    assert_same(h1, h2)
+
+
+def test_fill_many_1d():
+    h = Hist1D(4, 0, 4)
+    cells = h.fill_many([0.5, 1.5, 1.5, 9.0], weights=2.0)
+
+    assert list(cells) == [0, 1, 1, -1]
+    assert list(h.get_cells_contents(True)) == [2.0, 4.0, 0.0, 0.0]
+    assert h.entries == 3
+
+
+def test_fill_stream():
+    rng = np.random.default_rng(11)
+    positions = rng.normal(0, 1, size=(1000, 2))
+    weights = rng.uniform(0.5, 2.0, 1000)
+
+    expected = HistND(2, [-2, -2], [2, 2], [8, 8])
+    expected.fill_many(positions, weights=weights)
+
+    def records():
+        for (x, y), w in zip(positions.tolist(), weights.tolist()):
+            yield x, y, w
+
+    h = HistND(2, [-2, -2], [2, 2], [8, 8])
+    assert h.fill_stream(records(), chunk_size=64) == 1000
+    assert_same(expected, h)
+
+    batches = ({"w": weights[i:i + 300], "x": positions[i:i + 300, 0], "y": positions[i:i + 300, 1]}
+               for i in range(0, 1000, 300))
+    h = HistND(2, [-2, -2], [2, 2], [8, 8])
+    assert h.fill_stream(batches, chunk_size=128, columns=["x", "y"], weight_column="w") == 1000
+    assert_same(expected, h)
+
+    table = np.zeros(1000, dtype=[("x", "f8"), ("y", "f8"), ("w", "f8")])
+    table["x"], table["y"], table["w"] = positions[:, 0], positions[:, 1], weights
+    h = HistND(2, [-2, -2], [2, 2], [8, 8])
+    assert h.fill_stream([table[:500], table[500:]], weight_column="w") == 1000
+    assert_same(expected, h)
+
+    h = HistND(2, [-2, -2], [2, 2], [8, 8])
+    assert h.fill_stream(iter(table), chunk_size=100, weight_column="w") == 1000
+    assert_same(expected, h)
+
+    h = HistND(2, [-2, -2], [2, 2], [8, 8])
+    assert h.fill_stream([np.column_stack([positions, weights])], chunk_size=100) == 1000
+    assert_same(expected, h)
+
+
+def test_fill_stream_1d_values():
+    h = Hist1D(4, 0, 4)
+    assert h.fill_stream(x * 0.5 for x in range(8)) == 8
+    assert list(h.get_cells_contents(True)) == [2.0, 2.0, 2.0, 2.0]
+
+
+def test_fill_parallel_same_as_fill_many():
+    rng = np.random.default_rng(13)
+    positions = rng.normal(0, 1.5, size=(3000, 2))
+    weights = rng.uniform(0.5, 2.0, 3000)
+
+    expected = HistND(2, [-3, -2], [3, 2], [12, 8])
+    expected.fill_many(positions, weights=weights)
+
+    for sparse in (False, True):
+        h = HistND(2, [-3, -2], [3, 2], [12, 8], sparse=sparse)
+        assert h.fill_parallel(positions, weights=weights, processes=3) == 3000
+        assert_same(expected, h)
+        assert h.get_stats()["Underflow"] == expected.get_stats()["Underflow"]
+
+
+def test_fill_stream_1d_batches_and_widths():
+    h = Hist1D(10, 0, 1)
+    assert h.fill_stream(iter([np.array([.15, .25, .35, .45]), (.55, 2.0), .65])) == 6
+    assert list(h.get_cells_contents(True)) == [0, 1, 1, 1, 1, 2, 1, 0, 0, 0]
+
+    for entries in ([[.15, .25, .35, .45]], [(.15, 1.0, 2.0)], [np.ones((3, 3))], [()]):
+        with pytest.raises(ValueError):
+            Hist1D(10, 0, 1).fill_stream(iter(entries))
+    with pytest.raises(ValueError):
+        HistND(2, [0, 0], [1, 1], [2, 2]).fill_stream(iter([np.array([.5, .5, 1.0, 1.0])]))
+
+
+def test_fill_stream_default_columns_skip_the_weight():
+    table = {"w": np.array([2.0, 3.0]), "a": np.array([0.15, 0.55]), "b": np.array([0.25, 0.85])}
+    records = np.zeros(2, dtype=[("w", "f8"), ("a", "f8"), ("b", "f8")])
+    for name, column in table.items():
+        records[name] = column
+
+    for entries in ([table], [records], list(records)):
+        h = HistND(2, [0, 0], [1, 1], [2, 2])
+        assert h.fill_stream(iter(entries), weight_column="w") == 2
+        assert list(h.get_cells_contents(True)) == [2.0, 0.0, 0.0, 3.0]
+        assert h.sum_of_weights == 5.0
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from qksplot.hist import HistND, Hist1D
+
+
+def _box_integral(h, lower, upper):
+    """ the integral over a box of bins, done cell by cell """
+    result = 0.0
+    for i_cell in range(h.cells):
+        bins = h.cell_to_bins(i_cell)
+        if all(lower[d] <= b < upper[d] for d, b in enumerate(bins)):
+            volume = np.prod([h.get_axis(d).get_bin_width(b) for d, b in enumerate(bins)])
+            result += h.get_cell_content(i_cell) * volume
+    return result
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_box_integrals(sparse):
+    rng = np.random.default_rng(61)
+    h = HistND(3, [-2, -1, 0], [2, 1, 3], [8, 5, 3], edges=[None, None, [0.0, 0.5, 2.0, 3.0]], sparse=sparse)
+    h.fill_many(rng.normal(0, 1, size=(3000, 3)), weights=rng.uniform(0.5, 2.0, 3000))
+
+    for lower, upper in (([0, 0, 0], [8, 5, 3]), ([2, 1, 0], [5, 4, 2]), ([7, 0, 2], [8, 1, 3]), ([3, 3, 1], [3, 4, 2])):
+        assert np.isclose(h.integral_over_bins(lower, upper), _box_integral(h, lower, upper))
+
+    assert np.isclose(h.integral_over_bins([-5, -5, -5], [50, 50, 50]), h.integral())
+    assert np.isclose(h.integral_over_pos([-0.5, -10, 0.5], [1.0, 10, 3.0]), _box_integral(h, [3, 0, 1], [6, 5, 3]))
+
+
+def test_integral_table_dropped_on_changes():
+    h = Hist1D(4, 0, 4)
+    h.fill(0.5)
+    assert h.integral_over_bins([0], [4]) == 1.0
+
+    h.fill(1.5)
+    assert h.integral_over_bins([0], [4]) == 2.0
+    h.fill_many([2.5, 3.5])
+    assert h.integral_over_bins([0], [4]) == 4.0
+    assert h.integral_over_bins([1], [3]) == 2.0
+    h *= 2
+    assert h.integral_over_bins([0], [4]) == 8.0
+    h += 1
+    assert h.integral_over_bins([0], [4]) == 12.0
+    h += h
+    assert h.integral_over_bins([0], [4]) == 24.0
@@ -0,0 +1,135 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from qksplot.hist import Hist2D, HistND
+from qksplot.profile import Profile1D, ProfileND
+from qksplot.tests.helpers import assert_same
+
+
+def test_save_load(tmp_path):
+    rng = np.random.default_rng(91)
+    h = Hist2D(20, -2, 2, title="h2", edgesY=[0.0, 0.5, 2.0, 5.0])
+    h.get_axis(0).title = "x"
+    h.fill_many(rng.normal(0, 1, 500), rng.uniform(0, 5, 500), weights=rng.uniform(0.5, 2.0, 500))
+    h.save(tmp_path / "h.qks")
+
+    loaded = HistND.load(tmp_path / "h.qks")
+    assert_same(h, loaded, exact=True)
+    loaded.fill(0.1, 0.1)
+    assert loaded.entries == h.entries + 1
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_save_load_mmap(tmp_path, sparse):
+    h = HistND(3, [0, 0, 0], [10, 10, 10], [10, 10, 10], sparse=sparse)
+    h.fill_many(np.random.default_rng(92).uniform(0, 10, size=(100, 3)))
+    h.save(tmp_path / "h.qks")
+
+    loaded = HistND.load(tmp_path / "h.qks", mmap_mode="r")
+    assert_same(h, loaded, exact=True)
+    assert loaded.sparse == sparse
+    assert isinstance(loaded._binsEntries.items()[1] if sparse else loaded._binsEntries, np.memmap)
+
+    if not sparse:
+        loaded = HistND.load(tmp_path / "h.qks", mmap_mode="r+")
+        loaded.fill(0.5, 0.5, 0.5, weight=2.0)
+        del loaded
+        assert HistND.load(tmp_path / "h.qks").get_cell_content(0) == h.get_cell_content(0) + 2.0
+
+
+def test_save_load_profile(tmp_path):
+    p = Profile1D(4, 0, 4, minValue=-1.0, maxValue=10.0)
+    p.fill_many([0.5, 0.5, 2.5], values=[1.0, 3.0, 5.0])
+    p.save(tmp_path / "p.qks")
+
+    loaded = Profile1D.load(tmp_path / "p.qks")
+    assert_same(p, loaded, exact=True)
+    assert loaded.minY == -1.0 and loaded.maxY == 10.0
+
+
+def test_load_not_a_histogram(tmp_path):
+    (tmp_path / "x.qks").write_bytes(b"not a histogram")
+    with pytest.raises(ValueError):
+        HistND.load(tmp_path / "x.qks")
+
+
+def test_stored_in_file(tmp_path, monkeypatch):
+    monkeypatch.setattr("qksplot.hist._FILE_CHUNK_CELLS", 50)  # several chunks when summing the cells
+    rng = np.random.default_rng(93)
+    positions = rng.uniform(0, 10, size=(2000, 4))
+    expected = HistND(4, [0] * 4, [10] * 4, [10, 8, 6, 4], title="occupancy")
+    expected.fill_many(positions)
+
+    with HistND(4, [0] * 4, [10] * 4, [10, 8, 6, 4], title="occupancy", path=tmp_path / "h.qks") as h:
+        assert isinstance(h._binsEntries, np.memmap) and h.path == tmp_path / "h.qks"
+        h.fill_many(positions)
+        assert_same(expected, h, exact=True)
+        assert np.isclose(h.integral(), expected.integral())
+        assert np.isclose(h.integral_over_bins([1, 2, 0, 1], [9, 5, 6, 3]),
+                          expected.integral_over_bins([1, 2, 0, 1], [9, 5, 6, 3]))
+        assert np.array_equal(h.projection(0, 2).get_cells_contents(True),
+                              expected.projection(0, 2).get_cells_contents(True))
+
+    loaded = HistND.load(tmp_path / "h.qks", mmap_mode="r+")
+    assert loaded.title == "occupancy"
+    assert_same(expected, loaded, exact=True)
+    loaded.fill(0.5, 0.5, 0.5, 0.5)
+    loaded.flush()
+    assert HistND.load(tmp_path / "h.qks").entries == expected.entries + 1
+
+    with pytest.raises(ValueError):
+        expected.flush()
+
+
+def test_stored_in_file_other_bins(tmp_path):
+    h = HistND(1, [0], [4], [4], path=tmp_path / "h.qks")
+    h.fill_many([0.5, 1.5, 1.5])
+    other = HistND(1, [0], [8], [8])
+    other.fill(6.5)
+    for operation in (h.merge, h.__iadd__, h.__isub__, h.__imul__):
+        with pytest.raises(ValueError):
+            operation(other)
+
+    assert isinstance(h._binsEntries, np.memmap) and h.path == tmp_path / "h.qks"
+    assert list(h.get_cells_contents(True)) == [1.0, 2.0, 0.0, 0.0] and h.entries == 3
+    h.close()
+    assert HistND.load(tmp_path / "h.qks").entries == 3
+
+
+def test_profile_stored_in_file(tmp_path):
+    p = ProfileND(1, [0], [4], [4], minValue=-1.0, path=tmp_path / "p.qks")
+    p.fill_many([0.5, 0.5, 2.5], values=[1.0, 3.0, 5.0])
+    p.close()
+
+    loaded = HistND.load(tmp_path / "p.qks")
+    assert isinstance(loaded, ProfileND) and loaded.minY == -1.0
+    assert list(loaded.get_cells_contents(True)) == [2.0, 0.0, 5.0, 0.0]
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_pickle_out_of_band(sparse):
+    h = HistND(3, [0, 0, 0], [1, 1, 1], [40, 30, 20], title="h", sparse=sparse)
+    h.fill_many(np.random.default_rng(94).uniform(0, 1, size=(500, 3)))
+    h.fill(0.5, 0.5, 0.5)  # buffered by the sparse cells
+    h.integral_over_bins([0, 0, 0], [20, 20, 20])  # builds the cached table
+
+    buffers = []
+    data = pickle.dumps(h, protocol=5, buffer_callback=buffers.append)
+    assert len(data) < 2000  # the cells and the edges are out of band
+    assert_same(h, pickle.loads(data, buffers=buffers), exact=True)
+    assert_same(h, pickle.loads(pickle.dumps(h)), exact=True)
+
+
+def test_pickle_profile_and_stored_in_file(tmp_path):
+    p = ProfileND(2, [0, 0], [4, 4], [4, 4], path=tmp_path / "p.qks")
+    p.fill_many([0.5, 1.5, 2.5], [0.5, 1.5, 2.5], values=[1.0, 3.0, 5.0])
+
+    unpickled = pickle.loads(pickle.dumps(p, protocol=5))
+    assert_same(p, unpickled, exact=True)
+    assert unpickled.path is None and not isinstance(unpickled._binsEntries, np.memmap)
+
+    view = pickle.loads(pickle.dumps(p[1:3, 1:3]))
+    assert list(view.get_cells_contents(True)) == [3.0, 0.0, 0.0, 5.0]
+    p.close()
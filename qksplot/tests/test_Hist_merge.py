@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from qksplot.hist import HistND, Hist1D, Hist2D
+from qksplot.profile import Profile1D
+
+
+def _filled(positions, weights, **kwargs):
+    h = Hist2D(10, 0, 1, 5, 0, 1, **kwargs)
+    h.fill_many(positions, weights=weights)
+    return h
+
+
+def test_merge_same_binning():
+    rng = np.random.default_rng(31)
+    positions = rng.uniform(-0.1, 1.1, size=(2000, 2))
+    weights = rng.uniform(0.5, 2.0, 2000)
+
+    expected = _filled(positions, weights, title="all")
+    h = _filled(positions[:700], weights[:700], title="runs")
+    cells = h._binsEntries
+    h += _filled(positions[700:], weights[700:])
+
+    assert h.title == "runs"
+    assert h._binsEntries is cells  # updated in place
+    assert np.allclose(h.get_cells_contents(True), expected.get_cells_contents(True))
+    assert np.allclose(h.get_cells_contents_errors(True), expected.get_cells_contents_errors(True))
+    for key, value in expected.get_stats().items():
+        assert np.allclose(h.get_stats()[key], value), key
+
+
+def test_merge_different_binning():
+    h1 = Hist1D(4, 0, 4, title="h1")
+    h1.fill(0.5)
+    h2 = Hist1D(4, 2, 6)
+    h2.fill(5.5)
+
+    expected = h1 + h2
+    assert h1.merge(h2) is h1
+    assert h1.title == "h1"
+    assert h1.get_axis(0).minBin == 0 and h1.get_axis(0).maxBin == 6
+    assert list(h1.get_cells_contents(True)) == list(expected.get_cells_contents(True))
+
+
+def test_merge_profiles():
+    p1 = Profile1D(2, 0, 2)
+    p1.fill(0.5, value=1.0)
+    p2 = Profile1D(2, 0, 2)
+    p2.fill(0.5, value=3.0)
+
+    p1 += p2
+    assert list(p1.get_cells_contents()) == [2.0]
+    assert p1.entries == 2
+
+    with pytest.raises(ValueError):
+        p1.merge(Profile1D(3, 0, 2))
+    with pytest.raises(TypeError):
+        p1.merge(Hist1D(2, 0, 2))
+
+
+def test_inplace_with_histogram_same_as_binary():
+    rng = np.random.default_rng(32)
+    h1 = _filled(rng.uniform(0, 1, size=(300, 2)), 1.0)
+    h2 = _filled(rng.uniform(0, 1, size=(300, 2)), 2.0)
+
+    for op in ("__sub__", "__mul__", "__truediv__"):
+        expected = getattr(h1, op)(h2)
+        h = _filled(np.empty((0, 2)), 1.0)
+        h.merge(h1)
+        cells = h._binsEntries
+        result = getattr(h, op.replace("__", "__i", 1))(h2)
+
+        assert result is h and h._binsEntries is cells
+        assert np.allclose(h.get_cells_contents(True), expected.get_cells_contents(True))
+        assert np.allclose(h.get_cells_contents_errors(True), expected.get_cells_contents_errors(True))
+        for key, value in expected.get_stats().items():
+            assert np.allclose(h.get_stats()[key], value), key
+
+
+def test_inplace_with_numbers_and_arrays():
+    for sparse in (False, True):
+        h = HistND(1, [0], [4], [4], sparse=sparse)
+        h.fill_many([0.5, 0.5, 2.5], weights=[1.0, 1.0, 3.0])
+
+        h *= 2
+        assert list(h.get_cells_contents(True)) == [4.0, 0.0, 6.0, 0.0]
+        assert np.allclose(h.get_cells_contents_errors(True), [2 * np.sqrt(2.0), 0.0, 6.0, 0.0])
+        h /= np.array([2.0, 1.0, 3.0, 0.0])
+        assert list(h.get_cells_contents(True)) == [2.0, 0.0, 2.0, 0.0]
+        assert h.sum_of_weights == 4.0
+        if sparse:
+            with pytest.raises(ValueError):
+                h += 1  # would fill every cell
+            h += np.ones(4)
+        else:
+            h += 1
+        h -= np.array([0.0, 1.0, 0.0, 1.0])
+        assert list(h.get_cells_contents(True)) == [3.0, 0.0, 3.0, 0.0]
+        assert h.sum_of_weights == 6.0
+
+    h = Hist2D(2, 0, 2, 3, 0, 3)
+    h += np.arange(6.0).reshape(2, 3)
+    assert h.get_pos_content(1.5, 0.5) == 3.0
+    with pytest.raises(BufferError):
+        h += np.ones(5)
+
+
+def test_inplace_profile():
+    p = Profile1D(2, 0, 2)
+    p.fill_many([0.5, 0.5, 1.5], values=[1.0, 3.0, 5.0])
+    errors = p.get_cells_contents_errors(True)
+
+    p += 1.0
+    assert list(p.get_cells_contents(True)) == [3.0, 6.0]
+    assert np.allclose(p.get_cells_contents_errors(True), errors)
+    p *= np.array([2.0, 0.5])
+    assert list(p.get_cells_contents(True)) == [6.0, 3.0]
+    assert np.allclose(p.get_cells_contents_errors(True), errors * [2.0, 0.5])
+
+    with pytest.raises(TypeError):
+        p -= Profile1D(2, 0, 2)
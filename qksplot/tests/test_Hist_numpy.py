@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from qksplot.hist import Hist1D, HistND
+from qksplot.profile import Profile1D, ProfileND
+
+
+def test_to_numpy_is_a_view():
+    h = HistND(2, [0, 0], [4, 3], [4, 3])
+    h.fill_many([0.5, 1.5, 1.5, 3.5], [0.5, 0.5, 2.5, 2.5])
+
+    contents, edges = h.to_numpy()
+    assert contents.shape == (4, 3)
+    assert contents[1, 2] == 1.0 and contents[1, 0] == 1.0 and contents.sum() == 4.0
+    assert np.array_equal(edges[0], [0, 1, 2, 3, 4]) and np.array_equal(edges[1], [0, 1, 2, 3])
+
+    h.fill(2.5, 1.5)
+    assert contents[2, 1] == 1.0
+    assert np.shares_memory(np.asarray(h), contents)
+    assert not np.shares_memory(np.array(h, copy=True), contents)
+
+    v = h[1:3, :]
+    assert np.shares_memory(v.to_numpy()[0], contents)
+    assert np.array_equal(np.asarray(v), contents[1:3])
+
+
+def test_to_numpy_profile():
+    p = Profile1D(4, 0, 4)
+    p.fill_many([0.5, 0.5, 2.5], values=[1.0, 3.0, 5.0])
+    assert list(np.asarray(p)) == [2.0, 0.0, 5.0, 0.0]
+    with pytest.raises(TypeError):
+        ProfileND.from_numpy(np.zeros(4), [np.arange(5.0)])
+
+
+def test_from_numpy_adopts_the_array():
+    rng = np.random.default_rng(101)
+    positions = rng.normal(0, 1, size=(1000, 3))
+    counts, edges = np.histogramdd(positions, bins=(6, 5, 4), range=[(-3, 3), (-2, 3), (-1, 1)])
+
+    h = HistND.from_numpy(counts, edges, title="adopted")
+    expected = HistND(3, [-3, -2, -1], [3, 3, 1], [6, 5, 4])
+    expected.fill_many(positions)
+    assert h.title == "adopted" and h.shape == (6, 5, 4)
+    assert np.array_equal(h.get_cells_contents(True), expected.get_cells_contents(True))
+    assert np.array_equal(h.get_cells_contents_errors(True), expected.get_cells_contents_errors(True))
+    assert np.isclose(h.sum_of_weights, expected.sum_of_weights)
+
+    h.fill(0.1, 0.1, 0.1, weight=2.0)
+    assert counts[3, 2, 2] == np.asarray(expected)[3, 2, 2] + 2.0
+    assert np.shares_memory(np.asarray(h), counts)
+
+    fortran = np.asfortranarray(counts)
+    assert isinstance(HistND.from_numpy(fortran, edges)._binsEntries, np.ndarray)
+    assert np.shares_memory(HistND.from_numpy(fortran, edges)._binsEntries, fortran)
+
+
+def test_from_numpy_1d():
+    counts, edges = np.histogram([0.5, 1.5, 1.5], bins=3, range=(0, 3))
+    h = Hist1D.from_numpy(counts, edges)
+    assert list(h.get_cells_contents(True)) == [1.0, 2.0, 0.0]
+    assert h.entries == 3
+
+    with pytest.raises(BufferError):
+        HistND.from_numpy(np.zeros((2, 2)), [np.arange(3.0)])
+    with pytest.raises(BufferError):
+        HistND.from_numpy(np.zeros((2, 2)), [np.arange(3.0), np.arange(4.0)])
+
+
+def test_integral_after_writing_the_array():
+    h = Hist1D(10, 0, 10)
+    h.fill_many(np.arange(10) + 0.5)
+    assert h.integral_over_bins([0], [10]) == 10
+    np.asarray(h)[:] = 0
+    assert h.integral() == 0 and h.integral_over_bins([0], [10]) == 0
+
+    h = HistND(2, [0, 0], [4, 3], [4, 3])
+    h.fill_many([0.5, 1.5], [0.5, 2.5])
+    assert h.integral_over_bins([0, 0], [4, 3]) == 2
+    h[1:2, :].to_numpy()[0][:] = 5
+    assert h.integral_over_bins([0, 0], [4, 3]) == 16
+
+    for counts in (np.ones(4), np.asfortranarray(np.ones((4, 3)))):
+        h = HistND.from_numpy(counts, [np.arange(n + 1.0) for n in counts.shape])
+        assert h.integral_over_bins([0] * counts.ndim, list(counts.shape)) == counts.size
+        counts *= 3
+        assert h.integral_over_bins([0] * counts.ndim, list(counts.shape)) == 3 * counts.size
+
+    h = HistND.from_numpy([1.0, 2.0], [0, 1, 2])  # copied: the table is cached
+    assert h.integral_over_bins([0], [2]) == 3 and h._integralTable is not None
+
+
+def test_array_copy_argument():
+    h = HistND(2, [0, 0], [4, 3], [4, 3])
+    h.fill_many([0.5, 1.5], [0.5, 2.5])
+    assert np.shares_memory(h.__array__(copy=False), np.asarray(h))
+    assert not np.shares_memory(h.__array__(copy=True), np.asarray(h))
+    with pytest.raises(ValueError):
+        h.__array__(np.float32, copy=False)
+    assert h.__array__(np.float32).dtype == np.float32
+
+    copied = HistND(2, [0, 0], [4, 3], [4, 3])
+    copied.fill(0.5, 0.5)
+    copied.__array__(copy=True)[:] = 0
+    assert copied.integral_over_bins([0, 0], [4, 3]) == 1 and copied._integralTable is not None
+
+    p = Profile1D(4, 0, 4)
+    s = HistND(1, [0], [4], [4], sparse=True)
+    for other in (p, s):
+        with pytest.raises(ValueError):
+            other.__array__(copy=False)
+        a = other.__array__(copy=True)
+        assert a.shape == (4,) and a is not other.__array__(copy=True)
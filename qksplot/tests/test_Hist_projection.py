@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from qksplot.hist import HistND, Hist3D
+from qksplot.profile import Profile2D
+
+
+def _filled_3d(sparse=False):
+    h = HistND(3, [-2, -1, 0], [2, 1, 3], [8, 5, 3], sparse=sparse)
+    rng = np.random.default_rng(51)
+    h.fill_many(rng.normal(0, 1, size=(5000, 3)), weights=rng.uniform(0.5, 2.0, 5000))
+    return h
+
+
+def _projected_by_loop(h, keepDims):
+    """ the projection done cell by cell """
+    shape = [h.get_axis(d).nbins for d in keepDims]
+    contents = np.zeros(shape)
+    errors2 = np.zeros(shape)
+    for i_cell in range(h.cells):
+        bins = tuple(h.cell_to_bins(i_cell)[d] for d in keepDims)
+        contents[bins] += h.get_cell_content(i_cell)
+        errors2[bins] += h.get_cell_content_error(i_cell) ** 2
+    return contents.ravel(order='F'), np.sqrt(errors2).ravel(order='F')
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_projection_same_as_loop(sparse):
+    h = _filled_3d(sparse)
+    for keepDims in ((0,), (2,), (0, 1), (2, 0), (1, 2, 0)):
+        p = h.projection(*keepDims)
+        contents, errors = _projected_by_loop(h, keepDims)
+
+        assert p.shape == tuple(h.get_axis(d).nbins for d in keepDims)
+        assert np.allclose(p.get_cells_contents(True), contents)
+        assert np.allclose(p.get_cells_contents_errors(True), errors)
+        assert p.entries == h.entries and p.sum_of_weights == h.sum_of_weights
+        assert p.sum_of_weightsX == [h.sum_of_weightsX[d] for d in keepDims]
+
+    with pytest.raises(ValueError):
+        h.projection(0, 0)
+
+
+def test_hist3d_projections():
+    h = Hist3D(4, 0, 4, 3, 0, 3, 2, 0, 2)
+    h.fill(0.5, 1.5, 1.5)
+    assert list(h.projection_z().get_cells_contents(True)) == [0.0, 1.0]
+    assert list(h.projection_y().get_cells_contents(True)) == [0.0, 1.0, 0.0]
+    assert h.projection_yz().shape == (3, 2)
+
+
+def test_profile_projection():
+    p = Profile2D(2, 0, 2, 2, 0, 2)
+    p.fill_many([0.5, 0.5, 1.5], [0.5, 1.5, 0.5], values=[1.0, 3.0, 5.0])
+
+    px = p.projection(0)
+    assert list(px.get_cells_contents(True)) == [2.0, 5.0]
+    py = p.projection(1)
+    assert list(py.get_cells_contents(True)) == [3.0, 3.0]
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from qksplot.hist import HistAxis, HistND, Hist1D
+from qksplot.profile import Profile2D
+
+
+def _overlaps(source, target):
+    """ matrix of the fractions of each source bin lying in each target bin """
+    result = np.zeros((len(source) - 1, len(target) - 1))
+    for i in range(len(source) - 1):
+        for j in range(len(target) - 1):
+            overlap = min(source[i + 1], target[j + 1]) - max(source[i], target[j])
+            result[i, j] = max(overlap, 0.0) / (source[i + 1] - source[i])
+    return result
+
+
+def test_rebin_map():
+    source = HistAxis([0.0, 1.0, 2.0, 4.0])
+    target = HistAxis([0.5, 1.5, 3.0, 5.0])
+    sourceBins, targetBins, fractions = source._get_rebin_map(target)
+
+    assert list(sourceBins) == [0, 1, 1, 2, 2]
+    assert list(targetBins) == [0, 0, 1, 1, 2]
+    assert np.allclose(fractions, [0.5, 0.5, 0.5, 0.5, 0.5])
+    assert source._get_rebin_map(HistAxis(target.get_bins()))[2] is fractions  # cached
+
+
+def test_rebin_same_as_overlaps():
+    rng = np.random.default_rng(41)
+    edgesX = np.sort(rng.uniform(-1, 1, 9))
+    edgesY = np.sort(rng.uniform(-1, 1, 6))
+    values = rng.uniform(0, 5, size=(8, 5))
+
+    for sparse in (False, True):
+        h = HistND(2, edges=[edgesX, edgesY], sparse=sparse)
+        h._fill_cells(values.ravel(order='F'))
+        target = HistND(2, [-0.5, -1.5], [1.5, 0.5], [7, 4])
+
+        expected = _overlaps(edgesX, target.get_axis(0).get_bins()).T @ values
+        expected = expected @ _overlaps(edgesY, target.get_axis(1).get_bins())
+        assert np.allclose(h._rebin(h._binsEntries, target), expected.ravel(order='F'))
+
+
+def test_add_different_densities_keeps_sum():
+    h1 = Hist1D(10, 0, 1)
+    h2 = Hist1D(4, 0, 1)
+    h1.fill_many(np.linspace(0.05, 0.95, 10))
+    h2.fill_many([0.1, 0.3, 0.6, 0.9])
+
+    total = h1 + h2
+    assert total.get_axis(0).nbins == 10
+    assert np.isclose(total.get_cells_contents(True).sum(), 14.0)
+
+
+def _merged_by_loop(h, factors):
+    """ the bins merged cell by cell """
+    shape = [-(-h.get_axis(d).nbins // k) for d, k in enumerate(factors)]
+    contents = np.zeros(shape)
+    errors2 = np.zeros(shape)
+    for i_cell in range(h.cells):
+        bins = tuple(b // k for b, k in zip(h.cell_to_bins(i_cell), factors))
+        contents[bins] += h.get_cell_content(i_cell)
+        errors2[bins] += h.get_cell_content_error(i_cell) ** 2
+    return contents.ravel(order='F'), np.sqrt(errors2).ravel(order='F')
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_rebin_same_as_loop(sparse):
+    h = HistND(3, [-2, -1, 0], [2, 1, 3], [8, 5, 3], sparse=sparse)
+    rng = np.random.default_rng(61)
+    h.fill_many(rng.normal(0, 1, size=(5000, 3)), weights=rng.uniform(0.5, 2.0, 5000))
+
+    for factors in ((2, 1, 3), (4, 2, 2), (1, 1, 1), (3, 5, 1)):
+        r = h.rebin(factors)
+        contents, errors = _merged_by_loop(h, factors)
+
+        assert r.sparse == sparse
+        assert np.allclose(r.get_cells_contents(True), contents)
+        assert np.allclose(r.get_cells_contents_errors(True), errors)
+        assert r.entries == h.entries and r.sum_of_weightsX == h.sum_of_weightsX
+        for d, k in enumerate(factors):
+            edges = h.get_axis(d).get_bins()
+            assert r.get_axis(d).get_bins()[0] == edges[0] and r.get_axis(d).get_bins()[-1] == edges[-1]
+            assert list(r.get_axis(d).get_bins()[:-1]) == list(edges[:-1:k])
+
+    assert h.rebin(2).shape == (4, 3, 2)
+    with pytest.raises(ValueError):
+        h.rebin([2, 0, 1])
+    with pytest.raises(BufferError):
+        h.rebin([2, 2])
+
+
+def test_rebin_profile():
+    p = Profile2D(4, 0, 4, 2, 0, 2)
+    p.fill_many([0.5, 1.5, 2.5, 3.5], [0.5, 0.5, 1.5, 1.5], values=[1.0, 3.0, 5.0, 9.0])
+
+    r = p.rebin([2, 1])
+    assert list(r.get_cells_contents(True)) == [2.0, 0.0, 0.0, 7.0]
+    assert list(r.rebin([1, 2]).get_cells_contents(True)) == list(p.projection(0).rebin(2).get_cells_contents(True))
+
+
+def test_union_keeps_the_number_of_bins():
+    h1, h2 = Hist1D(3, 0, 0.7), Hist1D(3, 0, 0.7)
+    h1.fill_many([0.1, 0.3, 0.5])
+    h2.fill_many([0.1, 0.1])
+    for result in (h1 + h2, h1 - h2, h1 * h2, h1.lazy().evaluate() + h2):
+        assert result.shape == (3,)
+    assert list((h1 + h2).get_cells_contents(True)) == [3.0, 1.0, 1.0]
+
+    wider = Hist1D(7, 0.7, 1.4)  # the density of h1 does not give an exact number of bins
+    wider.fill(1.0)
+    assert (h1 + wider).shape == (6,) and (h1 + wider).get_cells_contents(True).sum() == 4.0
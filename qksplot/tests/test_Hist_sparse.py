@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from qksplot.hist import HistND
+from qksplot.profile import ProfileND
+from qksplot.storage import SparseCells
+from qksplot.tests.helpers import assert_same, filled
+
+
+def _filled(sparse, seed=5):
+    h = filled(HistND(3, [-2, -2, 0], [2, 2, 1], [8, 6, 4], sparse=sparse), seed)
+    for x, y, z in np.random.default_rng(seed + 100).normal(0, 1, size=(50, 3)).tolist():
+        h.fill(x, y, z, weight=2.0)
+    h.fill_bins(1, 2, 3)
+    h.fill_cell(7)
+    return h
+
+
+def test_sparse_cells():
+    cells = SparseCells(10)
+    cells[3] += 2.0
+    cells[3] += 1.0
+    cells.add_at([1, 3, 3, 9], [1.0, 1.0, 1.0, 4.0])
+    cells[[0, 0]] = [5.0, 6.0]
+
+    assert len(cells) == 10 and cells.nnz == 4
+    assert cells[3] == 5.0 and cells[2] == 0.0
+    assert list(cells[np.array([0, 1, 2, 3, 9])]) == [6.0, 1.0, 0.0, 5.0, 4.0]
+    assert list(np.asarray(cells)) == [6.0, 1.0, 0.0, 5.0, 0.0, 0.0, 0.0, 0.0, 0.0, 4.0]
+
+
+def test_sparse_same_as_dense():
+    dense, sparse = _filled(False), _filled(True)
+    assert sparse.sparse and not dense.sparse
+    assert_same(dense, sparse)
+
+    for i in (0, 7, 37, dense.cells - 1):
+        assert dense.get_cell_content(i) == sparse.get_cell_content(i)
+    assert np.isclose(dense.integral(), sparse.integral())
+    assert np.isclose(dense.integral(20, 150), sparse.integral(20, 150))
+
+    assert_same(dense.projection(0, 2), sparse.projection(0, 2))
+    assert sparse.projection(1).sparse
+
+
+def test_sparse_arithmetic():
+    d1, d2 = _filled(False, 6), _filled(False, 7)
+    s1, s2 = _filled(True, 6), _filled(True, 7)
+
+    assert_same(d1 + d2, s1 + s2)
+    assert_same(d1 - d2, s1 - s2)
+    assert_same(d1 * d2, s1 * s2)
+    assert_same(d1 / d2, s1 / s2)
+    assert (s1 + s2).sparse
+
+
+def test_sparse_arithmetic_other_bins():
+    rng = np.random.default_rng(10)
+    positions = rng.normal(0, 1, size=(300, 2))
+    hists = {}
+    for sparse in (False, True):
+        h1 = HistND(2, [-2, -2], [2, 2], [8, 6], sparse=sparse)
+        h2 = HistND(2, [-3, -1], [1, 3], [5, 7], sparse=sparse)
+        h1.fill_many(positions)
+        h2.fill_many(positions[::2])
+        hists[sparse] = h1, h2
+
+    (d1, d2), (s1, s2) = hists[False], hists[True]
+    assert_same(d1 + d2, s1 + s2)
+    assert_same(d1 - d2, s1 - s2)
+    assert (s1 - s2).sparse
+
+    s1 += s2
+    assert_same(d1 + d2, s1)
+    assert s1.sparse
+
+
+def test_sparse_arithmetic_stays_sparse():
+    rng = np.random.default_rng(11)
+    h1 = HistND(6, [0] * 6, [1] * 6, [20] * 6, sparse=True)
+    h2 = HistND(6, [0] * 6, [1] * 6, [10] * 6, sparse=True)
+    h1.fill_many(rng.uniform(0, 1, size=(100, 6)))
+    h2.fill_many(rng.uniform(0, 1, size=(100, 6)))
+
+    result = h1 + h2  # 64M cells, only the filled ones are computed
+    assert result.sparse and result.cells == 20 ** 6
+    assert result._binsEntries.nnz <= 100 + 100 * 2 ** 6
+    assert np.isclose(result.get_cells_contents().sum(), 200)
+
+    with pytest.raises(ValueError):
+        h1 += 1.0
+    h1 *= 2.0
+    assert np.isclose(h1.get_cells_contents().sum(), 200)
+
+
+def test_sparse_high_dimension():
+    h = HistND(6, [0] * 6, [1] * 6, [50] * 6, sparse=True)
+    assert h.cells == 50 ** 6
+
+    rng = np.random.default_rng(8)
+    positions = rng.uniform(0, 1, size=(1000, 6))
+    h.fill_many(positions)
+    h.fill(*positions[0])
+
+    assert h.entries == 1001
+    assert h.get_cells_contents().sum() == 1001
+    assert np.isclose(h.integral(), 1001 / 50 ** 6)
+    assert h.get_pos_content(*positions[0]) >= 2.0
+    assert h.projection(0, 1).shape == (50, 50)
+
+
+def test_sparse_profile():
+    rng = np.random.default_rng(9)
+    positions = rng.uniform(0, 1, size=(200, 2))
+    values = rng.normal(5, 1, 200)
+
+    profiles = [ProfileND(2, [0, 0], [1, 1], [4, 4], sparse=sparse) for sparse in (False, True)]
+    for p in profiles:
+        for pos, v in zip(positions.tolist(), values.tolist()):
+            p.fill(*pos, value=v)
+
+    assert np.allclose(profiles[0].get_cells_contents(), profiles[1].get_cells_contents())
+    assert np.allclose(profiles[0].get_cells_contents_errors(True), profiles[1].get_cells_contents_errors(True))
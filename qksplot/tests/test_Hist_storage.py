@@ -0,0 +1,67 @@
+import math
+import numpy as np
+
+from qksplot.hist import Hist1D, Hist2D
+from qksplot.profile import Profile1D
+
+
+def test_cells_are_arrays():
+    h = Hist2D(20, 0, 1, 10, 0, 1)
+    assert isinstance(h.get_cells_contents(True), np.ndarray)
+    assert h.get_cells_contents(True).dtype == np.float64
+    assert len(h.get_cells_contents(True)) == h.cells == 200
+
+
+def test_contents_and_errors():
+    h = Hist1D(4, 0, 4)
+    h.fill(0.5, weight=2.0)
+    h.fill(0.5, weight=1.0)
+    h.fill(2.5)
+
+    assert list(h.get_cells_contents()) == [3.0, 1.0]
+    assert list(h.get_cells_contents(True)) == [3.0, 0.0, 1.0, 0.0]
+    assert np.allclose(h.get_cells_contents_errors(), [math.sqrt(5.0), 1.0])
+
+
+def test_scale():
+    h = Hist1D(4, 0, 4)
+    for x in (0.5, 1.5, 1.5, 3.5):
+        h.fill(x)
+    h.scale(2.0)
+
+    assert list(h.get_cells_contents(True)) == [2.0, 4.0, 0.0, 2.0]
+    assert h.sum_of_weights == 8.0
+    assert h.sum_of_weights2 == 16.0
+
+
+def test_integral():
+    h = Hist2D(4, 0, 2, 2, 0, 4)
+    h.fill(0.25, 1.0, weight=3.0)
+    h.fill(1.75, 3.0)
+
+    assert math.isclose(h.integral(), (3.0 + 1.0) * 0.5 * 2.0)
+    assert math.isclose(h.integral(0, 4), 3.0 * 0.5 * 2.0)
+
+
+def test_arithmetic_same_binning():
+    h1 = Hist1D(4, 0, 4)
+    h2 = Hist1D(4, 0, 4)
+    for x in (0.5, 1.5, 1.5):
+        h1.fill(x)
+    for x in (1.5, 2.5):
+        h2.fill(x)
+
+    assert list((h1 + h2).get_cells_contents(True)) == [1.0, 3.0, 1.0, 0.0]
+    assert list((h1 - h2).get_cells_contents(True)) == [1.0, 1.0, -1.0, 0.0]
+    assert list((h1 * h2).get_cells_contents(True)) == [0.0, 2.0, 0.0, 0.0]
+    assert list((h1 / h2).get_cells_contents(True)) == [0.0, 2.0, 0.0, 0.0]
+
+
+def test_profile_errors():
+    p = Profile1D(2, 0, 2)
+    for v in (1.0, 2.0, 3.0):
+        p.fill(0.5, value=v)
+
+    assert np.allclose(p.get_cells_contents(), [2.0])
+    std = math.sqrt(2.0 / 3.0)
+    assert np.allclose(p.get_cells_contents_errors(), [std / math.sqrt(3.0)])
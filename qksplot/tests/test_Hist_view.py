@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from qksplot.hist import Hist2D, HistND
+from qksplot.profile import Profile2D
+
+
+def _filled_2d():
+    h = Hist2D(50, 0, 50, 10, 0, 10)
+    rng = np.random.default_rng(71)
+    h.fill_many(rng.uniform(0, 50, 2000), rng.uniform(0, 10, 2000), weights=rng.uniform(0.5, 2.0, 2000))
+    return h
+
+
+def test_view_shares_the_cells():
+    h = _filled_2d()
+    v = h[20:40, :]
+
+    assert isinstance(v, Hist2D) and v.shape == (20, 10)
+    assert list(v.get_axis(0).get_bins()) == list(h.get_axis(0).get_bins()[20:41])
+    grid = h.get_cells_contents(True).reshape(h.shape, order='F')
+    assert np.array_equal(v.get_cells_contents(True), grid[20:40].ravel(order='F'))
+    assert np.isclose(v.sum_of_weights, grid[20:40].sum())
+    assert np.isclose(v.integral(), h.integral_over_bins([20, 0], [40, 10]))
+
+    before = h.integral()
+    v.fill(25.5, 3.5, weight=10.0)
+    v.fill_many([30.5, 31.5], [0.5, 9.5])
+    assert h.get_cell_content(h.bins_to_cells([[25, 3]])[0]) == v.get_cell_content(v.bins_to_cells([[5, 3]])[0])
+    assert np.isclose(h.integral(), before + 12.0)
+
+    v *= 2.0
+    assert np.isclose(h.integral_over_bins([20, 0], [40, 10]), v.integral())
+    assert np.array_equal(h.get_cells_contents(True).reshape(h.shape, order='F')[20:40].ravel(order='F'),
+                          v.get_cells_contents(True))
+
+    h.fill(21.5, 0.5)
+    assert v.get_cell_content(1) == h.get_cell_content(21)
+
+
+def test_view_of_view():
+    h = _filled_2d()
+    v = h.view([(10, 30), None])[5:, 2:4]
+
+    assert v.shape == (15, 2)
+    before = h.integral()
+    v.fill_bins(0, 0, weight=3.0)
+    assert np.isclose(h.integral(), before + 3.0)
+    assert h.get_cell_content(h.bins_to_cells([[15, 2]])[0]) == v.get_cell_content(0)
+
+    with pytest.raises(ValueError):
+        h[10:10]
+    with pytest.raises(ValueError):
+        h[::2]
+    with pytest.raises(TypeError):
+        HistND(2, [0, 0], [4, 4], [4, 4], sparse=True)[1:3]
+
+
+def test_profile_view():
+    p = Profile2D(4, 0, 4, 2, 0, 2)
+    p.fill_many([0.5, 1.5, 2.5], [0.5, 0.5, 1.5], values=[1.0, 3.0, 5.0])
+
+    v = p[1:3]
+    assert isinstance(v, Profile2D)
+    assert list(v.get_cells_contents(True)) == [3.0, 0.0, 0.0, 5.0]
+    v.fill(1.5, 0.5, value=5.0)
+    assert p.get_cell_content(1) == 4.0
+
+
+def test_view_of_single_bins():
+    h = _filled_2d()
+    contents = np.asarray(h)
+
+    v = h[3]
+    assert v.shape == (1, 10) and np.array_equal(np.asarray(v), contents[3:4])
+    v = h[1:3, -1]
+    assert v.shape == (2, 1) and np.array_equal(np.asarray(v), contents[1:3, 9:10])
+    assert np.array_equal(np.asarray(h.view([np.int64(49), (2, 4)])), contents[49:50, 2:4])
+
+    for ranges in ((50,), (0, -11)):
+        with pytest.raises(IndexError):
+            h[ranges]
+    for ranges in ((1.5,), ("a",), ((1, 2, 3),)):
+        with pytest.raises(TypeError):
+            h[ranges]
@@ -0,0 +1,64 @@
+import numpy as np
+
+from qksplot.profile import Profile1D, ProfileND
+from qksplot.tests.helpers import assert_same
+
+
+def test_fill_many_same_as_fill():
+    rng = np.random.default_rng(10)
+    positions = rng.normal(0, 1, size=(3000, 2))
+    values = (positions ** 2).sum(axis=1) + rng.normal(0, 0.1, 3000)
+    weights = rng.uniform(0.5, 2.0, 3000)
+
+    p1 = ProfileND(2, [-2, -2], [2, 2], [10, 10], minValue=0.1, maxValue=5.0)
+    for pos, v, w in zip(positions.tolist(), values.tolist(), weights.tolist()):
+        p1.fill(*pos, value=v, weight=w)
+
+    p2 = ProfileND(2, [-2, -2], [2, 2], [10, 10], minValue=0.1, maxValue=5.0)
+    cells = p2.fill_many(positions, values=values, weights=weights)
+
+    assert_same(p1, p2)
+    assert (cells[(values < 0.1) | (values > 5.0)] == -1).all()
+
+
+def test_fill_many_requires_values():
+    p = Profile1D(4, 0, 4)
+    try:
+        p.fill_many([1.0, 2.0])
+    except ValueError:
+        pass
+    else:
+        assert False, "a ValueError was expected"
+
+    p.fill_many([0.5, 0.5, 2.5], values=[1.0, 3.0, 7.0])
+    assert list(p.get_cells_contents()) == [2.0, 7.0]
+
+
+def test_fill_stream():
+    rng = np.random.default_rng(12)
+    x = rng.uniform(0, 4, 500)
+    values = rng.normal(3, 1, 500)
+
+    expected = Profile1D(4, 0, 4)
+    expected.fill_many(x, values=values)
+
+    p = Profile1D(4, 0, 4)
+    assert p.fill_stream(zip(x.tolist(), values.tolist()), chunk_size=50) == 500
+    assert_same(expected, p)
+
+    p = Profile1D(4, 0, 4)
+    assert p.fill_stream([{"x": x, "v": values}], chunk_size=50, value_column="v") == 500
+    assert_same(expected, p)
+
+
+def test_fill_parallel():
+    rng = np.random.default_rng(14)
+    x = rng.uniform(0, 4, 500)
+    values = rng.normal(3, 1, 500)
+
+    expected = Profile1D(4, 0, 4)
+    expected.fill_many(x, values=values)
+
+    p = Profile1D(4, 0, 4)
+    assert p.fill_parallel(x, values=values, processes=2) == 500
+    assert_same(expected, p)